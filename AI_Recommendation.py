@@ -1,5 +1,4 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
 import pandas as pd
 import joblib
 import numpy as np
@@ -8,11 +7,14 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import NearestNeighbors
-from pythainlp.tokenize import word_tokenize
 from sklearn.metrics import confusion_matrix
 from surprise import SVD, Dataset, Reader
 from sqlalchemy import create_engine
 from textblob import TextBlob
+from thai_tokenizer import tokenize, tokenize_many, tokenization_job
+from svd_scoring import SVDBatchScorer
+from content_scores import CONTENT_SCORES_FILE, ContentScoreTable, original_label_scores
+from evaluation import EvaluationData, evaluate_all
 
 def load_data_from_db():
     """โหลดข้อมูลจากฐานข้อมูล MySQL และส่งคืนเป็น DataFrame"""
@@ -47,6 +49,13 @@ def normalize_engagement(data, user_column='owner_id', engagement_column='PostEn
 def analyze_comments(comments):
     """วิเคราะห์ความรู้สึกของคอมเมนต์ รองรับทั้งภาษาไทยและภาษาอังกฤษ"""
     sentiment_scores = []
+    comments = list(comments)
+
+    # ตัดคำคอมเมนต์ภาษาไทยทั้งหมดในครั้งเดียว (ข้อความซ้ำตัดครั้งเดียว, ข้อมูลมากใช้หลายโปรเซส)
+    with tokenization_job('analyze_comments'):
+        tokenize_many(comment for comment in comments
+                      if isinstance(comment, str) and any('\u0E00' <= char <= '\u0E7F' for char in comment))
+
     for comment in comments:
         try:
             if pd.isna(comment):
@@ -54,7 +63,7 @@ def analyze_comments(comments):
             else:
                 # หากเป็นภาษาไทย ให้ tokenize ด้วย PyThaiNLP
                 if any('\u0E00' <= char <= '\u0E7F' for char in comment):
-                    tokenized_comment = ' '.join(word_tokenize(comment, engine='newmm'))
+                    tokenized_comment = ' '.join(tokenize(comment))
                 else:
                     tokenized_comment = comment
 
@@ -105,9 +114,15 @@ def create_content_based_model(data, text_column='Content', comment_column='Comm
     # ปรับ Engagement ใน test set (กรณีใช้ในการประเมิน)
     test_data = normalize_engagement(test_data)
 
+    # คำนวณคะแนน Content-Based ของทุกโพสต์ใน train set ล่วงหน้าด้วย kneighbors ครั้งเดียว
+    content_scores = ContentScoreTable.build(
+        train_data['post_id'], tfidf_matrix, knn, train_data['NormalizedEngagement']
+    )
+
     joblib.dump(tfidf, 'TFIDF_Model.pkl')
     joblib.dump(knn, 'KNN_Model.pkl')
-    return tfidf, knn, train_data, test_data
+    content_scores.save(CONTENT_SCORES_FILE)
+    return tfidf, knn, train_data, test_data, content_scores
 
 def create_collaborative_model(data, n_factors=150, n_epochs=70, lr_all=0.005, reg_all=0.5):
     """สร้างและฝึกโมเดล Collaborative Filtering พร้อมแบ่งข้อมูลเป็น training และ test set"""
@@ -129,7 +144,8 @@ def create_collaborative_model(data, n_factors=150, n_epochs=70, lr_all=0.005, r
     joblib.dump(model, 'Collaborative_Model.pkl')
     return model, test_data
 
-def recommend_hybrid(user_id, train_data, test_data, collaborative_model, knn, categories, tfidf, alpha=0.50):
+def recommend_hybrid(user_id, train_data, test_data, collaborative_model, knn, categories, tfidf, alpha=0.50, svd_scorer=None,
+                     content_scores=None):
     """
     แนะนำโพสต์โดยใช้ Hybrid Filtering รวม Collaborative และ Content-Based โดยคำนึงถึง test set
     """
@@ -143,40 +159,38 @@ def recommend_hybrid(user_id, train_data, test_data, collaborative_model, knn, c
     unviewed_data = test_data[~test_data['post_id'].isin(interacted_posts)]
 
     recommendations = []
+    post_ids = unviewed_data['post_id'].to_numpy()
+
+    # Collaborative Filtering: คำนวณคะแนนของโพสต์ที่ยังไม่ได้ดูทั้งหมดในครั้งเดียว
+    svd_scorer = svd_scorer or SVDBatchScorer(collaborative_model)
+    collab_scores = svd_scorer.score(user_id, post_ids)
+
+    # Content-Based Filtering: ดึงคะแนนจากตาราง post_id -> content_score
+    if content_scores is None:
+        content_scores = ContentScoreTable.build(
+            train_data['post_id'], tfidf.transform(train_data['Content'].fillna('')), knn,
+            train_data['NormalizedEngagement']
+        )
+    content_score_rows = content_scores.scores_for(post_ids)
+
+    # ผสมคะแนนจาก Collaborative และ Content-Based ตามค่า alpha
+    final_scores = alpha * collab_scores + (1 - alpha) * content_score_rows
 
     # ขั้นที่สอง: ใช้หมวดหมู่ในการเลือกโพสต์ที่แนะนำ
     for category in categories:
-        category_data = unviewed_data[unviewed_data[category] == 1]
+        in_category = (unviewed_data[category] == 1).to_numpy()
 
         # ถ้าไม่มีโพสต์ในหมวดหมู่นั้น ๆ ให้ข้ามไป
-        if category_data.empty:
+        if not in_category.any():
             continue
 
-        for _, post in category_data.iterrows():
-            # Collaborative Filtering: คำนวณคะแนนจากโมเดล Collaborative
-            collab_score = collaborative_model.predict(user_id, post['post_id']).est
-
-            # Content-Based Filtering: คำนวณคะแนนจากความคล้ายคลึงของเนื้อหา
-            idx = train_data.index[train_data['post_id'] == post['post_id']].tolist()
-            content_score = 0
-            if idx:
-                idx = idx[0]
-                # แปลงเนื้อหาของโพสต์เป็นเวกเตอร์ TF-IDF
-                tfidf_vector = tfidf.transform([train_data.iloc[idx]['Content']])
-
-                # ใช้ KNN เพื่อหาความคล้ายคลึงของโพสต์
-                n_neighbors = min(20, knn._fit_X.shape[0])
-                distances, indices = knn.kneighbors(tfidf_vector, n_neighbors=n_neighbors)
-
-                # คำนวณคะแนนจากโพสต์ที่คล้ายกัน
-                content_score = np.mean([train_data.iloc[i]['NormalizedEngagement'] for i in indices[0]])
-
-            # ผสมคะแนนจาก Collaborative และ Content-Based ตามค่า alpha
-            final_score = alpha * collab_score + (1 - alpha) * content_score
-            recommendations.append((post['post_id'], final_score))
+        recommendations.append(pd.DataFrame({'post_id': post_ids[in_category], 'score': final_scores[in_category]}))
 
     # จัดเรียงโพสต์ตามคะแนนที่ได้และคำนวณคะแนนที่เป็น normalized score
-    recommendations_df = pd.DataFrame(recommendations, columns=['post_id', 'score'])
+    if recommendations:
+        recommendations_df = pd.concat(recommendations, ignore_index=True)
+    else:
+        recommendations_df = pd.DataFrame(columns=['post_id', 'score'])
     recommendations_df['normalized_score'] = normalize_scores(recommendations_df['score'])
     recommendations = recommendations_df.sort_values(by='normalized_score', ascending=False)['post_id'].tolist()
 
@@ -212,18 +226,21 @@ def evaluate_model(data, recommendations, threshold=0.5):
 
     return accuracy ,precision, recall, f1, list(tp), list(fp), list(fn)
 
-def plot_evaluation_results(results):
-    """วาดกราฟผลการประเมิน Precision, Recall, F1 และ Accuracy"""
-    metrics = ['Accuracy', 'Precision', 'Recall', 'F1']
-    averages = [
-        np.mean([r[0] for r in results]),
-        np.mean([r[1] for r in results]),
-        np.mean([r[2] for r in results]),
-        np.mean([r[3] for r in results])
-    ]
-
-    plt.figure(figsize=(8, 5))
-    plt.bar(metrics, averages, color=['blue', 'green', 'red', 'purple'])
+def _headless_pyplot():
+    """ใช้ matplotlib แบบไม่มีหน้าต่าง (บันทึกเป็นไฟล์เท่านั้น) โหลดเมื่อสั่งให้วาดกราฟเท่านั้น"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def plot_evaluation_results(averages):
+    """วาดกราฟค่าเฉลี่ยของตัวชี้วัด (Accuracy, Precision, Recall, F1 และตัวชี้วัด @k)"""
+    plt = _headless_pyplot()
+    metrics = list(averages.keys())
+    values = [averages[metric] for metric in metrics]
+
+    plt.figure(figsize=(10, 5))
+    plt.bar(metrics, values, color=['blue', 'green', 'red', 'purple', 'orange', 'teal', 'gray'][:len(metrics)])
     plt.ylim(0, 1)
     plt.title('Evaluation Metrics')
     plt.ylabel('Score')
@@ -232,12 +249,14 @@ def plot_evaluation_results(results):
     plt.grid(axis='y', linestyle='--', alpha=0.7)
     plt.tight_layout()
     plt.savefig('evaluation_metrics.png')
-    plt.show()
+    plt.close()
     print("กราฟผลการประเมินถูกบันทึกใน 'evaluation_metrics.png'")
 
 def plot_confusion_matrix(tp, fp, fn):
-    """วาดกราฟ Confusion Matrix"""
-    cm = np.array([[len(tp), len(fp)], [len(fn), len(tp)]])
+    """วาดกราฟ Confusion Matrix จากจำนวน tp, fp, fn รวมของผู้ใช้ทุกคน"""
+    plt = _headless_pyplot()
+    import seaborn as sns
+    cm = np.array([[tp, fp], [fn, tp]])
     plt.figure(figsize=(6, 5))
     sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=['Not Recommended', 'Recommended'], yticklabels=['Not Recommended', 'Recommended'])
     plt.title('Confusion Matrix for Recommendation System')
@@ -245,10 +264,10 @@ def plot_confusion_matrix(tp, fp, fn):
     plt.ylabel('True')
     plt.tight_layout()
     plt.savefig('confusion_matrix.png')
-    plt.show()
+    plt.close()
     print("Confusion Matrix ถูกบันทึกใน 'confusion_matrix.png'")
 
-def main():
+def main(k=10, workers=None, plots=False, compare_original=False):
     # โหลดข้อมูลจากฐานข้อมูล
     content_based_data, collaborative_data = load_data_from_db()
 
@@ -259,7 +278,7 @@ def main():
     collaborative_model, collaborative_test_data = create_collaborative_model(collaborative_data)
 
     # สร้างโมเดล Content-Based Filtering
-    tfidf, knn, content_train_data, content_test_data = create_content_based_model(content_based_data)
+    tfidf, knn, content_train_data, content_test_data, content_scores = create_content_based_model(content_based_data)
 
     # หมวดหมู่ตัวอย่าง
     categories = [
@@ -275,44 +294,51 @@ def main():
         print("ไม่มีข้อมูล user_id สำหรับการทดสอบ")
         return
 
-    results = []
-    all_tp, all_fp, all_fn = [], [], []
-
-    # รันการแนะนำและประเมินผล
-    for user_id in user_ids:
-        recommendations = recommend_hybrid(
-            user_id,
-            content_train_data,
-            content_test_data,
-            collaborative_model,
-            knn,
-            categories,
-            tfidf,
+    # relevant items และข้อมูลของ test set คำนวณครั้งเดียว แล้วประเมินผู้ใช้เป็นกลุ่มแบบขนาน
+    relevant_items = evaluate_relevant_items(content_test_data)
+    data = EvaluationData(
+        content_train_data, content_test_data, categories, SVDBatchScorer(collaborative_model), content_scores,
+        relevant_items, alpha=0.5
+    )
+    report = evaluate_all(data, user_ids, k=k, workers=workers)
+    averages = report['averages']
+
+    print(f"ผลการประเมินเฉลี่ยหลังจากการทดสอบ ({report['users']} users, "
+          f"{report['seconds']:.2f}s, {report['users_per_second']:.1f} users/sec):")
+    print(f"Accuracy: {averages['Accuracy']:.2f}")
+    print(f"Precision: {averages['Precision']:.2f}")
+    print(f"Recall: {averages['Recall']:.2f}")
+    print(f"F1 Score: {averages['F1']:.2f}")
+    print(f"Precision@{k}: {averages['Precision@k']:.4f}")
+    print(f"Recall@{k}: {averages['Recall@k']:.4f}")
+    print(f"NDCG@{k}: {averages['NDCG@k']:.4f}")
+    print(f"Coverage@{k}: {report['coverage']:.4f}")
+
+    # เทียบกับคะแนน Content-Based แบบต้นฉบับ (label ของ index ถูกใช้เป็นตำแหน่ง) ตัวชี้วัดแบบเซตไม่ขึ้นกับคะแนน
+    # จึงต่างกันได้เฉพาะตัวชี้วัด @k
+    if compare_original:
+        original_scores, raised = original_label_scores(content_train_data, tfidf, knn)
+        original_data = EvaluationData(
+            content_train_data, content_test_data, categories, data.svd_scorer, original_scores, relevant_items,
             alpha=0.5
         )
-        accuracy, precision, recall, f1, tp, fp, fn = evaluate_model(content_test_data, recommendations)
-        results.append((accuracy, precision, recall, f1))
-        all_tp.extend(tp)
-        all_fp.extend(fp)
-        all_fn.extend(fn)
-
-    # คำนวณค่าเฉลี่ยของผลการประเมิน
-    avg_accuracy = np.mean([r[0] for r in results])  # ค่าเฉลี่ย Accuracy
-    avg_precision = np.mean([r[1] for r in results])
-    avg_recall = np.mean([r[2] for r in results])
-    avg_f1 = np.mean([r[3] for r in results])
-    
-
-    print("ผลการประเมินเฉลี่ยหลังจากการทดสอบ:")
-    print(f"Accuracy: {avg_accuracy:.2f}")
-    print(f"Precision: {avg_precision:.2f}")
-    print(f"Recall: {avg_recall:.2f}")
-    print(f"F1 Score: {avg_f1:.2f}")
-    
-
-    # วาดกราฟผลการประเมิน
-    plot_evaluation_results(results)
-    plot_confusion_matrix(all_tp, all_fp, all_fn)
+        original = evaluate_all(original_data, user_ids, k=k, workers=workers)
+        print(f"เทียบกับคะแนน Content-Based แบบต้นฉบับ ({len(raised)} โพสต์ที่ต้นฉบับโยน IndexError ได้คะแนน 0):")
+        for metric in ['Precision@k', 'Recall@k', 'NDCG@k']:
+            print(f"{metric.replace('@k', f'@{k}')}: {original['averages'][metric]:.4f} -> {averages[metric]:.4f}")
+        print(f"Coverage@{k}: {original['coverage']:.4f} -> {report['coverage']:.4f}")
+
+    # วาดกราฟผลการประเมิน (ไม่บังคับ บันทึกเป็นไฟล์โดยไม่เปิดหน้าต่าง)
+    if plots:
+        plot_evaluation_results(averages)
+        plot_confusion_matrix(report['tp'], report['fp'], report['fn'])
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the recommendation models and evaluate them")
+    parser.add_argument('--k', type=int, default=10, help="cut-off for Precision@k, Recall@k, NDCG@k and coverage")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--plots', action='store_true', help="save evaluation_metrics.png and confusion_matrix.png")
+    parser.add_argument('--compare-original', action='store_true',
+                        help="also report the @k metrics with the original index-label content-score lookup")
+    args = parser.parse_args()
+    main(k=args.k, workers=args.workers, plots=args.plots, compare_original=args.compare_original)
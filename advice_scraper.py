@@ -0,0 +1,58 @@
+import os
+
+from html_extract import PRODUCT_SCAN_LIMIT, SelectorSpec, extract_products
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# หน้าค้นหาของ Advice แสดงสินค้าด้วย JavaScript จึงต้องใช้ browser (ร้านอื่นใช้ requests ได้)
+ADVICE_SEARCH_URL = os.getenv('ADVICE_SEARCH_URL', 'https://www.advice.co.th/search?keyword={keyword}')
+ADVICE_SELECTORS = SelectorSpec('div.item', {
+    'name': '@item-name',
+    'price': 'div.sales-price.sales-price-font',
+    'url': 'a.product-item-link@href',
+})
+ADVICE_PRODUCT_SELECTOR = ADVICE_SELECTORS.container
+ADVICE_WAIT_SECONDS = float(os.getenv('ADVICE_WAIT_SECONDS', '5'))
+CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', '/usr/bin/chromedriver')
+
+
+def make_chrome_driver():
+    """สร้าง headless Chrome หนึ่ง session (ใช้เป็น factory ของ BrowserPool)"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # รันแบบไม่มี UI
+    chrome_options.add_argument("--disable-gpu")  # ปิดการใช้ GPU (สำหรับ Linux)
+    chrome_options.add_argument("--no-sandbox")  # ปิด sandbox (จำเป็นใน Docker)
+    chrome_options.add_argument("--disable-dev-shm-usage")  # ลดการใช้ shared memory (แก้ไขปัญหาใน Docker)
+    chrome_options.add_argument("--window-size=1920x1080")  # ตั้งขนาดหน้าต่าง
+    chrome_options.add_argument("--log-level=3")  # ลดการแสดง log
+    return webdriver.Chrome(service=Service(CHROMEDRIVER_PATH), options=chrome_options)
+
+
+def fetch_advice_page(driver, product_name, wait_seconds=ADVICE_WAIT_SECONDS, search_url=ADVICE_SEARCH_URL):
+    """
+    เปิดหน้าค้นหาแล้วรอจนรายการสินค้าปรากฏ (แทน time.sleep(2) เดิม) คืน HTML ของหน้า
+    หากไม่มีสินค้าปรากฏภายใน wait_seconds (เช่น ค้นหาไม่พบ) จะคืน HTML ที่มีอยู่ ณ ตอนนั้น
+    """
+    driver.get(search_url.format(keyword=product_name.replace(' ', '%20')))
+    try:
+        WebDriverWait(driver, wait_seconds, poll_frequency=0.1).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, ADVICE_PRODUCT_SELECTOR)
+        )
+    except TimeoutException:
+        pass
+    return driver.page_source
+
+
+def parse_advice_products(html, product_name, limit=PRODUCT_SCAN_LIMIT):
+    """ดึงชื่อ ราคา และลิงก์ของสินค้าที่ชื่อตรงกับ product_name จากกล่องสินค้า limit กล่องแรกของหน้าค้นหาของ Advice"""
+    products = []
+    for product in extract_products(html, ADVICE_SELECTORS, limit):
+        found_product_name = product['name']
+        if found_product_name and product_name.lower() in found_product_name.lower():  # Check for matching name
+            product_price = product['price'] if product['price'] is not None else "Price not found"
+            products.append({"name": found_product_name, "price": product_price, "url": product['url']})
+    return products
@@ -4,8 +4,12 @@ from flask_cors import CORS
 import os
 import pymysql
 import json
-from profanityAI import censor_profanity  # AI สำหรับเซ็นเซอร์คำหยาบ
-from imageAI import predict_image  # AI สำหรับตรวจจับภาพโป๊
+import threading
+import requests
+from profanityAI import censor_profanity_batch, profanity_stats  # AI สำหรับเซ็นเซอร์คำหยาบ
+from imageAI import moderate_images, verdict_cache  # AI สำหรับตรวจจับภาพโป๊
+from thai_tokenizer import tokenizer, tokenization_job
+from moderation_queue import ModerationQueue, QueueFull, StageTimer
 
 app = Flask(__name__)
 CORS(app)
@@ -22,68 +26,154 @@ connection = pymysql.connect(
     charset='utf8mb4',
     cursorclass=pymysql.cursors.DictCursor
 )
+# connection ใช้ร่วมกันทั้ง thread ของ Flask และ worker ของคิวตรวจสอบ จึงต้องใช้ทีละ thread
+db_lock = threading.Lock()
 
+# คิวตรวจสอบโพสต์แบบ async (ส่ง async=1 มากับ /ai/posts/create หรือตั้ง MODERATION_ASYNC=1 เป็นค่าเริ่มต้น)
+# จำนวน worker คงที่ และงานที่รอเกิน MODERATION_QUEUE_DEPTH ถูกตอบ 429 แทนการกิน worker ของเว็บ
+MODERATION_ASYNC = os.getenv('MODERATION_ASYNC', '0')
+moderation_queue = ModerationQueue(workers=int(os.getenv('MODERATION_WORKERS', '2')),
+                                   max_depth=int(os.getenv('MODERATION_QUEUE_DEPTH', '50')))
 
-# ฟังก์ชันสำหรับเซ็นเซอร์คำหยาบในหลายฟิลด์
+
+# URL ของบริการแนะนำโพสต์ (botgetprice.py) สำหรับล้าง cache ของโพสต์ที่ถูกแก้ไข และ token ภายในที่ตั้งไว้ตรงกัน
+# ต้องตั้งค่าเอง (ทั้งสองบริการใช้พอร์ต 5005 เป็นค่าเริ่มต้น จึงเดา URL ไม่ได้) หากไม่ตั้งจะไม่แจ้ง
+# และแถวที่ cache ไว้จะถูกตรวจจาก updated_at / หมดอายุตาม POST_CACHE_TTL แทน
+RECOMMENDER_URL = os.getenv('RECOMMENDER_URL')
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN')
+if not RECOMMENDER_URL:
+    print("RECOMMENDER_URL is not set, post cache invalidation is disabled")
+
+
+def invalidate_post_cache(post_id):
+    """แจ้งบริการแนะนำโพสต์ให้ล้างแถวโพสต์ที่ cache ไว้ (ไม่ให้ความผิดพลาดกระทบการอัปเดตโพสต์)"""
+    if not RECOMMENDER_URL:
+        return
+    try:
+        response = requests.post(f"{RECOMMENDER_URL}/ai/posts/{post_id}/invalidate",
+                                 headers={"X-Internal-Token": INTERNAL_API_TOKEN or ""}, timeout=1)
+        if response.status_code != 200:
+            print(f"Post cache invalidation for post {post_id} failed: HTTP {response.status_code}")
+    except requests.RequestException as e:
+        print(f"Error invalidating post cache for post {post_id}: {e}")
+
+
+# ฟังก์ชันสำหรับเซ็นเซอร์คำหยาบในหลายฟิลด์ (จำแนกคำของทุกฟิลด์ในครั้งเดียว)
 def apply_profanity_filter(*fields):
-    return [censor_profanity(field) for field in fields]
+    with tokenization_job('apply_profanity_filter'):
+        return censor_profanity_batch(fields)
+
+
+# ฟังก์ชันสำหรับตรวจสอบภาพทั้งหมดของ request (decode จาก bytes ในหน่วยความจำ ใช้ผลตรวจที่ cache ไว้ของภาพซ้ำ)
+def check_and_save_photos(photos):
+    """
+    photos: list ของ (ชื่อไฟล์เดิม, bytes ของไฟล์)
+    คืน URL ของภาพที่บันทึก หรือ None หากพบภาพโป๊ (ภาพจะถูกบันทึกเมื่อผ่านการตรวจทั้งหมดเท่านั้น)
+    ไฟล์ถูกตั้งชื่อตาม content hash: ภาพเดียวกันถูกเก็บครั้งเดียว และไฟล์ต่างกันที่ชื่อเดิมซ้ำกันไม่ทับกัน
+    """
+    results = moderate_images([data for _, data in photos])
+    if any(is_nude for _, is_nude in results):
+        return None
+
+    photo_urls = []
+    for (original_name, data), (digest, _) in zip(photos, results):
+        extension = os.path.splitext(secure_filename(original_name))[1].lower() or '.jpg'
+        filename = f'{digest[:32]}{extension}'
+        photo_path = os.path.join(UPLOAD_FOLDER, filename)
+        if not os.path.exists(photo_path):
+            # เขียนไฟล์ชั่วคราวแล้ว replace จึงไม่มีไฟล์ที่เขียนไม่ครบให้ถูกอ่าน
+            tmp_path = f'{photo_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, photo_path)
+        photo_urls.append(f'/uploads/{filename}')
+    return photo_urls
+
+
+# ตรวจสอบและบันทึกโพสต์ใหม่จาก draft (ข้อมูลของฟอร์มและไฟล์ที่อ่านไว้แล้ว) ใช้ทั้งแบบ sync และใน moderation_queue
+def moderate_and_create_post(timer, draft):
+    """คืน (body, HTTP status) ของผลการสร้างโพสต์ พร้อมจับเวลาแต่ละขั้นใน timer"""
+    # เซ็นเซอร์คำหยาบในเนื้อหา
+    with timer.stage('profanity'):
+        censored_content, censored_title, censored_product_name = apply_profanity_filter(
+            draft['content'], draft['Title'], draft['ProductName'])
+
+    # ตรวจสอบภาพโป๊
+    with timer.stage('images'):
+        photo_urls = check_and_save_photos(draft['photos'])
+    if photo_urls is None:
+        return {"error": "พบภาพโป๊ กรุณาลบภาพดังกล่าวออกจากโพสต์"}, 400
+
+    # เก็บ URL ของวิดีโอ
+    video_urls = [f'/uploads/{secure_filename(filename)}' for filename in draft['videos']]
+
+    # บันทึกลงฐานข้อมูล
+    with timer.stage('database'), db_lock, connection.cursor() as cursor:
+        query = """
+            INSERT INTO posts (user_id, content, video_url, photo_url, CategoryID, Title, ProductName)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        cursor.execute(query, (draft['user_id'], censored_content, json.dumps(video_urls),
+                               json.dumps(photo_urls), draft['category'], censored_title, censored_product_name))
+        connection.commit()
+        post_id = cursor.lastrowid
+
+    return {
+        "message": "โพสต์ถูกสร้างสำเร็จ",
+        "post_id": post_id,
+        "user_id": draft['user_id'],
+        "content": censored_content,
+        "category": draft['category'],
+        "Title": censored_title,
+        "ProductName": censored_product_name,
+        "photo_urls": photo_urls,
+        "video_urls": video_urls
+    }, 201
 
 
 # ฟังก์ชันสำหรับสร้างโพสต์
 @app.route('/ai/posts/create', methods=['POST'])
 def create_post():
     try:
-        user_id = request.form.get('user_id')
-        content = request.form.get('content')
-        category = request.form.get('category')
-        title = request.form.get('Title')
-        product_name = request.form.get('ProductName')
-        photos = request.files.getlist('photo')
-        videos = request.files.getlist('video')
-
-        # เซ็นเซอร์คำหยาบในเนื้อหา
-        censored_content, censored_title, censored_product_name = apply_profanity_filter(
-            content, title, product_name)
+        draft = {
+            "user_id": request.form.get('user_id'),
+            "content": request.form.get('content'),
+            "category": request.form.get('category'),
+            "Title": request.form.get('Title'),
+            "ProductName": request.form.get('ProductName'),
+            "photos": [(photo.filename, photo.read()) for photo in request.files.getlist('photo')],
+            "videos": [video.filename for video in request.files.getlist('video')],
+        }
 
-        # ตรวจสอบภาพโป๊
-        photo_urls = []
-        for photo in photos:
-            photo_path = os.path.join(UPLOAD_FOLDER, secure_filename(photo.filename))
-            photo.save(photo_path)
-            if predict_image(photo_path):  # ตรวจสอบว่าภาพเป็นโป๊หรือไม่
-                os.remove(photo_path)  # ลบภาพที่ไม่เหมาะสม
-                return jsonify({"error": "พบภาพโป๊ กรุณาลบภาพดังกล่าวออกจากโพสต์"}), 400
-            photo_urls.append(f'/uploads/{secure_filename(photo.filename)}')
-
-        # เก็บ URL ของวิดีโอ
-        video_urls = [f'/uploads/{secure_filename(video.filename)}' for video in videos]
-
-        # บันทึกลงฐานข้อมูล
-        with connection.cursor() as cursor:
-            query = """
-                INSERT INTO posts (user_id, content, video_url, photo_url, CategoryID, Title, ProductName)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            cursor.execute(query, (user_id, censored_content, json.dumps(video_urls),
-                                   json.dumps(photo_urls), category, censored_title, censored_product_name))
-            connection.commit()
+        # แบบ async: ตอบ job id ทันที แล้วให้ client ถามผลที่ /ai/moderation/jobs/<job_id>
+        if request.form.get('async', MODERATION_ASYNC) == '1':
+            try:
+                job_id = moderation_queue.submit(moderate_and_create_post, draft)
+            except QueueFull as e:
+                return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
+            return jsonify({"job_id": job_id, "status": "queued",
+                            "status_url": f"/ai/moderation/jobs/{job_id}"}), 202
 
-        return jsonify({
-            "message": "โพสต์ถูกสร้างสำเร็จ",
-            "user_id": user_id,
-            "content": censored_content,
-            "category": category,
-            "Title": censored_title,
-            "ProductName": censored_product_name,
-            "photo_urls": photo_urls,
-            "video_urls": video_urls
-        }), 201
+        timer = StageTimer()
+        body, status_code = moderate_and_create_post(timer, draft)
+        print(f"[moderation] create_post {status_code}: "
+              + ", ".join(f"{name} {ms:.1f} ms" for name, ms in timer.stages.items()))
+        return jsonify(body), status_code
 
     except Exception as e:
         print(f"Error in create_post: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+# สถานะของงานตรวจสอบแบบ async (queued / running / done / failed) พร้อมผลลัพธ์และเวลาของแต่ละขั้น
+@app.route('/ai/moderation/jobs/<job_id>', methods=['GET'])
+def moderation_job(job_id):
+    job = moderation_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job), 200
+
+
 # ฟังก์ชันสำหรับอัปเดตโพสต์
 @app.route('/ai/posts/<int:id>', methods=['PUT'])
 def update_post(id):
@@ -111,13 +201,10 @@ def update_post(id):
         video_urls = existing_videos if isinstance(existing_videos, list) else []
 
         # ตรวจสอบภาพใหม่
-        for photo in photos:
-            photo_path = os.path.join(UPLOAD_FOLDER, secure_filename(photo.filename))
-            photo.save(photo_path)
-            if predict_image(photo_path):  # ตรวจสอบว่าภาพเป็นโป๊หรือไม่
-                os.remove(photo_path)  # ลบภาพที่ไม่เหมาะสม
-                return jsonify({"error": "พบภาพโป๊ กรุณาลบภาพดังกล่าวออกจากโพสต์"}), 400
-            photo_urls.append(f'/uploads/{secure_filename(photo.filename)}')
+        new_photo_urls = check_and_save_photos([(photo.filename, photo.read()) for photo in photos])
+        if new_photo_urls is None:
+            return jsonify({"error": "พบภาพโป๊ กรุณาลบภาพดังกล่าวออกจากโพสต์"}), 400
+        photo_urls.extend(new_photo_urls)
 
         # บันทึกวิดีโอใหม่
         for video in videos:
@@ -130,7 +217,7 @@ def update_post(id):
         video_urls_json = json.dumps(video_urls)
 
         # อัปเดตโพสต์ในฐานข้อมูล
-        with connection.cursor() as cursor:
+        with db_lock, connection.cursor() as cursor:
             query = """
                 UPDATE posts
                 SET content = %s, Title = %s, ProductName = %s, CategoryID = %s, 
@@ -145,6 +232,8 @@ def update_post(id):
             if cursor.rowcount == 0:
                 return jsonify({"error": "Post not found or you are not the owner"}), 404
 
+        invalidate_post_cache(id)
+
         return jsonify({
             "message": "โพสต์ถูกอัปเดตสำเร็จ",
             "post_id": id,
@@ -162,6 +251,12 @@ def update_post(id):
         return jsonify({"error": str(e)}), 500
 
 
+# ตัวนับของการเซ็นเซอร์คำหยาบ (lexicon / cache / model) และ cache ผลตรวจภาพ เพื่อดูว่าลดงานของโมเดลได้เท่าไร
+@app.route('/ai/moderation/stats', methods=['GET'])
+def moderation_stats():
+    return jsonify({"profanity": profanity_stats(), "tokenizer": tokenizer.stats(), "images": verdict_cache.stats(),
+                    "queue": moderation_queue.stats()})
+
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5005)
@@ -0,0 +1,108 @@
+import os
+import time
+import argparse
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from recommender import RecommenderState, rank_recommendations, SERVING_ALPHA, SERVING_BETA
+from recommendation_store import RECOMMENDATION_STORE_DIR, RecommendationStore, interaction_fingerprint
+
+# คำนวณ top-N ของผู้ใช้ทุกคนล่วงหน้า แล้วเขียนลง RecommendationStore ให้ /ai/recommend อ่าน
+# รันหลัง train โมเดลใหม่ (เช่นจาก cron):  python batch_recommend.py --top-n 1000 --incremental
+
+_worker = {}
+
+
+def _init_worker(candidates, svd_scorer, alpha, beta, top_n):
+    # ส่ง CandidateSet/SVD ไปยังแต่ละ worker ครั้งเดียว ไม่ใช่ทุก chunk
+    _worker.update(candidates=candidates, svd_scorer=svd_scorer, alpha=alpha, beta=beta, top_n=top_n)
+
+
+def _rank_chunk(user_ids, interactions):
+    """จัดอันดับผู้ใช้หนึ่งกลุ่ม คืนตาราง (ผู้ใช้ x N) เติมด้วย -1 และจำนวนโพสต์จริงของแต่ละคน"""
+    top_n = _worker['top_n']
+    post_ids = np.full((len(user_ids), top_n), -1, dtype=np.int64)
+    lengths = np.zeros(len(user_ids), dtype=np.int32)
+    for i, (user_id, user_interactions) in enumerate(zip(user_ids, interactions)):
+        ranked = rank_recommendations(
+            user_id, _worker['candidates'], _worker['svd_scorer'], user_interactions,
+            alpha=_worker['alpha'], beta=_worker['beta'], limit=top_n
+        )
+        post_ids[i, :len(ranked)] = ranked
+        lengths[i] = len(ranked)
+    return post_ids, lengths
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run_batch(path=RECOMMENDATION_STORE_DIR, top_n=1000, workers=None, chunk_size=200, incremental=False,
+              alpha=SERVING_ALPHA, beta=SERVING_BETA):
+    """
+    จัดอันดับผู้ใช้ที่มีการโต้ตอบทุกคนด้วย process pool แล้วเขียนผลเป็นรอบใหม่ของ store
+    incremental=True: ใช้ผลเดิมของผู้ใช้ที่โมเดลเวอร์ชันเดิมและไม่มีการโต้ตอบใหม่ คำนวณเฉพาะคนที่เปลี่ยน
+    """
+    started = time.perf_counter()
+    snapshot = RecommenderState().refresh()
+
+    user_ids = np.fromiter(snapshot.user_interactions.keys(), dtype=np.int64, count=len(snapshot.user_interactions))
+    fingerprints = np.array([interaction_fingerprint(snapshot.interactions_for(user_id)) for user_id in user_ids],
+                            dtype=np.int64)
+    post_ids = np.full((len(user_ids), top_n), -1, dtype=np.int64)
+    lengths = np.zeros(len(user_ids), dtype=np.int32)
+    computed_at = np.zeros(len(user_ids), dtype=np.float64)
+
+    # ผลเดิมที่ยังใช้ได้: เวอร์ชันโมเดล ชุดโพสต์ และ N เท่าเดิม และลายนิ้วมือการโต้ตอบไม่เปลี่ยน
+    reuse = np.zeros(len(user_ids), dtype=bool)
+    previous = RecommendationStore.load(path) if incremental else None
+    if (previous is not None and previous.version == snapshot.catalog_version and previous.top_n == top_n
+            and len(previous)):
+        positions = np.searchsorted(previous.user_ids, user_ids).clip(max=len(previous) - 1)
+        reuse = (previous.user_ids[positions] == user_ids) & (previous.fingerprints[positions] == fingerprints)
+        post_ids[reuse] = previous.post_ids[positions[reuse]]
+        lengths[reuse] = previous.lengths[positions[reuse]]
+        computed_at[reuse] = previous.computed_at[positions[reuse]]
+
+    pending = np.flatnonzero(~reuse)
+    print(f"[batch] catalog version {snapshot.catalog_version}: {len(user_ids)} users, "
+          f"{int(reuse.sum())} unchanged, {len(pending)} to rank (top {top_n})")
+
+    ranking_started = time.perf_counter()
+    chunks = list(_chunks(pending, chunk_size))
+    with ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(snapshot.candidates, snapshot.svd_scorer, alpha, beta, top_n)
+    ) as pool:
+        futures = [
+            pool.submit(_rank_chunk, user_ids[chunk].tolist(),
+                        [snapshot.interactions_for(user_id) for user_id in user_ids[chunk].tolist()])
+            for chunk in chunks
+        ]
+        for chunk, future in zip(chunks, futures):
+            post_ids[chunk], lengths[chunk] = future.result()
+            computed_at[chunk] = time.time()
+    ranking_seconds = time.perf_counter() - ranking_started
+
+    run = RecommendationStore.write(path, snapshot.catalog_version, top_n, user_ids, post_ids, lengths, fingerprints,
+                                    computed_at)
+    users_per_second = len(pending) / ranking_seconds if ranking_seconds > 0 else 0.0
+    print(f"[batch] ranked {len(pending)} users in {ranking_seconds:.2f}s ({users_per_second:.1f} users/sec), "
+          f"wrote run {run} in {time.perf_counter() - started:.2f}s total")
+    return {"run": run, "users": len(user_ids), "ranked": len(pending), "reused": int(reuse.sum()),
+            "seconds": ranking_seconds, "users_per_second": users_per_second}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute top-N recommendations for all users")
+    parser.add_argument('--path', default=RECOMMENDATION_STORE_DIR)
+    parser.add_argument('--top-n', type=int, default=int(os.getenv('RECOMMEND_RANK_WINDOW', '1000')))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=200)
+    parser.add_argument('--incremental', action='store_true',
+                        help="rank only users whose interactions changed since the last run")
+    args = parser.parse_args()
+    run_batch(args.path, args.top_n, args.workers, args.chunk_size, args.incremental)
@@ -0,0 +1,116 @@
+import time
+import argparse
+import threading
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+
+from advice_scraper import make_chrome_driver, fetch_advice_page, parse_advice_products
+from browser_pool import BrowserPool
+
+# ทดสอบ browser pool กับหน้าค้นหาจำลองของ Advice บนเครื่อง (ไม่ต้องเชื่อมต่อเว็บจริง)
+# หน้าจำลองใส่รายการสินค้าด้วย JavaScript หลัง --render-ms เหมือนหน้าจริง แล้วค้นหาพร้อมกันหลาย request
+# เทียบแบบเดิม (browser เดียวที่ทุก request ใช้ร่วมกัน + time.sleep(2)) กับ pool ที่รอจนรายการสินค้าปรากฏ
+#   python bench_browser_pool.py --searches 8 --pool-size 2 --render-ms 300
+
+FIXTURE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>search</title></head>
+<body><div id="products"></div>
+<script>
+setTimeout(function () {{
+  document.getElementById('products').innerHTML = `
+    <div class="item" item-name="Apple iPhone 15 Pro 128GB">
+      <a class="product-item-link" href="/product/iphone-15-pro-128">iPhone 15 Pro</a>
+      <div class="sales-price sales-price-font">39,900</div>
+    </div>
+    <div class="item" item-name="Apple iPhone 15 Pro Max 256GB">
+      <a class="product-item-link" href="/product/iphone-15-pro-max-256">iPhone 15 Pro Max</a>
+      <div class="sales-price sales-price-font">48,900</div>
+    </div>
+    <div class="item" item-name="Apple iPhone 15 128GB">
+      <a class="product-item-link" href="/product/iphone-15-128">iPhone 15</a>
+      <div class="sales-price sales-price-font">32,900</div>
+    </div>`;
+}}, {render_ms});
+</script></body></html>
+"""
+
+
+def start_fixture_server(render_ms):
+    page = FIXTURE_PAGE.format(render_ms=render_ms).encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search?keyword={{keyword}}"
+
+
+def run_shared_driver(search_url, searches):
+    """แบบเดิม: driver เดียวของทั้งโปรเซส request พร้อมกันใช้ร่วมกัน และรอด้วย time.sleep(2)"""
+    driver = make_chrome_driver()
+    counts = []
+
+    def search(i):
+        driver.get(search_url.format(keyword=f'iphone%2015%20pro%20{i}'))
+        time.sleep(2)
+        counts.append(len(parse_advice_products(driver.page_source, 'iphone 15 pro')))
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=searches) as executor:
+            list(executor.map(search, range(searches)))
+        return time.perf_counter() - started, counts
+    finally:
+        driver.quit()
+
+
+def run_pool(search_url, searches, pool_size):
+    pool = BrowserPool(make_chrome_driver, size=pool_size, checkout_timeout=60)
+    counts = []
+
+    def search(i):
+        with pool.session() as driver:
+            html = fetch_advice_page(driver, f'iphone 15 pro {i}', search_url=search_url)
+        counts.append(len(parse_advice_products(html, 'iphone 15 pro')))
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=searches) as executor:
+            list(executor.map(search, range(searches)))
+        return time.perf_counter() - started, counts, pool.stats()
+    finally:
+        pool.close()
+
+
+def main(searches, pool_size, render_ms):
+    server, search_url = start_fixture_server(render_ms)
+    try:
+        shared_seconds, shared_counts = run_shared_driver(search_url, searches)
+        pool_seconds, pool_counts, stats = run_pool(search_url, searches, pool_size)
+    finally:
+        server.shutdown()
+
+    # ทุกการค้นหาต้องเจอ iPhone 15 Pro ทั้งสองรุ่นในหน้าจำลอง
+    print(f"{'mode':<14} {'searches':>8} {'wall (s)':>9} {'complete':>9}")
+    print(f"{'shared+sleep':<14} {searches:>8} {shared_seconds:>9.2f} {shared_counts.count(2):>9}")
+    print(f"{'pool+wait':<14} {searches:>8} {pool_seconds:>9.2f} {pool_counts.count(2):>9}")
+    print(f"pool stats: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exercise the browser pool against a local Advice search fixture")
+    parser.add_argument('--searches', type=int, default=8)
+    parser.add_argument('--pool-size', type=int, default=2)
+    parser.add_argument('--render-ms', type=int, default=300, help="delay before the fixture renders its products")
+    args = parser.parse_args()
+    main(args.searches, args.pool_size, args.render_ms)
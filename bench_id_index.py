@@ -0,0 +1,68 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from id_index import IdIndex
+
+# เปรียบเทียบต้นทุนต่อ request ของการหาแถวของโพสต์ผู้สมัครทุกโพสต์
+# แบบเดิม: data.index[data['post_id'] == post_id] ต่อโพสต์ (O(N) ต่อโพสต์ = O(N^2) ต่อ request)
+# แบบใหม่: IdIndex สร้างครั้งเดียวต่อการโหลดข้อมูล แล้วค้นหาทั้งชุดในครั้งเดียว (O(N) ต่อ request)
+
+
+def make_data(n_posts, seed=42):
+    rng = np.random.default_rng(seed)
+    post_ids = rng.permutation(n_posts * 10)[:n_posts] + 1
+    return pd.DataFrame({
+        'post_id': post_ids,
+        'NormalizedEngagement': rng.random(n_posts),
+    })
+
+
+def mask_scan(data, candidate_ids):
+    scores = []
+    for post_id in candidate_ids:
+        idx = data.index[data['post_id'] == post_id].tolist()
+        scores.append(data['NormalizedEngagement'].iloc[idx[0]] if idx else 0)
+    return np.asarray(scores, dtype=np.float64)
+
+
+def id_index_lookup(data, index, candidate_ids):
+    engagement = data['NormalizedEngagement'].to_numpy()[index.rows]
+    return index.take(engagement, candidate_ids)
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    print(f"{'posts':>8} {'mask scan (ms)':>16} {'id index (ms)':>15} {'speedup':>9}")
+    previous = None
+    for n_posts in sizes:
+        data = make_data(n_posts)
+        candidate_ids = data['post_id'].sample(frac=1.0, random_state=0).to_numpy()
+        index = IdIndex(data['post_id'])
+
+        assert np.allclose(mask_scan(data, candidate_ids[:200]), id_index_lookup(data, index, candidate_ids[:200]))
+
+        scan_seconds = best_of(lambda: mask_scan(data, candidate_ids), repeat=1)
+        index_seconds = best_of(lambda: id_index_lookup(data, index, candidate_ids))
+        print(f"{n_posts:>8} {scan_seconds * 1000:>16.2f} {index_seconds * 1000:>15.3f} {scan_seconds / index_seconds:>8.0f}x")
+
+        if previous is not None:
+            growth = n_posts / previous[0]
+            print(f"{'':>8} x{growth:.0f} posts -> mask scan x{scan_seconds / previous[1]:.1f},"
+                  f" id index x{index_seconds / previous[2]:.1f}")
+        previous = (n_posts, scan_seconds, index_seconds)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 2000, 4000, 8000]
+    main(sizes)
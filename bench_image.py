@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+from imageAI import model_image, load_image_array, predict_images
+
+# เปรียบเทียบเวลาตรวจสอบภาพของโพสต์หนึ่งโพสต์ (ค่าเริ่มต้น 10 ภาพจาก ./uploads)
+# - per-photo: แบบเดิม บันทึกไฟล์ลงดิสก์ แล้ว decode ภาพเต็มและ model.predict ทีละภาพ
+# - batched: บันทึกไฟล์แล้ว predict_images จาก path (decode ภาพเต็ม) ต้องได้ผลเหมือน per-photo
+# - in-memory: แบบที่ aicensor ใช้ decode จาก bytes ในหน่วยความจำ (JPEG แบบลดความละเอียด) ไม่เขียนดิสก์
+#   การ decode แบบลดความละเอียดได้ pixel ต่างจากเดิมเล็กน้อย จึงรายงานจำนวนภาพที่ผลตรงกันแทนการบังคับให้เท่ากัน
+#   python bench_image.py [จำนวนภาพ] [โฟลเดอร์ภาพ]
+
+
+def predict_image_per_photo(data, path):
+    """แบบเดิม: photo.save แล้ว load ภาพเต็มจากดิสก์ และ model.predict ด้วย batch ขนาด 1"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    img_array = np.expand_dims(load_image_array(path, reduced=False), axis=0)
+    prediction = model_image.predict(img_array, verbose=0)
+    return bool(prediction[0][0] > 0.5)
+
+
+def predict_batched_from_disk(photos, paths):
+    for data, path in zip(photos, paths):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return predict_images(paths, reduced=False)
+
+
+def predict_in_memory(photos):
+    return predict_images([io.BytesIO(data) for data in photos])
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(n_photos, folder):
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+    if not names:
+        raise SystemExit(f"no images in {folder}")
+    photos = []
+    for i in range(n_photos):
+        with open(os.path.join(folder, names[i % len(names)]), 'rb') as f:
+            photos.append(f.read())
+
+    with tempfile.TemporaryDirectory(prefix='bench-image-') as workdir:
+        paths = [os.path.join(workdir, f'{i}_{names[i % len(names)]}') for i in range(n_photos)]
+
+        # warm up ทุกเส้นทาง (สร้าง graph ของ Keras ครั้งแรก) ก่อนจับเวลา
+        predict_image_per_photo(photos[0], paths[0])
+        predict_images(paths[:1])
+
+        expected, per_photo_seconds = best_of(
+            lambda: [predict_image_per_photo(data, path) for data, path in zip(photos, paths)], repeat=3)
+        batched, batched_seconds = best_of(lambda: predict_batched_from_disk(photos, paths), repeat=3)
+        if batched != expected:
+            raise SystemExit("batched verdicts differ from per-photo verdicts")
+        in_memory, in_memory_seconds = best_of(lambda: predict_in_memory(photos), repeat=3)
+
+        _, full_decode_seconds = best_of(lambda: [load_image_array(path, reduced=False) for path in paths], repeat=3)
+        _, reduced_decode_seconds = best_of(lambda: [load_image_array(io.BytesIO(data)) for data in photos], repeat=3)
+
+    written_mb = sum(len(data) for data in photos) / (1024 * 1024)
+    agree = sum(a == b for a, b in zip(in_memory, expected))
+    print(f"{'path':<10} {'total (ms)':>11} {'speedup':>8} {'disk write (MB)':>16} {'flagged':>8}")
+    for label, seconds, disk, verdicts in (('per-photo', per_photo_seconds, written_mb, expected),
+                                           ('batched', batched_seconds, written_mb, batched),
+                                           ('in-memory', in_memory_seconds, 0.0, in_memory)):
+        print(f"{label:<10} {seconds * 1000:>11.1f} {per_photo_seconds / seconds:>7.1f}x {disk:>16.2f}"
+              f" {sum(verdicts):>8}")
+    print(f"decode only: full {full_decode_seconds * 1000:.1f} ms, reduced {reduced_decode_seconds * 1000:.1f} ms"
+          f" for {len(photos)} photos; in-memory verdicts agree on {agree}/{len(photos)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10, sys.argv[2] if len(sys.argv) > 2 else 'uploads')
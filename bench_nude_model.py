@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+# เปรียบเทียบการ serve โมเดลตรวจภาพโป๊แบบ Keras (float32) กับ TFLite (int8) บน CPU
+# แต่ละโมเดลรันในโปรเซสแยก เพื่อให้เวลา import และหน่วยความจำสูงสุด (peak RSS) เป็นของโมเดลนั้นเท่านั้น
+# ความแม่นยำเทียบบน validation split ได้จาก: python createnudeai.py --tflite
+#   python bench_nude_model.py nude_classifier_model.h5 nude_classifier_int8.tflite --photos 10
+
+
+def peak_rss_mb():
+    # ru_maxrss เป็น KB บน Linux และเป็น bytes บน macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(folder, n_photos, repeat):
+    """ทำงานในโปรเซสลูก (IMAGE_MODEL ถูกตั้งไว้แล้ว): import imageAI แล้วจับเวลาตรวจภาพหนึ่งโพสต์"""
+    started = time.perf_counter()
+    import imageAI
+    import_seconds = time.perf_counter() - started
+
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+    paths = [os.path.join(folder, names[i % len(names)]) for i in range(n_photos)]
+    arrays = [imageAI.load_image_array(path) for path in paths]
+
+    imageAI.predict_arrays(arrays[:1])  # warm up
+    timings = {}
+    for label, batch in (('single_ms', arrays[:1]), ('post_ms', arrays)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            verdicts = imageAI.predict_arrays(batch)
+        timings[label] = (time.perf_counter() - start) * 1000 / repeat
+    print(json.dumps({"import_seconds": import_seconds, **timings, "flagged": sum(verdicts),
+                      "peak_rss_mb": peak_rss_mb()}))
+
+
+def main(models, folder, n_photos, repeat):
+    print(f"{'model':<32} {'import (s)':>10} {'1 photo (ms)':>13} {f'{n_photos} photos (ms)':>15}"
+          f" {'peak RSS (MB)':>14} {'flagged':>8}")
+    for model_file in models:
+        command = [sys.executable, os.path.abspath(__file__), '--child', '--folder', folder,
+                   '--photos', str(n_photos), '--repeat', str(repeat)]
+        process = subprocess.run(command, env={**os.environ, 'IMAGE_MODEL': model_file},
+                                 capture_output=True, text=True)
+        if process.returncode != 0:
+            error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else process.returncode
+            print(f"{model_file:<32} failed: {error}")
+            continue
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        print(f"{model_file:<32} {result['import_seconds']:>10.2f} {result['single_ms']:>13.2f}"
+              f" {result['post_ms']:>15.2f} {result['peak_rss_mb']:>14.0f} {result['flagged']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Keras and int8 TFLite nudity models on CPU")
+    parser.add_argument('models', nargs='*', default=['nude_classifier_model.h5', 'nude_classifier_int8.tflite'])
+    parser.add_argument('--folder', default='uploads')
+    parser.add_argument('--photos', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.folder, args.photos, args.repeat)
+    else:
+        main(args.models, args.folder, args.photos, args.repeat)
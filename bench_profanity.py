@@ -0,0 +1,104 @@
+import sys
+import time
+
+import numpy as np
+
+from thai_tokenizer import tokenize
+from profanityAI import model_profanity, vectorizer_profanity, censor_profanity, profanity_stats, _mask
+from profanity_lexicon import TokenClassifier
+
+# เปรียบเทียบ throughput (tokens/sec) บนโพสต์ยาวภาษาไทยและภาษาอังกฤษ
+# - per-token: แบบเดิมที่ transform/predict ทีละคำ
+# - batched: predict ครั้งเดียวต่อโพสต์ (ไม่มี lexicon/cache) ต้องได้ผลเหมือน per-token ทุกตัวอักษร
+# - staged: censor_profanity ที่ใช้งานจริง (lexicon + cache คำตอบของโมเดล) พร้อมตัวนับของแต่ละขั้น
+#   python bench_profanity.py [จำนวน token ต่อโพสต์ ...]
+
+THAI_SENTENCES = [
+    'รีวิวหูฟังตัวนี้ใช้งานมาสองเดือน เสียงเบสแน่นมาก แต่ราคาค่อนข้างแพง',
+    'แบตเตอรี่อยู่ได้ทั้งวัน ชาร์จเร็ว หน้าจอสว่างมองเห็นชัดกลางแดด',
+    'ร้านส่งของช้ามาก แพ็คของมาไม่ดี กล่องบุบหมดเลย',
+    'กล้องถ่ายกลางคืนสวยกว่ารุ่นก่อนเยอะ แนะนำสำหรับคนชอบถ่ายรูป',
+    'โปรแกรมค้างบ่อยจนน่ารำคาญ ต้องรีสตาร์ทเครื่องทุกวัน',
+]
+
+ENGLISH_SENTENCES = [
+    'I have been using this laptop for two months and the keyboard feels great. ',
+    'Battery life is decent but the fan gets loud when gaming. ',
+    'The seller shipped it late and the box was damaged, really annoying experience. ',
+    'Camera quality at night is much better than the previous model. ',
+    'Customer support never answered my emails, what a waste of time. ',
+]
+
+
+def profanity_words(path='profanity_words.xlsx'):
+    """คำหยาบจากชุดข้อมูลที่ใช้ train (ถ้าอ่านได้) เพื่อให้โพสต์มีคำที่ต้องเซ็นเซอร์ปนอยู่ด้วย"""
+    try:
+        import pandas as pd
+        sheets = pd.read_excel(path, sheet_name=['Thai_Profanity', 'English_Profanity'])
+    except Exception as e:
+        print(f"skip profanity words ({e})")
+        return [], []
+    return [sheet['word'].dropna().astype(str).tolist() for sheet in sheets.values()]
+
+
+def make_post(sentences, words, n_tokens, seed, separator=''):
+    """ต่อประโยคตัวอย่าง (แทรกคำหยาบเป็นระยะ) จนได้จำนวน token ตามต้องการ"""
+    rng = np.random.default_rng(seed)
+    parts, tokens = [], 0
+    while tokens < n_tokens:
+        part = sentences[rng.integers(len(sentences))]
+        if words and rng.random() < 0.3:
+            part += separator + words[rng.integers(len(words))] + separator
+        parts.append(part)
+        tokens += len(tokenize(part))
+    return separator.join(parts)
+
+
+def censor_profanity_per_token(text):
+    """แบบเดิม: transform และ predict ทีละ token"""
+    words = tokenize(text)
+    return ''.join(
+        '*' * len(word) if model_profanity.predict(vectorizer_profanity.transform([word]))[0] == 1 else word
+        for word in words
+    )
+
+
+def censor_profanity_batched(text):
+    """predict ครั้งเดียวต่อโพสต์ โดยไม่ใช้ lexicon และ cache"""
+    words = tokenize(text)
+    return _mask(words, TokenClassifier(model_profanity, vectorizer_profanity, cache_size=0).classify(words))
+
+
+def best_of(fn, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(sizes):
+    thai_words, english_words = profanity_words()
+    print(f"{'post':<8} {'tokens':>7} {'unique':>7} {'per-token (tok/s)':>18} {'batched (tok/s)':>16}"
+          f" {'staged (tok/s)':>15} {'speedup':>8}")
+    for n_tokens in sizes:
+        for language, sentences, words, separator in (('thai', THAI_SENTENCES, thai_words, ''),
+                                                       ('english', ENGLISH_SENTENCES, english_words, ' ')):
+            text = make_post(sentences, words, n_tokens, seed=n_tokens, separator=separator)
+            tokens = tokenize(text)
+
+            expected, per_token_seconds = best_of(censor_profanity_per_token, text, repeat=1)
+            result, batched_seconds = best_of(censor_profanity_batched, text, repeat=3)
+            if result != expected:
+                raise SystemExit(f"{language} {n_tokens}: batched output differs from per-token output")
+            _, staged_seconds = best_of(censor_profanity, text, repeat=3)
+
+            print(f"{language:<8} {len(tokens):>7} {len(set(tokens)):>7} {len(tokens) / per_token_seconds:>18,.0f}"
+                  f" {len(tokens) / batched_seconds:>16,.0f} {len(tokens) / staged_seconds:>15,.0f}"
+                  f" {per_token_seconds / staged_seconds:>7.0f}x")
+    print(f"staged counters: {profanity_stats()}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [200, 2000])
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from generate_data import SCALES, generate, load_clean_view
+
+# วัดเวลาและหน่วยความจำสูงสุด (peak RSS) ของการ train และการแนะนำในแต่ละขนาดข้อมูล
+# แต่ละกรณีรันในโปรเซสแยก (peak RSS จึงเป็นของกรณีนั้นเท่านั้น) และใน working directory ชั่วคราว
+# (ไฟล์ .pkl ที่ถูกบันทึกระหว่าง train จะไม่ทับโมเดลจริง) ผลลัพธ์เขียนเป็น JSON เพื่อเทียบระหว่าง commit
+#   python bench_recommender.py small medium --output bench_results.json
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CASES = ['create_models', 'create_collaborative_model', 'create_content_based_model', 'recommend_hybrid',
+         'recommend_posts_for_user']
+
+
+def peak_rss_mb():
+    # ru_maxrss เป็น KB บน Linux และเป็น bytes บน macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    value = fn(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def sample_users(user_ids, n_users, seed=0):
+    user_ids = np.unique(np.asarray(user_ids))
+    return np.random.default_rng(seed).choice(user_ids, size=min(n_users, len(user_ids)), replace=False).tolist()
+
+
+def latency_summary(seconds):
+    seconds = np.asarray(seconds) * 1000
+    return {
+        "calls": len(seconds),
+        "mean_ms": float(seconds.mean()) if len(seconds) else 0.0,
+        "p50_ms": float(np.percentile(seconds, 50)) if len(seconds) else 0.0,
+        "p95_ms": float(np.percentile(seconds, 95)) if len(seconds) else 0.0,
+    }
+
+
+def case_create_models(data_path, options):
+    import create_models
+    data = load_clean_view(data_path)
+    _, collaborative_seconds = timed(create_models.create_collaborative_model, data)
+    _, content_seconds = timed(create_models.create_content_based_model, data)
+    return {"rows": len(data), "seconds": collaborative_seconds + content_seconds,
+            "collaborative_seconds": collaborative_seconds, "content_seconds": content_seconds}
+
+
+def case_create_collaborative_model(data_path, options):
+    from AI_Recommendation import create_collaborative_model
+    data = pd.read_pickle(os.path.join(data_path, 'collaborativeview.pkl'))
+    _, seconds = timed(create_collaborative_model, data, n_factors=options['n_factors'], n_epochs=options['n_epochs'])
+    return {"rows": len(data), "seconds": seconds}
+
+
+def case_create_content_based_model(data_path, options):
+    from AI_Recommendation import create_content_based_model
+    data = pd.read_pickle(os.path.join(data_path, 'contentbasedview.pkl'))
+    _, seconds = timed(create_content_based_model, data)
+    return {"rows": len(data), "seconds": seconds}
+
+
+def case_recommend_hybrid(data_path, options):
+    # เส้นทางเดียวกับ /ai/recommend: โมเดลถูก train ก่อน (ไม่นับเวลา) แล้ววัดเวลาต่อผู้ใช้
+    from AI_Recommendation import create_collaborative_model, create_content_based_model
+    from recommender import CATEGORIES, CandidateSet, recommend_hybrid, rank_recommendations
+    from svd_scoring import SVDBatchScorer
+
+    content_data = pd.read_pickle(os.path.join(data_path, 'contentbasedview.pkl'))
+    collaborative_data = pd.read_pickle(os.path.join(data_path, 'collaborativeview.pkl'))
+    model, _ = create_collaborative_model(collaborative_data, n_factors=options['n_factors'],
+                                          n_epochs=options['n_epochs'])
+    tfidf, knn, train_data, _, content_scores = create_content_based_model(content_data)
+    svd_scorer = SVDBatchScorer(model)
+
+    candidates, setup_seconds = timed(CandidateSet, collaborative_data, CATEGORIES, svd_scorer, content_scores)
+    interactions = collaborative_data.groupby('user_id')['post_id'].apply(list).to_dict()
+    users = sample_users(collaborative_data['user_id'], options['users'])
+
+    full, top_k = [], []
+    for user_id in users:
+        _, seconds = timed(recommend_hybrid, user_id, train_data, collaborative_data, model, knn, tfidf, CATEGORIES,
+                           alpha=0.8, beta=0.2, svd_scorer=svd_scorer, candidates=candidates)
+        full.append(seconds)
+        _, seconds = timed(rank_recommendations, user_id, candidates, svd_scorer, interactions.get(user_id, []),
+                           alpha=0.8, beta=0.2, limit=options['top_k'])
+        top_k.append(seconds)
+    return {"rows": len(collaborative_data), "candidate_setup_seconds": setup_seconds, "seconds": float(np.sum(full)),
+            "recommend_hybrid": latency_summary(full), f"rank_top_{options['top_k']}": latency_summary(top_k)}
+
+
+def case_recommend_posts_for_user(data_path, options):
+    # testai.py โหลดโมเดลของ create_models.py ตอน import จึง train ก่อน (ไม่นับเวลา) แล้วใช้ข้อมูลจำลองแทนฐานข้อมูล
+    import create_models
+    data = load_clean_view(data_path)
+    create_models.create_collaborative_model(data)
+    create_models.create_content_based_model(data)
+
+    import testai
+    testai.load_data_from_db = lambda: data
+    users = sample_users(data['user_id'], options['users'])
+    latencies = []
+    for user_id in users:
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull  # recommend_posts_for_user พิมพ์ทุกโพสต์
+            try:
+                _, seconds = timed(testai.recommend_posts_for_user, user_id)
+            finally:
+                sys.stdout = stdout
+        latencies.append(seconds)
+    return {"rows": len(data), "seconds": float(np.sum(latencies)), "recommend_posts_for_user": latency_summary(latencies)}
+
+
+def run_case(case, data_path, options, result_path):
+    """ทำงานในโปรเซสลูก: รันกรณีเดียวแล้วเขียนผลพร้อม peak RSS ลง result_path"""
+    sys.path.insert(0, REPO_DIR)
+    result = globals()[f'case_{case}'](data_path, options)
+    result['peak_rss_mb'] = peak_rss_mb()
+    with open(result_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def spawn_case(case, data_path, options, timeout):
+    """รันกรณีในโปรเซสใหม่ คืนผลลัพธ์ หรือสถานะ failed/timeout (เช่น หน่วยความจำไม่พอที่ขนาดใหญ่)"""
+    with tempfile.TemporaryDirectory(prefix=f'bench-{case}-') as workdir:
+        result_path = os.path.join(workdir, 'result.json')
+        command = [sys.executable, os.path.abspath(__file__), '--child', case, '--data-path', os.path.abspath(data_path),
+                   '--result', result_path, '--options', json.dumps(options)]
+        started = time.perf_counter()
+        try:
+            process = subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                     timeout=timeout, text=True)
+        except subprocess.TimeoutExpired:
+            return {"status": "timeout", "wall_seconds": time.perf_counter() - started}
+        wall_seconds = time.perf_counter() - started
+        if process.returncode != 0 or not os.path.exists(result_path):
+            return {"status": "failed", "returncode": process.returncode, "wall_seconds": wall_seconds,
+                    "error": process.stderr.strip().splitlines()[-1] if process.stderr.strip() else None}
+        with open(result_path, encoding='utf-8') as f:
+            return {"status": "ok", "wall_seconds": wall_seconds, **json.load(f)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(scales, cases, data_dir, output, options, timeout):
+    report = {
+        "commit": git_commit(),
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": options,
+        "results": [],
+    }
+    for scale in scales:
+        data_path = os.path.join(data_dir, scale)
+        if not os.path.exists(os.path.join(data_path, 'collaborativeview.pkl')):
+            generate(scale, data_dir)
+        for case in cases:
+            result = spawn_case(case, data_path, options, timeout)
+            report['results'].append({"scale": scale, **SCALES[scale], "case": case, **result})
+            summary = f"{result.get('seconds', 0):.2f}s, peak {result.get('peak_rss_mb', 0):.0f} MB" \
+                if result['status'] == 'ok' else result['status']
+            print(f"[bench] {scale:<6} {case:<28} {summary}")
+
+            # เขียนไฟล์หลังทุกกรณี ผลที่ได้แล้วจึงไม่หายหากกรณีถัดไปใช้เวลานาน
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark recommender training and serving at several data scales")
+    parser.add_argument('scales', nargs='*', help=f"any of {', '.join(SCALES)} (default: small)")
+    parser.add_argument('--cases', nargs='+', default=CASES, choices=CASES)
+    parser.add_argument('--data-dir', default='bench_data')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--users', type=int, default=20, help="users sampled for the serving cases")
+    parser.add_argument('--top-k', type=int, default=100)
+    parser.add_argument('--n-factors', type=int, default=150)
+    parser.add_argument('--n-epochs', type=int, default=70)
+    parser.add_argument('--timeout', type=float, default=3600, help="seconds per case")
+    parser.add_argument('--child', choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument('--data-path', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    parser.add_argument('--options', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if set(args.scales) - set(SCALES):
+        parser.error(f"unknown scale: {', '.join(sorted(set(args.scales) - set(SCALES)))}")
+
+    if args.child:
+        run_case(args.child, args.data_path, json.loads(args.options), args.result)
+    else:
+        options = {"users": args.users, "top_k": args.top_k, "n_factors": args.n_factors, "n_epochs": args.n_epochs}
+        main(args.scales or ['small'], args.cases, args.data_dir, args.output, options, args.timeout)
@@ -0,0 +1,173 @@
+import os
+import re
+import time
+import random
+import argparse
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from advice_scraper import parse_advice_products
+from html_extract import FRAGMENT_PARSER, PRODUCT_SCAN_LIMIT
+from store_search import parse_jib_products, parse_banana_products, filter_products_by_name
+
+# วัดความเร็วการ parse หน้าค้นหาของร้านจากไฟล์ HTML ที่บันทึกไว้ (ไม่ต้องเชื่อมต่อเว็บจริง)
+# เทียบแบบเดิม (BeautifulSoup tree ของทั้งหน้า + find_all) กับ html_extract ที่ parse เฉพาะ limit กล่องแรก
+# ใช้ไฟล์ <fixtures>/<ร้าน>.html (เช่นหน้าที่บันทึกจาก browser) หากไม่มีจะสร้างหน้าจำลองที่มี --products กล่อง
+#   python bench_scrapers.py --fixtures bench_data/html --products 200 --repeat 20
+
+PRODUCT_NAME = 'iphone 15 pro'
+MODELS = ['iPhone 15 Pro 128GB', 'iPhone 15 Pro Max 256GB', 'iPhone 15 128GB', 'Galaxy S24 Ultra 512GB',
+          'AirPods Pro 2', 'iPad Air 11 M2', 'MacBook Air 13 M3', 'Xiaomi 14T Pro']
+
+
+def _filler(rng):
+    # เมนู/แบนเนอร์/สคริปต์ที่อยู่รอบรายการสินค้าในหน้าจริง
+    links = ''.join(f'<li class="menu-item"><a href="/c/{i}">หมวด {i}</a></li>' for i in range(rng.randint(20, 40)))
+    return f'<nav><ul class="menu">{links}</ul></nav><script>window.__STATE__ = {{"page": {rng.randint(1, 9)}}};</script>'
+
+
+def _advice_page(n, rng):
+    items = ''.join(
+        f'<div class="item" item-name="Apple {MODELS[i % len(MODELS)]} #{i}"><div class="image"><img src="/i/{i}.jpg">'
+        f'</div><a class="product-item-link" href="/product/{i}">{MODELS[i % len(MODELS)]}</a>'
+        f'<div class="sales-price sales-price-font">{rng.randint(5, 60) * 1000:,}</div></div>'
+        for i in range(n)
+    )
+    return f'<html><head><title>Advice</title></head><body>{_filler(rng)}<div class="products">{items}</div></body></html>'
+
+
+def _jib_page(n, rng):
+    items = ''.join(
+        f'<div class="divboxpro col-md-3"><div class="row size_img center"><a href="https://www.jib.co.th/p/{i}">'
+        f'<img src="/i/{i}.jpg"></a></div><span class="promo_name">{MODELS[i % len(MODELS)]} #{i}</span>'
+        f'<p class="price_total">{rng.randint(5, 60) * 1000:,}</p></div>'
+        for i in range(n)
+    )
+    return f'<html><head><title>JIB</title></head><body>{_filler(rng)}<div class="row">{items}</div></body></html>'
+
+
+def _banana_page(n, rng):
+    # สินค้าที่ดูล่าสุดอยู่ก่อนรายการผลการค้นหา ใช้ tag/class เดียวกันแต่ต้องไม่ถูกนับ
+    recent = ''.join(
+        f'<a class="product-link verify product-item" href="/th/p/recent-{i}">'
+        f'<div class="product-name">{MODELS[0]} (recently viewed {i})</div><div class="product-price">฿1</div></a>'
+        for i in range(4)
+    )
+    items = ''.join(
+        f'<a class="product-link verify product-item" href="/th/p/{i}"><div class="product-image"><img src="/i/{i}.jpg">'
+        f'</div><div class="product-name">{MODELS[i % len(MODELS)]} #{i}</div>'
+        f'<div class="product-price">฿{rng.randint(5, 60) * 1000:,}</div></a>'
+        for i in range(n)
+    )
+    return (f'<html><head><title>Banana</title></head><body>{_filler(rng)}<div class="recently-viewed">{recent}</div>'
+            f'<div class="product-list">{items}</div></body></html>')
+
+
+# แบบเดิมก่อนมี html_extract (ใช้เป็น baseline และตรวจว่าผลลัพธ์ตรงกัน)
+def baseline_advice(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+    for product_div in soup.find_all('div', {'class': 'item'}):
+        product_name = product_div.get('item-name')
+        if product_name and re.search(PRODUCT_NAME, product_name.lower()):
+            price_tag = product_div.find('div', {'class': 'sales-price sales-price-font'})
+            product_price = price_tag.text.strip() if price_tag else "Price not found"
+            product_url = product_div.find('a', {'class': 'product-item-link'})['href']
+            products.append({"name": product_name, "price": product_price, "url": product_url})
+    return products
+
+
+def baseline_jib(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+    for product_container in soup.find_all('div', {'class': 'divboxpro'}):
+        product_name_tag = product_container.find('span', {'class': 'promo_name'})
+        found_product_name = product_name_tag.text.strip() if product_name_tag else "Product name not found"
+        if re.search(PRODUCT_NAME, found_product_name.lower()):
+            price_tag = product_container.find('p', {'class': 'price_total'})
+            product_price = price_tag.text.strip() + " บาท" if price_tag else "Price not found"
+            product_url = product_container.find('div', {'class': 'row size_img center'}).find('a')['href']
+            products.append({"name": found_product_name, "price": product_price, "url": product_url})
+    return filter_products_by_name(products, PRODUCT_NAME)
+
+
+def baseline_banana(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    product_list = soup.find('div', {'class': 'product-list'})
+    if not product_list:
+        return []
+    products = []
+    for item in product_list.find_all('a', {'class': 'product-link verify product-item'}):
+        product_url = "https://www.bnn.in.th" + item['href']
+        product_name_tag = item.find('div', {'class': 'product-name'})
+        found_product_name = product_name_tag.text.strip() if product_name_tag else "Product name not found"
+        if re.search(PRODUCT_NAME, found_product_name.lower()):
+            price_tag = item.find('div', {'class': 'product-price'})
+            product_price = price_tag.text.strip() if price_tag else "Price not found"
+            products.append({"name": found_product_name, "price": product_price, "url": product_url})
+    return filter_products_by_name(products, PRODUCT_NAME)
+
+
+STORES = {
+    'advice': (_advice_page, baseline_advice, lambda html, limit: parse_advice_products(html, PRODUCT_NAME, limit)),
+    'jib': (_jib_page, baseline_jib, lambda html, limit: parse_jib_products(html, PRODUCT_NAME, limit)),
+    'banana': (_banana_page, baseline_banana, lambda html, limit: parse_banana_products(html, PRODUCT_NAME, limit)),
+}
+
+
+def load_fixture(fixtures, store, products):
+    path = os.path.join(fixtures, f'{store}.html')
+    if not os.path.exists(path):
+        os.makedirs(fixtures, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(STORES[store][0](products, random.Random(products)))
+        print(f"generated {path} ({products} products)")
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def measure(parse, html, repeat):
+    """(pages/sec ที่ดีที่สุด, peak memory ที่ถูก allocate ระหว่าง parse หนึ่งหน้า (KB), ผลลัพธ์)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = parse(html)
+        best = min(best, time.perf_counter() - started)
+    # วัด allocation แยกจากการจับเวลา เพราะ tracemalloc ทำให้ช้าลงมาก
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return 1 / best, peak / 1024, result
+
+
+def main(fixtures, products, repeat, limit):
+    print(f"fragment parser: {FRAGMENT_PARSER}, scan limit: {limit}")
+    print(f"{'store':<8} {'KB':>7} {'mode':<14} {'pages/s':>9} {'peak KB':>9} {'found':>6}")
+    for store, (_, baseline, extract) in STORES.items():
+        html = load_fixture(fixtures, store, products)
+        modes = [
+            ('full tree', baseline),
+            ('extract all', lambda page: extract(page, None)),
+            (f'extract {limit}', lambda page: extract(page, limit)),
+        ]
+        expected = None
+        for mode, parse in modes:
+            pages_per_second, peak_kb, result = measure(parse, html, repeat)
+            if expected is None:
+                expected = result
+            elif mode == 'extract all' and result != expected:
+                raise SystemExit(f"{store}: extract_products output differs from the full-tree parser")
+            print(f"{store:<8} {len(html.encode('utf-8')) / 1024:>7.0f} {mode:<14} {pages_per_second:>9.1f}"
+                  f" {peak_kb:>9.0f} {len(result):>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark store search-page parsing on saved HTML fixtures")
+    parser.add_argument('--fixtures', default=os.path.join('bench_data', 'html'))
+    parser.add_argument('--products', type=int, default=200, help="product boxes in generated fixtures")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=PRODUCT_SCAN_LIMIT)
+    args = parser.parse_args()
+    main(args.fixtures, args.products, args.repeat, args.limit)
@@ -0,0 +1,152 @@
+import time
+import queue
+import threading
+
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """ไม่มี browser session ว่างภายในเวลาที่กำหนด"""
+
+
+class BrowserPool:
+    """
+    pool ของ browser session (เช่น headless Chrome ของ Selenium) จำนวนจำกัด สำหรับ request ที่ทำงานพร้อมกัน
+    - session(): ยืม session ไปใช้คนเดียวแล้วคืนเมื่อจบ with (รอไม่เกิน checkout_timeout วินาทีเมื่อไม่มี session ว่าง)
+    - session ถูกสร้างเมื่อจำเป็นเท่านั้น (ไม่เกิน size) และถูกตรวจว่ายังใช้งานได้ก่อนให้ยืม
+      session ที่ตาย (เช่น Chrome crash) หรือใช้ครบ max_uses ครั้งจะถูกปิดและสร้างใหม่แทน
+    """
+
+    def __init__(self, factory, size=2, checkout_timeout=30, max_uses=200):
+        self.factory = factory
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()  # ใช้ session ที่เพิ่งคืนก่อน (cache ของ browser ยังอุ่น)
+        self._uses = {}  # id(driver) -> จำนวนครั้งที่ถูกยืม
+        self._lock = threading.Lock()
+        self._live = 0
+        self._in_use = 0
+        self._started = time.time()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.retired = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    def _healthy(self, driver):
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _discard(self, driver, reason):
+        with self._lock:
+            self._live -= 1
+            if reason == 'recycled':
+                self.recycled += 1
+            elif reason == 'retired':
+                self.retired += 1
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing browser session: {e}")
+
+    def _checkout(self):
+        started = time.perf_counter()
+        deadline = started + self.checkout_timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    create = self._live < self.size
+                    if create:
+                        self._live += 1
+                if create:
+                    try:
+                        driver = self.factory()
+                    except Exception:
+                        with self._lock:
+                            self._live -= 1
+                        raise
+                    with self._lock:
+                        self.created += 1
+                        self._uses[id(driver)] = 0
+                    break
+                remaining = deadline - time.perf_counter()
+                try:
+                    # รอทีละช่วงสั้น ๆ เพื่อกลับไปสร้าง session ใหม่ได้หากมี session ถูกปิดทิ้งระหว่างรอ
+                    driver = self._idle.get(timeout=max(min(remaining, 0.5), 0))
+                except queue.Empty:
+                    if remaining > 0.5:
+                        continue
+                    with self._lock:
+                        self.timeouts += 1
+                    raise PoolTimeout(f"no browser session available within {self.checkout_timeout}s")
+            if self._healthy(driver):
+                break
+            self._discard(driver, 'recycled')
+
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.checkouts += 1
+            self._in_use += 1
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return driver
+
+    @contextmanager
+    def session(self):
+        driver = self._checkout()
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self.busy_seconds += time.perf_counter() - started
+                uses = self._uses.get(id(driver), 0)
+            # หลังเกิดข้อผิดพลาดตรวจก่อนว่า browser ยังใช้ได้ จะได้ไม่คืน session ที่ตายแล้วเข้า pool
+            if failed and not self._healthy(driver):
+                self._discard(driver, 'recycled')
+            elif uses >= self.max_uses:
+                self._discard(driver, 'retired')
+            else:
+                self._idle.put(driver)
+
+    def close(self):
+        """ปิด session ที่ว่างอยู่ทั้งหมด (เรียกตอนปิดโปรแกรม)"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait(), 'closed')
+            except queue.Empty:
+                return
+
+    def stats(self):
+        with self._lock:
+            uptime = time.time() - self._started
+            return {
+                "size": self.size,
+                "live": self._live,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "recycled": self.recycled,
+                "retired": self.retired,
+                "avg_wait_ms": round(self.wait_seconds * 1000 / self.checkouts, 1) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+                # สัดส่วนเวลาที่ session ถูกใช้งานเทียบกับความจุทั้งหมดของ pool ตั้งแต่เริ่ม
+                "utilization": round(self.busy_seconds / (self.size * uptime), 4) if uptime > 0 else 0.0,
+            }
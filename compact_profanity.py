@@ -0,0 +1,156 @@
+import re
+import pickle
+
+import numpy as np
+import scipy.sparse as sp
+
+COMPACT_MODEL_FILE = 'profanity_model_compact.npz'
+
+_white_spaces = re.compile(r"\s\s+")
+
+
+class CompactCharVectorizer:
+    """
+    TF-IDF แบบ char n-gram ที่ให้ผลเหมือน TfidfVectorizer(analyzer='char') ที่ fit แล้ว
+    เก็บเพียง vocabulary และ idf เป็น array จึงโหลดจาก .npz ได้โดยไม่ต้อง unpickle
+    """
+
+    def __init__(self, vocabulary, idf, ngram_range=(1, 3), lowercase=True, norm='l2'):
+        self.vocabulary = np.asarray(vocabulary)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+        self.lowercase = bool(lowercase)
+        self.norm = norm
+        self._index = {ngram: i for i, ngram in enumerate(self.vocabulary.tolist())}
+
+    @classmethod
+    def from_sklearn(cls, vectorizer):
+        if vectorizer.analyzer != 'char' or vectorizer.sublinear_tf or vectorizer.strip_accents or not vectorizer.use_idf:
+            raise ValueError("รองรับเฉพาะ TfidfVectorizer(analyzer='char') ที่ใช้ค่าเริ่มต้นของ tf/idf")
+        vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        return cls(vocabulary, vectorizer.idf_, vectorizer.ngram_range, vectorizer.lowercase, vectorizer.norm)
+
+    def _ngrams(self, text):
+        # ลำดับเดียวกับ sklearn _char_ngrams
+        if self.lowercase:
+            text = text.lower()
+        text = _white_spaces.sub(" ", text)
+        min_n, max_n = self.ngram_range
+        for n in range(min_n, min(max_n + 1, len(text) + 1)):
+            for i in range(len(text) - n + 1):
+                yield text[i:i + n]
+
+    def transform(self, texts):
+        """คืน CSR matrix (จำนวนข้อความ x vocabulary) แบบเดียวกับ TfidfVectorizer.transform"""
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            row = {}
+            for ngram in self._ngrams(text):
+                column = self._index.get(ngram)
+                if column is not None:
+                    row[column] = row.get(column, 0) + 1
+            indices.extend(row.keys())
+            counts.extend(row.values())
+            indptr.append(len(indices))
+
+        X = sp.csr_matrix(
+            (np.asarray(counts, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(self.vocabulary))
+        )
+        X.sort_indices()
+        X = X @ sp.diags(self.idf)
+        if self.norm == 'l2':
+            norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            X = sp.diags(1.0 / norms) @ X
+        return X.tocsr()
+
+
+class LinearProfanityModel:
+    """ตัวจำแนกเชิงเส้น (เช่น LogisticRegression) ที่เก็บเพียง coef/intercept: predict = X @ coef + intercept > 0"""
+
+    def __init__(self, coef, intercept, classes=(0, 1)):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(np.asarray(intercept).ravel()[0])
+        self.classes = np.asarray(classes)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        return cls(model.coef_, model.intercept_, model.classes_)
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef).ravel() + self.intercept
+
+    def predict(self, X):
+        return self.classes[(self.decision_function(X) > 0).astype(int)]
+
+
+def save_compact_model(model, vectorizer, path=COMPACT_MODEL_FILE):
+    """บันทึก LogisticRegression/LinearSVC + TfidfVectorizer ที่ train แล้วเป็น .npz (ไม่มี pickle)"""
+    compact_vectorizer = CompactCharVectorizer.from_sklearn(vectorizer)
+    compact_model = LinearProfanityModel.from_sklearn(model)
+    np.savez_compressed(
+        path,
+        vocabulary=compact_vectorizer.vocabulary.astype(str),
+        idf=compact_vectorizer.idf,
+        ngram_range=np.asarray(compact_vectorizer.ngram_range),
+        lowercase=np.asarray(compact_vectorizer.lowercase),
+        coef=compact_model.coef,
+        intercept=np.asarray([compact_model.intercept]),
+        classes=compact_model.classes,
+    )
+
+
+def load_compact_model(path=COMPACT_MODEL_FILE):
+    """โหลดโมเดลแบบ compact คืน (model, vectorizer) ในรูปแบบเดียวกับ profanity_model.pkl"""
+    with np.load(path, allow_pickle=False) as arrays:
+        vectorizer = CompactCharVectorizer(arrays['vocabulary'], arrays['idf'], arrays['ngram_range'],
+                                           bool(arrays['lowercase']))
+        model = LinearProfanityModel(arrays['coef'], arrays['intercept'], arrays['classes'])
+    return model, vectorizer
+
+
+def load_profanity_model(path):
+    """โหลดโมเดลคำหยาบจาก .npz (compact) หรือ .pkl (RandomForest เดิม) คืน (model, vectorizer)"""
+    if path.endswith('.npz'):
+        return load_compact_model(path)
+    with open(path, 'rb') as model_file:
+        return pickle.load(model_file)
+
+
+def compare_models(paths, words, labels, latency_tokens=500):
+    """
+    รายงานเทียบโมเดลแต่ละไฟล์: accuracy บน test set, เวลาโหลด, ขนาดไฟล์ และเวลา predict ต่อ token
+    (ทีละ token เหมือน censor_profanity แบบเดิม และแบบ batch)
+    """
+    import os
+    import time
+
+    words = list(words)
+    labels = np.asarray(labels)
+    sample = (words * (latency_tokens // max(len(words), 1) + 1))[:latency_tokens]
+    rows = []
+    for path in paths:
+        load_seconds = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            model, vectorizer = load_profanity_model(path)
+            load_seconds = min(load_seconds, time.perf_counter() - start)
+
+        accuracy = float((model.predict(vectorizer.transform(words)) == labels).mean()) if words else 0.0
+
+        start = time.perf_counter()
+        for word in sample:
+            model.predict(vectorizer.transform([word]))
+        single_us = (time.perf_counter() - start) * 1e6 / max(len(sample), 1)
+
+        start = time.perf_counter()
+        model.predict(vectorizer.transform(sample))
+        batch_us = (time.perf_counter() - start) * 1e6 / max(len(sample), 1)
+
+        rows.append((path, accuracy, load_seconds * 1000, os.path.getsize(path) / 1024, single_us, batch_us))
+
+    print(f"{'model':<32} {'accuracy':>9} {'load (ms)':>10} {'size (KB)':>10} {'per-token (us)':>15} {'batch (us/token)':>17}")
+    for path, accuracy, load_ms, size_kb, single_us, batch_us in rows:
+        print(f"{path:<32} {accuracy:>9.4f} {load_ms:>10.1f} {size_kb:>10.1f} {single_us:>15.1f} {batch_us:>17.2f}")
+    return rows
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from id_index import IdIndex
+
+CONTENT_SCORES_FILE = 'Content_Scores.npz'
+
+
+def neighborhood_scores(tfidf_vectors, knn, engagement, n_neighbors=20):
+    """หาเพื่อนบ้านของทุกแถวด้วย kneighbors ครั้งเดียว แล้วเฉลี่ย Engagement ของเพื่อนบ้าน"""
+    n_neighbors = min(n_neighbors, knn._fit_X.shape[0])
+    if tfidf_vectors.shape[0] == 0:
+        return np.empty(0, dtype=np.float32)
+    _, indices = knn.kneighbors(tfidf_vectors, n_neighbors=n_neighbors)
+    return np.asarray(engagement, dtype=np.float64)[indices].mean(axis=1).astype(np.float32)
+
+
+def original_label_scores(train_data, tfidf, knn, n_neighbors=20, text_column='Content',
+                          engagement_column='NormalizedEngagement'):
+    """
+    คะแนน Content-Based แบบ recommend_hybrid ต้นฉบับ (ใช้เทียบตัวชี้วัดกับของเดิมเท่านั้น)
+    ต้นฉบับหา label แรกของ post_id ใน train_data.index แล้วส่ง label นั้นให้ iloc เป็นตำแหน่ง
+    หลัง train_test_split label ไม่ต่อเนื่อง จึงได้เนื้อหาของแถวอื่น และ label ที่เกินจำนวนแถวทำให้ iloc โยน IndexError
+    คืน (ContentScoreTable, post_id ที่ต้นฉบับโยน IndexError) โพสต์กลุ่มหลังได้คะแนน 0
+    """
+    index = IdIndex(train_data['post_id'])
+    labels = train_data.index.to_numpy()[index.rows]
+    in_range = (labels >= 0) & (labels < len(train_data))
+    scores = np.zeros(len(index), dtype=np.float32)
+    if in_range.any():
+        contents = train_data[text_column].iloc[labels[in_range]].fillna('')
+        scores[in_range] = neighborhood_scores(tfidf.transform(contents), knn, train_data[engagement_column],
+                                               n_neighbors)
+    return ContentScoreTable(index.ids, scores, train_data[engagement_column]), index.ids[~in_range]
+
+
+class ContentScoreTable:
+    """
+    ตาราง post_id -> content_score ที่คำนวณไว้ล่วงหน้าตอน train
+    คะแนนขึ้นกับโพสต์เท่านั้น (ไม่ขึ้นกับผู้ใช้) จึงไม่ต้องคำนวณ kneighbors ใหม่ทุก request
+    """
+
+    def __init__(self, post_ids, scores, engagement):
+        self.post_ids = np.asarray(post_ids, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        # Engagement ของแถวที่ KNN ใช้ fit ใช้สำหรับคำนวณโพสต์ใหม่แบบ incremental
+        self.engagement = np.asarray(engagement, dtype=np.float32)
+        self._index = IdIndex(self.post_ids)
+
+    def __len__(self):
+        return len(self.post_ids)
+
+    @property
+    def nbytes(self):
+        return self.post_ids.nbytes + self.scores.nbytes + self.engagement.nbytes
+
+    @classmethod
+    def build(cls, post_ids, tfidf_vectors, knn, engagement, n_neighbors=20):
+        """สร้างตารางจากทุกแถว โดยใช้แถวแรกของแต่ละ post_id เหมือน recommend_hybrid เดิม"""
+        index = IdIndex(post_ids)
+        scores = neighborhood_scores(tfidf_vectors[index.rows], knn, engagement, n_neighbors)
+        return cls(index.ids, scores, engagement)
+
+    def scores_for(self, post_ids):
+        """คืนคะแนนของหลายโพสต์ในครั้งเดียว (0 สำหรับโพสต์ที่ไม่มีในตาราง)"""
+        return self._index.take(self.scores, post_ids, fill_value=0.0)
+
+    def missing(self, post_ids):
+        """คืน mask ของโพสต์ที่ยังไม่มีคะแนนในตาราง"""
+        return self._index.positions(post_ids) < 0
+
+    def update(self, post_ids, contents, tfidf, knn, n_neighbors=20):
+        """
+        เพิ่มคะแนนของโพสต์ใหม่ที่ยังไม่อยู่ในตาราง คำนวณเฉพาะโพสต์ใหม่ใน kneighbors ครั้งเดียว
+        คืนตารางใหม่ (ตารางเดิมไม่ถูกแก้ไข จึงใช้ร่วมกันระหว่าง thread ได้)
+        """
+        new_posts = pd.DataFrame({'post_id': np.asarray(post_ids), 'content': list(contents)})
+        new_posts = new_posts[self.missing(new_posts['post_id'])].drop_duplicates(subset='post_id')
+        if new_posts.empty:
+            return self
+        vectors = tfidf.transform(new_posts['content'].fillna(''))
+        scores = neighborhood_scores(vectors, knn, self.engagement, n_neighbors)
+        return ContentScoreTable(
+            np.concatenate([self.post_ids, new_posts['post_id'].to_numpy(dtype=np.int64)]),
+            np.concatenate([self.scores, scores]),
+            self.engagement
+        )
+
+    def save(self, path=CONTENT_SCORES_FILE):
+        np.savez(path, post_ids=self.post_ids, scores=self.scores, engagement=self.engagement)
+
+    @classmethod
+    def load(cls, path=CONTENT_SCORES_FILE):
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as arrays:
+            return cls(arrays['post_ids'], arrays['scores'], arrays['engagement'])
@@ -5,8 +5,7 @@ from surprise import SVD, Dataset, Reader
 import joblib
 
 # ฟังก์ชันสำหรับโหลดข้อมูลจาก CSV
-def load_data_from_csv():
-    file_path = 'clean_new_view.csv'  # แก้ไขให้ตรงกับที่อยู่ของไฟล์ CSV ของคุณ
+def load_data_from_csv(file_path='clean_new_view.csv'):  # แก้ไขให้ตรงกับที่อยู่ของไฟล์ CSV ของคุณ
     data = pd.read_csv(file_path)  # โหลดข้อมูลจาก CSV
     return data
 
@@ -47,7 +46,9 @@ def create_content_based_model(data):
     print("Content-Based Filtering model (TF-IDF) saved as 'tfidf_model.pkl', 'tfidf_matrix.pkl', and 'cosine_similarity.pkl'")
     return cosine_sim
 
-# เรียกใช้งานเพื่อสร้างโมเดล SVD และ TF-IDF
-data = load_data_from_csv()
-create_collaborative_model(data)
-create_content_based_model(data)
+# เรียกใช้งานเพื่อสร้างโมเดล SVD และ TF-IDF (import ไปใช้ได้โดยไม่ train ทันที เช่นใน bench_recommender.py)
+if __name__ == "__main__":
+    data = load_data_from_csv()
+    create_collaborative_model(data)
+    create_content_based_model(data)
+
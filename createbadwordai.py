@@ -1,11 +1,14 @@
+import sys
 import pandas as pd
 import gdown
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 from sklearn.utils import resample
 import pickle
+from compact_profanity import COMPACT_MODEL_FILE, save_compact_model, compare_models
 
 # ดาวน์โหลดไฟล์จาก Google Drive
 file_url = 'https://drive.google.com/uc?id=1Avgja02ufmpIWYlCoNzWEE0KgjHjPlB7'
@@ -95,3 +98,17 @@ try:
 except Exception as e:
     print(f"Error saving the model: {e}")
     exit(1)
+
+# สร้างโมเดลแบบ compact (ไม่บังคับ): python createbadwordai.py --compact
+# LogisticRegression บน char n-gram ชุดเดียวกัน บันทึกเป็น .npz แล้วพิมพ์รายงานเทียบกับ RandomForest
+# ใช้งานใน profanityAI ด้วย PROFANITY_MODEL=profanity_model_compact.npz
+if '--compact' in sys.argv:
+    try:
+        compact_model = LogisticRegression(C=10.0, class_weight='balanced', max_iter=1000)
+        compact_model.fit(X_train, y_train)
+        save_compact_model(compact_model, vectorizer, COMPACT_MODEL_FILE)
+        print(f"โมเดลแบบ compact ถูกบันทึกในไฟล์ '{COMPACT_MODEL_FILE}'")
+        compare_models(['profanity_model.pkl', COMPACT_MODEL_FILE], test_data['word'], test_data['label'])
+    except Exception as e:
+        print(f"Error training the compact model: {e}")
+        exit(1)
@@ -1,11 +1,13 @@
 import zipfile
 import os
+import sys
 import numpy as np
 from tensorflow.keras import layers, models
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 from PIL import Image
 from io import BytesIO
+from nude_tflite import TFLITE_MODEL_FILE, export_int8_tflite, compare_models
 
 # Step 1: ตั้งค่าโฟลเดอร์และไฟล์ ZIP
 nude_zip_path = "data/nude.zip"
@@ -81,3 +83,11 @@ print(classification_report(y_val, y_pred, target_names=['non_nude', 'nude']))
 
 print("\nConfusion Matrix:")
 print(confusion_matrix(y_val, y_pred))
+
+# ส่งออกโมเดลแบบ int8 สำหรับ CPU (ไม่บังคับ): python createnudeai.py --tflite
+# ใช้งานใน imageAI ด้วย IMAGE_MODEL=nude_classifier_int8.tflite (ติดตั้งเพียง tflite-runtime แทน TensorFlow ได้)
+if '--tflite' in sys.argv:
+    export_int8_tflite(model, x_train, TFLITE_MODEL_FILE)
+    print(f"\nโมเดล int8 ถูกบันทึกในไฟล์ '{TFLITE_MODEL_FILE}'")
+    print("\nFloat32 vs int8 on the validation set:")
+    compare_models(model, 'nude_classifier_model.h5', TFLITE_MODEL_FILE, x_val, y_val)
@@ -0,0 +1,145 @@
+import os
+import time
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from id_index import IdIndex
+
+# ตัวชี้วัดเดิม (คิดจากชุดโพสต์ที่แนะนำทั้งหมด) และตัวชี้วัดแบบจัดอันดับ @k
+SET_METRICS = ['Accuracy', 'Precision', 'Recall', 'F1']
+RANKING_METRICS = ['Precision@k', 'Recall@k', 'NDCG@k']
+
+
+class EvaluationData:
+    """
+    ข้อมูลของ test set ที่ไม่ขึ้นกับผู้ใช้ สร้างครั้งเดียวต่อการประเมิน
+    ผลลัพธ์ของแต่ละผู้ใช้เหมือน recommend_hybrid + evaluate_model ใน AI_Recommendation.py
+    แต่คำนวณจาก array ของโพสต์ที่ไม่ซ้ำกันแทนการสร้าง DataFrame ต่อผู้ใช้
+    """
+
+    def __init__(self, train_data, test_data, categories, svd_scorer, content_scores, relevant_items, alpha=0.50,
+                 user_column='owner_id'):
+        self.alpha = alpha
+        self.svd_scorer = svd_scorer
+        self.post_index = IdIndex(test_data['post_id'])
+        rows = self.post_index.positions(test_data['post_id'])
+        n_posts = len(self.post_index)
+
+        # recommend_hybrid เพิ่มแถวหนึ่งครั้งต่อหมวดหมู่ที่ตรง: นับจำนวนครั้งที่แต่ละโพสต์ถูกแนะนำ
+        present = [category for category in categories if category in test_data.columns]
+        category_counts = (test_data[present] == 1).sum(axis=1).to_numpy()
+        self.recommended_rows = np.bincount(rows, weights=category_counts, minlength=n_posts)
+        self.in_category = self.recommended_rows > 0
+
+        self.inner_items = svd_scorer.inner_item_ids(self.post_index.ids)
+        self.content_scores = content_scores.scores_for(self.post_index.ids)
+
+        # relevant items คำนวณครั้งเดียว (ไม่ขึ้นกับผู้ใช้)
+        self.relevant = np.zeros(n_posts, dtype=bool)
+        relevant_positions = self.post_index.positions(list(set(relevant_items)))
+        self.relevant[relevant_positions[relevant_positions >= 0]] = True
+        self.n_relevant = len(set(relevant_items))
+
+        # ตำแหน่งของโพสต์ใน test set ที่ผู้ใช้แต่ละคนเคยโต้ตอบใน train set
+        self.interacted = {}
+        for user_id, post_ids in train_data.groupby(user_column)['post_id']:
+            positions = self.post_index.positions(post_ids.unique())
+            self.interacted[user_id] = positions[positions >= 0]
+
+    def evaluate_users(self, user_ids, k=10):
+        """
+        ประเมินผู้ใช้หนึ่งกลุ่ม คืน (ตารางตัวชี้วัด, top-k ของแต่ละผู้ใช้, tp/fp/fn รวม)
+        ตารางตัวชี้วัดมีคอลัมน์ตาม SET_METRICS + RANKING_METRICS
+        """
+        collab_scores = self.svd_scorer.score_users(user_ids, inner_items=self.inner_items)
+        final_scores = self.alpha * collab_scores + (1 - self.alpha) * self.content_scores
+
+        metrics = np.zeros((len(user_ids), len(SET_METRICS) + len(RANKING_METRICS)))
+        top_k = np.full((len(user_ids), k), -1, dtype=np.int64)
+        totals = np.zeros(3, dtype=np.int64)
+        discounts = 1.0 / np.log2(np.arange(2, k + 2))
+        ideal_dcg = discounts[:min(k, self.n_relevant)].sum()
+
+        for i, user_id in enumerate(user_ids):
+            recommended = self.in_category.copy()
+            recommended[self.interacted.get(user_id, [])] = False
+
+            # ตัวชี้วัดเดิม: tp/fp/fn เป็นเซต, accuracy หารด้วยความยาวของรายการแนะนำ (รวมแถวซ้ำต่อหมวดหมู่)
+            n_recommended = int(recommended.sum())
+            tp = int((recommended & self.relevant).sum())
+            fp = n_recommended - tp
+            fn = self.n_relevant - tp
+            n_rows = self.recommended_rows[recommended].sum()
+            accuracy = tp / n_rows if n_rows > 0 else 0
+            precision = tp / n_recommended if n_recommended > 0 else 0
+            recall = tp / self.n_relevant if self.n_relevant > 0 else 0
+            f1 = (2 * precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+
+            # ตัวชี้วัดแบบจัดอันดับ: เลือก k โพสต์ที่คะแนนสูงสุดด้วย partial selection
+            candidates = np.flatnonzero(recommended)
+            scores = final_scores[i, candidates]
+            if k < len(candidates):
+                selected = np.argpartition(-scores, k - 1)[:k]
+                candidates, scores = candidates[selected], scores[selected]
+            ranked = candidates[np.argsort(-scores, kind='stable')]
+            hits = self.relevant[ranked]
+            precision_k = hits.sum() / k
+            recall_k = hits.sum() / self.n_relevant if self.n_relevant > 0 else 0
+            ndcg_k = (discounts[:len(hits)] @ hits) / ideal_dcg if ideal_dcg > 0 else 0
+
+            metrics[i] = [accuracy, precision, recall, f1, precision_k, recall_k, ndcg_k]
+            top_k[i, :len(ranked)] = ranked
+            totals += [tp, fp, fn]
+
+        return metrics, top_k, totals
+
+
+_worker = {}
+
+
+def _init_worker(data, k):
+    _worker.update(data=data, k=k)
+
+
+def _evaluate_chunk(user_ids):
+    return _worker['data'].evaluate_users(user_ids, _worker['k'])
+
+
+def evaluate_all(data, user_ids, k=10, workers=None, batch_size=256):
+    """
+    ประเมินผู้ใช้ทุกคนเป็นกลุ่ม (batch_size คนต่อการคูณเมทริกซ์) กระจายไปยัง process pool
+    คืน dict ของค่าเฉลี่ยตัวชี้วัด, coverage@k, tp/fp/fn รวม และตัวชี้วัดรายผู้ใช้
+    """
+    started = time.perf_counter()
+    user_ids = list(user_ids)
+    batches = [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+
+    if workers == 1 or len(batches) <= 1:
+        results = [data.evaluate_users(batch, k) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(data, k)) as pool:
+            results = list(pool.map(_evaluate_chunk, batches))
+
+    names = SET_METRICS + RANKING_METRICS
+    metrics = np.vstack([result[0] for result in results]) if results else np.zeros((0, len(names)))
+    top_k = np.vstack([result[1] for result in results]) if results else np.zeros((0, k), dtype=np.int64)
+    totals = np.sum([result[2] for result in results], axis=0) if results else np.zeros(3, dtype=np.int64)
+
+    # coverage@k: สัดส่วนโพสต์ใน test set ที่ถูกแนะนำใน top-k ของผู้ใช้อย่างน้อยหนึ่งคน
+    recommended = np.unique(top_k[top_k >= 0])
+    coverage = len(recommended) / len(data.post_index) if len(data.post_index) else 0.0
+
+    seconds = time.perf_counter() - started
+    return {
+        "users": len(user_ids),
+        "k": k,
+        "averages": {name: float(value) for name, value in
+                     zip(names, metrics.mean(axis=0) if len(metrics) else np.zeros(len(names)))},
+        "coverage": coverage,
+        "tp": int(totals[0]), "fp": int(totals[1]), "fn": int(totals[2]),
+        "per_user": metrics,
+        "seconds": seconds,
+        "users_per_second": len(user_ids) / seconds if seconds > 0 else 0.0,
+    }
@@ -0,0 +1,170 @@
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from recommender import CATEGORIES
+
+# สร้างข้อมูลจำลองตาม schema ของ simulated_data.csv ในขนาดต่าง ๆ สำหรับ bench_recommender.py
+# ความนิยมของโพสต์และความถี่ของผู้ใช้เป็นแบบ long-tail (Zipf / lognormal) เหมือนข้อมูลจริง
+SCALES = {
+    'tiny': {'users': 100, 'posts': 1_000, 'interactions': 10_000},  # ขนาดเดียวกับ simulated_data.csv
+    'small': {'users': 1_000, 'posts': 10_000, 'interactions': 100_000},
+    'medium': {'users': 5_000, 'posts': 50_000, 'interactions': 1_000_000},
+    'large': {'users': 10_000, 'posts': 100_000, 'interactions': 10_000_000},
+}
+
+ACTION_TYPES = ['click', 'like', 'comment', 'share']
+ACTION_WEIGHTS = [0.55, 0.25, 0.12, 0.08]
+ACTION_SCORES = {'click': 1, 'like': 3, 'comment': 4, 'share': 5}
+
+SIMULATED_COLUMNS = ['user_id', 'post_id', 'total_interaction_score', 'post_content', 'post_title', 'category_name',
+                     'user_age', 'action_types', 'interaction_time']
+
+# คำที่ใช้สร้างเนื้อหาโพสต์ ให้ TF-IDF มีคำที่แยกหมวดหมู่ได้จริง
+VOCABULARY = ['รีวิว', 'แนะนำ', 'ราคา', 'คุ้มค่า', 'แบตเตอรี่', 'หน้าจอ', 'กล้อง', 'เสียง', 'ดีไซน์', 'ประสิทธิภาพ',
+              'review', 'price', 'battery', 'screen', 'camera', 'sound', 'design', 'performance', 'budget', 'premium']
+
+
+def zipf_weights(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def make_posts(n_posts, n_users, rng):
+    """โพสต์แต่ละโพสต์มีผู้เขียน หมวดหมู่ 1-3 หมวด (หมวดแรกเป็นหมวดหลัก) และเนื้อหาที่มีคำของหมวดหมู่นั้น"""
+    post_ids = np.arange(1, n_posts + 1)
+    category_popularity = zipf_weights(len(CATEGORIES), 0.8)
+    primary = rng.choice(len(CATEGORIES), size=n_posts, p=category_popularity)
+    extra = rng.choice(len(CATEGORIES), size=(n_posts, 2), p=category_popularity)
+    extra_count = rng.choice(3, size=n_posts, p=[0.6, 0.3, 0.1])
+
+    memberships = np.zeros((n_posts, len(CATEGORIES)), dtype=np.int8)
+    memberships[np.arange(n_posts), primary] = 1
+    for slot in range(2):
+        has_slot = extra_count > slot
+        memberships[np.flatnonzero(has_slot), extra[has_slot, slot]] = 1
+
+    words = rng.choice(VOCABULARY, size=(n_posts, 8))
+    categories = np.asarray(CATEGORIES)
+    content = [
+        f"Content of post {post_id} {category} " + ' '.join(row)
+        for post_id, category, row in zip(post_ids, categories[primary], words)
+    ]
+    return pd.DataFrame({
+        'post_id': post_ids,
+        'owner_id': rng.choice(n_users, size=n_posts, p=zipf_weights(n_users, 1.0)) + 1,
+        'post_title': [f"Post Title {post_id}" for post_id in post_ids],
+        'post_content': content,
+        'category_name': categories[primary],
+        'updated_at': pd.Timestamp('2024-12-31') - pd.to_timedelta(rng.integers(0, 365 * 24, n_posts), unit='h'),
+    }), memberships
+
+
+def make_interactions(n_users, n_posts, n_interactions, posts, rng, chunk_size=1_000_000):
+    """สร้าง interaction เป็นช่วง ๆ เพื่อจำกัดหน่วยความจำ คืน generator ของ DataFrame ตาม SIMULATED_COLUMNS"""
+    # ความถี่ของผู้ใช้เป็น lognormal, ความนิยมของโพสต์เป็น Zipf (โพสต์ยอดนิยมไม่กี่โพสต์ได้ interaction ส่วนใหญ่)
+    user_activity = rng.lognormal(mean=0.0, sigma=1.2, size=n_users)
+    user_activity /= user_activity.sum()
+    post_popularity = zipf_weights(n_posts, 1.05)[rng.permutation(n_posts)]
+    user_ages = rng.integers(18, 61, size=n_users)
+
+    post_content = posts['post_content'].to_numpy()
+    post_title = posts['post_title'].to_numpy()
+    category_name = posts['category_name'].to_numpy()
+    action_scores = np.array([ACTION_SCORES[action] for action in ACTION_TYPES])
+    start = pd.Timestamp('2022-01-01').value // 1000
+    end = pd.Timestamp('2025-01-01').value // 1000
+
+    for offset in range(0, n_interactions, chunk_size):
+        size = min(chunk_size, n_interactions - offset)
+        users = rng.choice(n_users, size=size, p=user_activity)
+        items = rng.choice(n_posts, size=size, p=post_popularity)
+        actions = rng.choice(len(ACTION_TYPES), size=size, p=ACTION_WEIGHTS)
+        yield pd.DataFrame({
+            'user_id': users + 1,
+            'post_id': items + 1,
+            'total_interaction_score': action_scores[actions],
+            'post_content': post_content[items],
+            'post_title': post_title[items],
+            'category_name': category_name[items],
+            'user_age': user_ages[users],
+            'action_types': np.asarray(ACTION_TYPES)[actions],
+            'interaction_time': pd.to_datetime(rng.integers(start, end, size=size), unit='us').astype(str),
+        }, columns=SIMULATED_COLUMNS)
+
+
+def to_content_view(interactions, posts, memberships):
+    """ข้อมูลแบบ contentbasedview: หนึ่งแถวต่อโพสต์ พร้อม Content, Comments, PostEngagement และหมวดหมู่แบบ one-hot"""
+    engagement = interactions.groupby('post_id')['total_interaction_score'].sum()
+    view = pd.DataFrame({
+        'post_id': posts['post_id'],
+        'owner_id': posts['owner_id'],
+        'Content': posts['post_title'] + ' ' + posts['post_content'],
+        'Comments': np.where(posts['post_id'] % 3 == 0, 'ดีมาก แนะนำเลย', None),
+        'PostEngagement': posts['post_id'].map(engagement).fillna(0).to_numpy(),
+        'updated_at': posts['updated_at'],
+    })
+    return pd.concat([view, pd.DataFrame(memberships, columns=CATEGORIES)], axis=1)
+
+
+def to_collaborative_view(interactions, memberships):
+    """
+    ข้อมูลแบบ collaborativeview: หนึ่งแถวต่อ (user_id, post_id) คะแนนอยู่ในคอลัมน์หมวดหมู่ของโพสต์
+    ใช้คะแนนสูงสุดของคู่นั้น (1-5) เพื่อให้ช่วงคะแนนเท่ากับ simulated_data.csv ไม่ว่าข้อมูลจะใหญ่แค่ไหน
+    """
+    pairs = interactions.groupby(['user_id', 'post_id'], sort=False)['total_interaction_score'].max().reset_index()
+    scores = memberships[pairs['post_id'].to_numpy() - 1].astype(np.float32) * \
+        pairs['total_interaction_score'].to_numpy(dtype=np.float32)[:, None]
+    return pd.concat([pairs[['user_id', 'post_id']], pd.DataFrame(scores, columns=CATEGORIES)], axis=1)
+
+
+def to_clean_view(interactions, posts):
+    """ข้อมูลแบบ clean_new_view ที่ create_models.py และ testai.py ใช้"""
+    view = interactions.copy()
+    view['updated_at'] = posts['updated_at'].to_numpy()[view['post_id'].to_numpy() - 1]
+    return view
+
+
+def generate(scale, out_dir, seed=42):
+    """สร้างข้อมูลทุกรูปแบบของขนาดที่กำหนดลงใน out_dir/<scale>/ คืน path ของโฟลเดอร์"""
+    sizes = SCALES[scale]
+    rng = np.random.default_rng(seed)
+    path = os.path.join(out_dir, scale)
+    os.makedirs(path, exist_ok=True)
+    started = time.perf_counter()
+
+    posts, memberships = make_posts(sizes['posts'], sizes['users'], rng)
+    csv_path = os.path.join(path, 'simulated_data.csv')
+    chunks = []
+    for i, chunk in enumerate(make_interactions(sizes['users'], sizes['posts'], sizes['interactions'], posts, rng)):
+        chunk.to_csv(csv_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        chunks.append(chunk[['user_id', 'post_id', 'total_interaction_score']])
+    interactions = pd.concat(chunks, ignore_index=True)
+
+    to_content_view(interactions, posts, memberships).to_pickle(os.path.join(path, 'contentbasedview.pkl'))
+    to_collaborative_view(interactions, memberships).to_pickle(os.path.join(path, 'collaborativeview.pkl'))
+    print(f"[generate] {scale}: {sizes['users']} users, {sizes['posts']} posts, {len(interactions)} interactions "
+          f"-> {path} in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def load_clean_view(path):
+    """โหลด simulated_data.csv ของขนาดนั้นในรูปแบบ clean_new_view (เพิ่ม updated_at ของโพสต์)"""
+    interactions = pd.read_csv(os.path.join(path, 'simulated_data.csv'))
+    content = pd.read_pickle(os.path.join(path, 'contentbasedview.pkl'))
+    return to_clean_view(interactions, content[['post_id', 'updated_at']])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic recommender data at several scales")
+    parser.add_argument('scales', nargs='*', help=f"any of {', '.join(SCALES)} (default: small)")
+    parser.add_argument('--out', default='bench_data')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if set(args.scales) - set(SCALES):
+        parser.error(f"unknown scale: {', '.join(sorted(set(args.scales) - set(SCALES)))}")
+    for scale in args.scales or ['small']:
+        generate(scale, args.out, args.seed)
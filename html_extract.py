@@ -0,0 +1,168 @@
+import os
+import re
+
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+
+# lxml (ถ้าติดตั้ง) parse เร็วกว่า html.parser หลายเท่า ใช้ html.parser ของ Python แทนเมื่อไม่มี
+try:
+    from lxml import etree
+    FRAGMENT_PARSER = 'lxml'
+except ImportError:
+    etree = None
+    FRAGMENT_PARSER = 'html.parser'
+
+# จำนวนกล่องสินค้าแรกของหน้าค้นหาที่ถูกดึงข้อมูล (สินค้าที่ตรงคำค้นมักอยู่ต้นหน้า)
+PRODUCT_SCAN_LIMIT = int(os.getenv('PRODUCT_SCAN_LIMIT', '30'))
+_simple_selector = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)((?:\.[\w-]+)*)$')
+
+
+def _parse_simple_selector(selector):
+    match = _simple_selector.match(selector)
+    if match is None:
+        raise ValueError(f"selector must look like tag.class.class, got {selector!r}")
+    return match.group(1).lower(), frozenset(filter(None, match.group(2).split('.')))
+
+
+def _has_classes(classes, class_attr):
+    return classes.issubset((class_attr or '').split())
+
+
+class SelectorSpec:
+    """
+    selector ของหน้าค้นหาของร้านหนึ่ง
+    container: selector ของกล่องสินค้าแต่ละชิ้นในรูป tag.class.class (เช่น 'div.item')
+    fields: ชื่อฟิลด์ -> 'css selector' (ข้อความภายใน), 'css selector@attr' หรือ '@attr' (attribute ของกล่องเอง)
+    scope: (ไม่บังคับ) selector แบบ tag.class ของส่วนของหน้าที่มีรายการผลการค้นหา
+           กล่องที่อยู่นอก scope (เช่น carousel หรือ "สินค้าที่ดูล่าสุด") ไม่ถูกนับ
+    """
+
+    def __init__(self, container, fields, scope=None):
+        self.container = container
+        self.tag, self.classes = _parse_simple_selector(container)
+        self.scope = scope
+        self.scope_tag, self.scope_classes = _parse_simple_selector(scope) if scope else (None, None)
+        self.fields = {}
+        for name, selector in fields.items():
+            css, _, attribute = selector.partition('@')
+            self.fields[name] = (css.strip() or None, attribute or None)
+
+
+class _ScanDone(Exception):
+    pass
+
+
+class _ContainerScanner(HTMLParser):
+    """
+    (ใช้เมื่อไม่มี lxml) ไล่ token ของหน้า HTML โดยไม่สร้าง tree เก็บ HTML ดิบของกล่องสินค้าที่ตรง spec
+    และหยุดทันทีเมื่อได้ครบ limit กล่อง (ส่วนที่เหลือของหน้าไม่ถูก parse)
+    """
+
+    def __init__(self, html, spec, limit):
+        super().__init__(convert_charrefs=False)
+        self.html = html
+        self.spec = spec
+        self.limit = limit
+        self.fragments = []
+        self._line_starts = [0] + [match.end() for match in re.finditer('\n', html)]
+        self._depth = 0
+        self._start = None
+        self._scope_depth = 0  # > 0 เมื่ออยู่ภายใน scope (นับ tag ชนิดเดียวกับ scope ที่ซ้อนอยู่)
+
+    def _offset(self):
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if tag == self.spec.scope_tag:
+            if self._scope_depth:
+                self._scope_depth += 1
+            elif _has_classes(self.spec.scope_classes, dict(attrs).get('class')):
+                self._scope_depth = 1
+        if tag != self.spec.tag:
+            return
+        if self._depth:
+            self._depth += 1  # tag ชนิดเดียวกันที่ซ้อนอยู่ในกล่อง
+            return
+        if self.spec.scope and not self._scope_depth:
+            return
+        if _has_classes(self.spec.classes, dict(attrs).get('class')):
+            self._depth = 1
+            self._start = self._offset()
+
+    def handle_endtag(self, tag):
+        if tag == self.spec.scope_tag and self._scope_depth:
+            self._scope_depth -= 1
+        if tag != self.spec.tag or not self._depth:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            end = self.html.find('>', self._offset()) + 1
+            self.fragments.append(self.html[self._start:end])
+            if len(self.fragments) >= self.limit:
+                raise _ScanDone
+
+    def scan(self):
+        try:
+            self.feed(self.html)
+            self.close()
+        except _ScanDone:
+            return self.fragments
+        if self._depth:
+            self.fragments.append(self.html[self._start:])  # กล่องสุดท้ายที่ไม่มี tag ปิด
+        return self.fragments
+
+
+def _lxml_matches(element, spec):
+    if not _has_classes(spec.classes, element.get('class')):
+        return False
+    if spec.scope is None:
+        return True
+    return any(_has_classes(spec.scope_classes, ancestor.get('class'))
+               for ancestor in element.iterancestors(spec.scope_tag))
+
+
+def _scan_lxml(html, spec, limit, chunk_size=16384):
+    """แบบเดียวกับ _ContainerScanner แต่ใช้ pull parser ของ lxml (C) ป้อนหน้าทีละ chunk และหยุดเมื่อครบ limit"""
+    parser = etree.HTMLPullParser(events=('end',), tag=spec.tag)
+    fragments = []
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        for _, element in parser.read_events():
+            if _lxml_matches(element, spec):
+                fragments.append(etree.tostring(element, encoding='unicode', method='html', with_tail=False))
+                element.clear()
+                if len(fragments) >= limit:
+                    return fragments
+    parser.close()
+    for _, element in parser.read_events():
+        if _lxml_matches(element, spec) and len(fragments) < limit:
+            fragments.append(etree.tostring(element, encoding='unicode', method='html', with_tail=False))
+    return fragments
+
+
+def _field(container, css, attribute):
+    target = container.select_one(css) if css else container
+    if target is None:
+        return None
+    if attribute:
+        return target.get(attribute)
+    return target.get_text().strip()
+
+
+def extract_products(html, spec, limit=PRODUCT_SCAN_LIMIT):
+    """
+    ดึงฟิลด์ตาม spec จากกล่องสินค้า limit กล่องแรกของหน้า (None = ทั้งหน้า) คืน list ของ dict (ฟิลด์ที่หาไม่พบเป็น None)
+    parse เฉพาะ HTML ของกล่องที่พบ แทนการสร้าง BeautifulSoup tree ของทั้งหน้า
+    """
+    limit = limit or float('inf')
+    fragments = _scan_lxml(html, spec, limit) if etree is not None else _ContainerScanner(html, spec, limit).scan()
+    if not fragments:
+        return []
+    # parse ทุกกล่องในครั้งเดียว: กล่องเป็น element ระดับบนสุดของเอกสารที่ต่อกัน
+    soup = BeautifulSoup(''.join(fragments), FRAGMENT_PARSER)
+    root = soup.body or soup
+    products = []
+    for container in root.find_all(spec.tag, recursive=False):
+        products.append({name: _field(container, css, attribute) for name, (css, attribute) in spec.fields.items()})
+    return products
@@ -4,6 +4,7 @@ from sklearn.metrics import mean_squared_error
 from surprise import SVD, Dataset, Reader
 from surprise.model_selection import train_test_split, cross_validate
 from math import sqrt
+from id_index import IdIndex
 
 # ฟังก์ชันสำหรับโหลดข้อมูลจาก CSV
 def load_data_from_csv():
@@ -12,13 +13,17 @@ def load_data_from_csv():
     return data
 
 # ฟังก์ชันสำหรับการแนะนำโพสต์ด้วย Hybrid Model
-def hybrid_recommendations(user_id, post_id, alpha=0.75, collaborative_model=None, cosine_sim=None, data=None):
+def hybrid_recommendations(user_id, post_id, alpha=0.75, collaborative_model=None, cosine_sim=None, data=None, post_index=None):
     # คาดการณ์จาก Collaborative Filtering
     collab_pred = collaborative_model.predict(user_id, post_id).est
     
-    # คำนวณ Content-Based Recommendations
+    # คำนวณ Content-Based Recommendations (ส่ง post_index ที่สร้างไว้แล้วมาได้ เพื่อไม่ต้องสแกนหา post_id)
+    if post_index is None:
+        post_index = IdIndex(data['post_id'])
     try:
-        idx = data.index[data['post_id'] == post_id][0]
+        idx = post_index.row(post_id)
+        if idx < 0:
+            raise IndexError(post_id)
         sim_scores = list(enumerate(cosine_sim[idx]))
         sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
         sim_scores = sim_scores[1:11]
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+
+class IdIndex:
+    """
+    แผนที่ id (post_id / user_id) -> ตำแหน่งแบบ dense (0..n-1) สร้างครั้งเดียวต่อการโหลดข้อมูล
+    ใช้แทนการสแกน data['post_id'] == post_id ซึ่งเป็น O(N) ทุกครั้งที่ค้นหา
+    """
+
+    def __init__(self, ids):
+        ids = pd.Series(np.asarray(ids))
+        # แถวแรกของแต่ละ id (เหมือน data.index[data['post_id'] == post_id][0])
+        self.rows = np.flatnonzero(~ids.duplicated().to_numpy())
+        self.ids = ids.to_numpy()[self.rows]
+        self._index = pd.Index(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id_):
+        return id_ in self._index
+
+    def position(self, id_, default=-1):
+        """ตำแหน่ง dense ของ id เดียว (O(1) ผ่าน hash table)"""
+        try:
+            return self._index.get_loc(id_)
+        except KeyError:
+            return default
+
+    def positions(self, ids):
+        """ตำแหน่ง dense ของหลาย id ในครั้งเดียว (-1 สำหรับ id ที่ไม่รู้จัก)"""
+        return self._index.get_indexer(pd.Index(ids))
+
+    def row(self, id_, default=-1):
+        """ตำแหน่งแถวแรกในข้อมูลต้นฉบับของ id นี้"""
+        position = self.position(id_)
+        return self.rows[position] if position >= 0 else default
+
+    def take(self, values, ids, fill_value=0.0):
+        """ดึงค่าจาก array ที่เรียงตามตำแหน่ง dense สำหรับหลาย id (fill_value สำหรับ id ที่ไม่รู้จัก)"""
+        positions = self.positions(ids)
+        values = np.asarray(values)
+        if len(values) == 0:
+            return np.full(len(positions), fill_value, dtype=np.float64)
+        return np.where(positions >= 0, values[positions], fill_value)
@@ -1,20 +1,129 @@
-import tensorflow as tf
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
+import io
+import os
+import hashlib
+
 import numpy as np
+from PIL import Image
+from image_verdicts import IMAGE_VERDICT_FILE, ImageVerdictCache, content_hash, perceptual_hash
+from nude_tflite import TFLiteNudeClassifier
 
-# โหลดโมเดล TensorFlow
-model_image = tf.keras.models.load_model('nude_classifier_model.h5')
+IMAGE_SIZE = (128, 128)
+# IMAGE_MODEL=nude_classifier_int8.tflite ใช้โมเดล int8 (createnudeai.py --tflite) โดยไม่ต้อง import TensorFlow
+MODEL_FILE = os.getenv('IMAGE_MODEL', 'nude_classifier_model.h5')
 
-def predict_image(image_path):
+if MODEL_FILE.endswith('.tflite'):
+    model_image = TFLiteNudeClassifier(MODEL_FILE)
+    _forward = model_image.predict
+else:
+    # โหลดโมเดล TensorFlow
+    import tensorflow as tf
+    model_image = tf.keras.models.load_model(MODEL_FILE)
+
+    def _forward(batch):
+        # เรียกโมเดลโดยตรงแทน model.predict ซึ่งมี overhead คงที่สูงสำหรับ batch เล็ก ๆ ต่อ request
+        return model_image(batch, training=False).numpy()
+
+# เวอร์ชันของโมเดลคือ hash ของไฟล์ ผลตรวจใน cache ของโมเดลเดิม (หรือของโมเดลอีกแบบ) จึงไม่ถูกใช้หลัง train ใหม่
+with open(MODEL_FILE, 'rb') as model_file:
+    MODEL_VERSION = hashlib.blake2b(model_file.read(), digest_size=8).hexdigest()
+
+# IMAGE_PHASH_DISTANCE > 0 เปิดการจับภาพที่เกือบซ้ำด้วย perceptual hash (เช่น 4 จาก 64 bit)
+verdict_cache = ImageVerdictCache(os.getenv('IMAGE_VERDICT_CACHE', IMAGE_VERDICT_FILE), MODEL_VERSION,
+                                  phash_distance=int(os.getenv('IMAGE_PHASH_DISTANCE', '0')))
+
+
+def load_image_array(image, reduced=True):
     """
-    ตรวจสอบว่าภาพเป็นภาพโป๊หรือไม่
+    อ่านภาพเป็น array (128, 128, 3) ที่ normalize แล้ว จาก path หรือ file object (เช่น stream ของไฟล์ที่อัปโหลด)
+    reduced=True: JPEG ถูก decode แบบลดความละเอียด (1/2 ถึง 1/8) ให้ใกล้ 128x128 ที่สุดโดยไม่เล็กกว่า
+    แทนการ decode ภาพเต็มแล้วย่อ ซึ่งเร็วกว่ามากสำหรับภาพจากกล้องมือถือ
+    """
+    img = Image.open(image)
+    if reduced and img.format == 'JPEG':
+        img.draft('RGB', IMAGE_SIZE)
+    img = img.convert('RGB')
+    if img.size != IMAGE_SIZE:
+        img = img.resize(IMAGE_SIZE, Image.NEAREST)  # เหมือน load_img(target_size=...) ของ Keras
+    return np.asarray(img, dtype=np.float32) / 255.0  # Normalize
+
+
+def predict_images(images, reduced=True):
     """
+    ตรวจสอบภาพหลายภาพ (path หรือ file object) ด้วย forward pass เดียว
+    คืน list ของผลตามลำดับเดิม (True = ภาพโป๊, False = ภาพปกติ)
+    ภาพที่อ่านไม่ได้ถือเป็นภาพปกติ เหมือน predict_image เดิม
+    """
+    verdicts = [False] * len(images)
+    arrays, positions = [], []
+    for i, image in enumerate(images):
+        try:
+            arrays.append(load_image_array(image, reduced))
+            positions.append(i)
+        except Exception as e:
+            print(f"Error in predict_images ({getattr(image, 'filename', image)}): {e}")
+
+    if not arrays:
+        return verdicts
     try:
-        img = load_img(image_path, target_size=(128, 128))  # เปลี่ยนขนาดภาพ
-        img_array = img_to_array(img) / 255.0              # Normalize
-        img_array = np.expand_dims(img_array, axis=0)      # เพิ่ม batch dimension
-        prediction = model_image.predict(img_array)
-        return prediction[0][0] > 0.5  # True = ภาพโป๊, False = ภาพปกติ
+        predicted = predict_arrays(arrays)
     except Exception as e:
-        print(f"Error in predict_image: {e}")
-        return False
+        print(f"Error in predict_images: {e}")
+        return verdicts
+    for i, is_nude in zip(positions, predicted):
+        verdicts[i] = is_nude
+    return verdicts
+
+
+def predict_arrays(arrays):
+    """forward pass เดียวสำหรับ array ของภาพที่ decode แล้ว (ไม่จับ exception)"""
+    predictions = _forward(np.stack(arrays, axis=0))
+    return [bool(prediction[0] > 0.5) for prediction in predictions]
+
+
+def moderate_images(contents):
+    """
+    ตรวจภาพจาก bytes ของไฟล์ โดยดู verdict_cache ก่อน: content hash ตรงกัน -> ภาพที่เกือบซ้ำ (ถ้าเปิด) -> โมเดล
+    คืน (content hash, ผลตรวจ) ของแต่ละภาพตามลำดับเดิม ผลของภาพที่อ่านไม่ได้หรือโมเดลผิดพลาดไม่ถูกเก็บใน cache
+    """
+    digests = [content_hash(data) for data in contents]
+    verdicts = verdict_cache.get_many(digests)
+
+    entries, arrays, pending = [], [], {}  # pending: content hash -> perceptual hash ของภาพที่ต้องใช้โมเดล
+    for digest, data in zip(digests, contents):
+        if digest in verdicts or digest in pending:
+            continue
+        try:
+            array = load_image_array(io.BytesIO(data))
+        except Exception as e:
+            print(f"Error in moderate_images ({digest}): {e}")
+            verdicts[digest] = False  # อ่านไม่ได้ถือเป็นภาพปกติ เหมือน predict_image เดิม
+            continue
+        phash = perceptual_hash(array) if verdict_cache.phash_distance > 0 else None
+        near = verdict_cache.get_near(phash) if phash is not None else None
+        if near is not None:
+            verdicts[digest] = near
+            entries.append((digest, phash, near))
+        else:
+            arrays.append(array)
+            pending[digest] = phash
+
+    if arrays:
+        try:
+            predicted = predict_arrays(arrays)
+        except Exception as e:
+            print(f"Error in moderate_images: {e}")
+            predicted = [None] * len(arrays)
+        for (digest, phash), is_nude in zip(pending.items(), predicted):
+            verdicts[digest] = bool(is_nude)
+            if is_nude is not None:
+                entries.append((digest, phash, is_nude))
+
+    verdict_cache.put_many(entries)
+    return [(digest, verdicts[digest]) for digest in digests]
+
+
+def predict_image(image_path):
+    """
+    ตรวจสอบว่าภาพเป็นภาพโป๊หรือไม่
+    """
+    return predict_images([image_path])[0]
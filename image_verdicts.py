@@ -0,0 +1,125 @@
+import time
+import sqlite3
+import hashlib
+import threading
+
+import numpy as np
+
+IMAGE_VERDICT_FILE = 'image_verdicts.sqlite3'
+
+
+def content_hash(data):
+    """sha256 ของ bytes ของไฟล์ภาพ (ใช้เป็น key ของ cache และเป็นชื่อไฟล์ใน uploads)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(image_array):
+    """
+    dHash 64 bit จาก array ของภาพ (H, W, 3): ย่อภาพขาวดำเป็น 8x9 ด้วยค่าเฉลี่ยของแต่ละช่อง
+    แล้วเทียบความสว่างของช่องที่อยู่ติดกันในแนวนอน ภาพที่ต่างกันแค่การบีบอัด/ย่อขนาดจะได้ hash ใกล้กัน
+    """
+    gray = np.asarray(image_array, dtype=np.float64).mean(axis=2)
+    rows = np.linspace(0, gray.shape[0], 9).astype(int)[:-1]
+    cols = np.linspace(0, gray.shape[1], 10).astype(int)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(gray, rows, axis=0), cols, axis=1)
+    counts = np.outer(np.diff(np.append(rows, gray.shape[0])), np.diff(np.append(cols, gray.shape[1])))
+    means = sums / counts
+    bits = (means[:, 1:] > means[:, :-1]).ravel()
+    # เก็บเป็น int64 แบบมีเครื่องหมาย เพื่อให้ใส่ใน INTEGER ของ sqlite ได้
+    return int(np.packbits(bits).view('>i8')[0])
+
+
+class ImageVerdictCache:
+    """
+    cache ผลตรวจภาพโป๊แบบถาวร (sqlite) ตาม content hash ของไฟล์ ผูกกับเวอร์ชันของโมเดล
+    ผลของโมเดลเวอร์ชันอื่นจะไม่ถูกใช้ (ตรวจใหม่หลังเปลี่ยนโมเดล)
+    phash_distance > 0: ใช้ perceptual hash หาภาพที่เกือบซ้ำ (Hamming distance ไม่เกินค่านี้) ด้วย
+    """
+
+    def __init__(self, path=IMAGE_VERDICT_FILE, model_version='', phash_distance=0):
+        self.model_version = model_version
+        self.phash_distance = phash_distance
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS image_verdicts (
+                digest TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                phash INTEGER,
+                nude INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (digest, model_version)
+            )
+        """)
+        self._db.commit()
+        # perceptual hash ของเวอร์ชันปัจจุบันทั้งหมดอยู่ในหน่วยความจำ (8 bytes ต่อภาพ) เพื่อหาภาพที่ใกล้ที่สุดด้วย numpy
+        rows = self._db.execute(
+            "SELECT phash, nude FROM image_verdicts WHERE model_version = ? AND phash IS NOT NULL", (model_version,)
+        ).fetchall()
+        self._phashes = np.array([row[0] for row in rows], dtype=np.int64)
+        self._phash_verdicts = np.array([bool(row[1]) for row in rows], dtype=bool)
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get_many(self, digests):
+        """คืน dict ของ digest -> ผลตรวจ (True = ภาพโป๊) สำหรับ digest ที่เคยตรวจด้วยโมเดลเวอร์ชันนี้"""
+        digests = list(dict.fromkeys(digests))
+        if not digests:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT digest, nude FROM image_verdicts WHERE model_version = ? "
+                f"AND digest IN ({', '.join('?' * len(digests))})",
+                [self.model_version, *digests]
+            ).fetchall()
+            found = {digest: bool(nude) for digest, nude in rows}
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def get_near(self, phash):
+        """ผลตรวจของภาพที่ perceptual hash ใกล้ที่สุดหากอยู่ในระยะ phash_distance มิฉะนั้นคืน None"""
+        if self.phash_distance <= 0:
+            return None
+        with self._lock:
+            if not len(self._phashes):
+                return None
+            different = np.bitwise_xor(self._phashes, np.int64(phash)).view(np.uint8).reshape(-1, 8)
+            distances = np.unpackbits(different, axis=1).sum(axis=1)
+            nearest = int(distances.argmin())
+            if distances[nearest] > self.phash_distance:
+                return None
+            self.near_hits += 1
+            return bool(self._phash_verdicts[nearest])
+
+    def put_many(self, entries):
+        """บันทึกผลตรวจ entries: list ของ (digest, perceptual hash หรือ None, ผลตรวจ)"""
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO image_verdicts (digest, model_version, phash, nude, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(digest, self.model_version, phash, int(nude), now) for digest, phash, nude in entries]
+            )
+            self._db.commit()
+            with_phash = [(phash, nude) for _, phash, nude in entries if phash is not None]
+            if with_phash:
+                self._phashes = np.append(self._phashes, np.array([p for p, _ in with_phash], dtype=np.int64))
+                self._phash_verdicts = np.append(self._phash_verdicts, np.array([n for _, n in with_phash], dtype=bool))
+
+    def stats(self):
+        with self._lock:
+            # near_hits คือ miss ของ content hash ที่ได้ผลจากภาพที่เกือบซ้ำแทนการใช้โมเดล
+            lookups = self.hits + self.misses
+            return {
+                "lookups": lookups,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+                "phashes": len(self._phashes),
+                "model_version": self.model_version,
+            }
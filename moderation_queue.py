@@ -0,0 +1,119 @@
+import time
+import uuid
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """คิวเต็ม (จำนวนงานที่รอและกำลังทำถึง max_depth แล้ว) ให้ผู้เรียกตอบ 429"""
+
+
+class StageTimer:
+    """จับเวลาแต่ละขั้นของงานหนึ่งงาน เช่น profanity / images / database (หน่วย ms)"""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+
+class ModerationQueue:
+    """
+    คิวงานตรวจสอบโพสต์แบบ async: ทำงานใน thread pool ขนาดคงที่ (โมเดลถูกโหลดครั้งเดียวและใช้ร่วมกัน)
+    max_depth จำกัดจำนวนงานที่รอและกำลังทำ งานที่เกินถูกปฏิเสธทันทีด้วย QueueFull แทนการสะสมในหน่วยความจำ
+    สถานะของงานที่เสร็จแล้วถูกเก็บไว้ keep_seconds วินาที (หรือไม่เกิน keep_jobs งาน) ให้ client มาถามผล
+    """
+
+    def __init__(self, workers=2, max_depth=50, keep_seconds=3600, keep_jobs=10000):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.keep_seconds = keep_seconds
+        self.keep_jobs = keep_jobs
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='moderation')
+        self._jobs = OrderedDict()  # job id -> สถานะ (เรียงตามเวลาที่ส่งงาน)
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._stage_totals = {}
+
+    def submit(self, fn, *args):
+        """ส่งงาน fn(timer, *args) -> (ผลลัพธ์, HTTP status) คืน job id หรือ raise QueueFull"""
+        with self._lock:
+            if self._depth >= self.max_depth:
+                self.rejected += 1
+                raise QueueFull(f"moderation queue is full ({self.max_depth} jobs)")
+            self._depth += 1
+            self.submitted += 1
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {"job_id": job_id, "status": "queued", "submitted_at": time.time()}
+            self._expire()
+        self._pool.submit(self._run, job_id, fn, args)
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        started = time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status="running", queued_ms=round((started - job['submitted_at']) * 1000, 1))
+        timer = StageTimer()
+        try:
+            result, status_code = fn(timer, *args)
+            update = {"status": "done", "result": result, "status_code": status_code}
+        except Exception as e:
+            print(f"Error in moderation job {job_id}: {e}")
+            update = {"status": "failed", "error": str(e), "status_code": 500}
+        update.update(stages_ms={name: round(ms, 1) for name, ms in timer.stages.items()},
+                      run_ms=round((time.time() - started) * 1000, 1), finished_at=time.time())
+
+        with self._lock:
+            self._depth -= 1
+            if update['status'] == 'done':
+                self.completed += 1
+            else:
+                self.failed += 1
+            for name, ms in timer.stages.items():
+                total, count = self._stage_totals.get(name, (0.0, 0))
+                self._stage_totals[name] = (total + ms, count + 1)
+            if job_id in self._jobs:
+                self._jobs[job_id].update(update)
+
+    def _expire(self):
+        # ลบสถานะของงานที่เสร็จนานแล้ว (เรียกขณะถือ lock)
+        now = time.time()
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            if len(self._jobs) <= self.keep_jobs and now - job['submitted_at'] <= self.keep_seconds:
+                break
+            if job['status'] in ('done', 'failed'):
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_depth": self.max_depth,
+                "depth": self._depth,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_stage_ms": {name: round(total / count, 1) for name, (total, count) in self._stage_totals.items()},
+            }
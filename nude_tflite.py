@@ -0,0 +1,108 @@
+import os
+import time
+import threading
+
+import numpy as np
+
+TFLITE_MODEL_FILE = 'nude_classifier_int8.tflite'
+
+
+def _interpreter_class():
+    # tflite_runtime มีเฉพาะ interpreter (ไม่กี่ MB) ใช้แทน TensorFlow ทั้งชุดบนเครื่องที่ serve อย่างเดียว
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def export_int8_tflite(model, representative_images, path=TFLITE_MODEL_FILE, samples=200):
+    """
+    แปลงโมเดล Keras เป็น TFLite แบบ int8 ทั้งโมเดล (full integer quantization)
+    representative_images: ภาพที่ normalize แล้ว (0-1) ใช้กำหนดช่วงของแต่ละ layer
+    input/output เป็น uint8: ภาพ 0-255 ถูกใส่ได้ตรง ๆ (scale 1/255) ไม่ต้องแปลงเป็น float
+    """
+    import tensorflow as tf
+
+    def representative_dataset():
+        for image in representative_images[:samples]:
+            yield [np.expand_dims(image, axis=0).astype(np.float32)]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return path
+
+
+class TFLiteNudeClassifier:
+    """โมเดล .tflite ที่ใช้แทนโมเดล Keras: predict(batch ของภาพ 0-1) คืนความน่าจะเป็น (n, 1) เหมือน model.predict"""
+
+    def __init__(self, path=TFLITE_MODEL_FILE, num_threads=None):
+        self.interpreter = _interpreter_class()(model_path=path, num_threads=num_threads or os.cpu_count())
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    def _quantize(self, images):
+        scale, zero_point = self._input['quantization']
+        if not scale:
+            return images.astype(self._input['dtype'])
+        info = np.iinfo(self._input['dtype'])
+        return np.clip(np.round(images / scale + zero_point), info.min, info.max).astype(self._input['dtype'])
+
+    def _dequantize(self, values):
+        scale, zero_point = self._output['quantization']
+        if not scale:
+            return values.astype(np.float32)
+        return (values.astype(np.float32) - zero_point) * scale
+
+    def predict(self, images, verbose=0):
+        images = np.asarray(images, dtype=np.float32)
+        # interpreter ใช้ร่วมกันไม่ได้หลาย thread พร้อมกัน (Flask แบบ threaded)
+        with self._lock:
+            if self._batch_size != len(images):
+                self.interpreter.resize_tensor_input(self._input['index'], [len(images), *images.shape[1:]])
+                self.interpreter.allocate_tensors()
+                self._batch_size = len(images)
+            self.interpreter.set_tensor(self._input['index'], self._quantize(images))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self._output['index']))
+
+
+def compare_models(keras_model, keras_path, tflite_path, x_val, y_val, latency_batches=(1, 10), repeat=20):
+    """
+    รายงานเทียบโมเดล Keras (float32) กับ .tflite (int8) บน validation set:
+    accuracy, สัดส่วนภาพที่ผลตรงกัน, ความต่างของความน่าจะเป็นสูงสุด, ขนาดไฟล์ และเวลาต่อ batch
+    """
+    quantized = TFLiteNudeClassifier(tflite_path)
+    y_val = np.asarray(y_val)
+    float_probabilities = keras_model.predict(x_val, verbose=0)[:, 0]
+    int8_probabilities = np.concatenate([quantized.predict(x_val[start:start + 64])[:, 0]
+                                         for start in range(0, len(x_val), 64)])
+    float_pred, int8_pred = float_probabilities > 0.5, int8_probabilities > 0.5
+
+    print(f"accuracy: float32 {(float_pred == y_val).mean():.4f}, int8 {(int8_pred == y_val).mean():.4f}; "
+          f"verdicts agree on {(float_pred == int8_pred).mean():.4f} of {len(y_val)} images; "
+          f"max probability diff {np.abs(float_probabilities - int8_probabilities).max():.4f}")
+    print(f"file size: {keras_path} {os.path.getsize(keras_path) / 1024:.0f} KB, "
+          f"{tflite_path} {os.path.getsize(tflite_path) / 1024:.0f} KB")
+
+    print(f"{'batch':>5} {'float32 (ms)':>13} {'int8 (ms)':>10} {'speedup':>8}")
+    for batch_size in latency_batches:
+        batch = x_val[:batch_size]
+        timings = []
+        for predict in (lambda: keras_model(batch, training=False).numpy(), lambda: quantized.predict(batch)):
+            predict()  # warm up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                predict()
+            timings.append((time.perf_counter() - start) * 1000 / repeat)
+        print(f"{len(batch):>5} {timings[0]:>13.2f} {timings[1]:>10.2f} {timings[0] / timings[1]:>7.1f}x")
+    return float_pred, int8_pred
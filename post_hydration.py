@@ -0,0 +1,132 @@
+import json
+import time
+import threading
+
+from collections import OrderedDict
+from datetime import timezone
+from sqlalchemy.sql import text
+
+
+def _placeholders(prefix, values):
+    names = [f'{prefix}_{i}' for i in range(len(values))]
+    return ', '.join(f':{name}' for name in names), dict(zip(names, values))
+
+
+def serialize_post(post):
+    """แปลงแถว posts + users เป็น JSON ของ feed (ไม่รวม is_liked ซึ่งขึ้นกับผู้ใช้)"""
+    return {
+        "id": post['id'],
+        "userId": post['user_id'],
+        "title": post['Title'],
+        "content": post['content'],
+        "updated": post['updated_at'].astimezone(timezone.utc).replace(microsecond=0).isoformat() + 'Z',
+        "photo_url": json.loads(post.get('photo_url') or '[]'),
+        "video_url": json.loads(post.get('video_url') or '[]'),
+        "userName": post['username'],
+        "userProfileUrl": post['picture'],
+    }
+
+
+class PostHydrator:
+    """
+    ดึงรายละเอียดโพสต์สำหรับหน้า feed แบบ batch
+    - เก็บแถว posts + users ที่ serialize แล้ว (decode photo_url/video_url ครั้งเดียว) ไว้ใน cache
+      โดยใช้ (posts.id, updated_at) เป็น key โพสต์ที่ถูกแก้ไขจะมี updated_at ใหม่จึงไม่ใช้ค่าเก่า
+    - ข้อมูลผู้เขียน (username, picture) อาจเปลี่ยนได้ จึงมี TTL กำกับ
+    - ดึงโพสต์ที่ผู้ใช้กด like ของทั้งหน้าด้วย query เดียว แทน subquery ต่อแถว
+    """
+
+    def __init__(self, execute, ttl=300, max_entries=50000, clock=time.monotonic):
+        self.execute = execute  # execute(query, params) -> list ของแถว
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._rows = OrderedDict()  # post_id -> (updated_at, serialized, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, post_id):
+        with self._lock:
+            return self._rows.pop(post_id, None) is not None
+
+    def _cached(self, post_id, updated_at, now):
+        entry = self._rows.get(post_id)
+        if entry is None or entry[0] != updated_at or entry[2] <= now:
+            return None
+        self._rows.move_to_end(post_id)
+        return entry[1]
+
+    def _store(self, rows, now):
+        with self._lock:
+            for post_id, updated_at, serialized in rows:
+                self._rows[post_id] = (updated_at, serialized, now + self.ttl)
+                self._rows.move_to_end(post_id)
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+
+    def _active_versions(self, post_ids):
+        # query ตาม primary key: คืนเฉพาะโพสต์ที่ยัง active พร้อม updated_at ปัจจุบัน
+        placeholders, params = _placeholders('id', post_ids)
+        query = text(f"SELECT id, updated_at FROM posts WHERE status = 'active' AND id IN ({placeholders})")
+        return {row._mapping['id']: row._mapping['updated_at'] for row in self.execute(query, params)}
+
+    def _fetch_rows(self, post_ids):
+        placeholders, params = _placeholders('id', post_ids)
+        query = text(f"""
+            SELECT posts.*, users.username, users.picture
+            FROM posts
+            JOIN users ON posts.user_id = users.id
+            WHERE posts.status = 'active' AND posts.id IN ({placeholders})
+        """)
+        return [row._mapping for row in self.execute(query, params)]
+
+    def liked_post_ids(self, user_id, post_ids):
+        """โพสต์ในหน้านี้ที่ผู้ใช้กด like แล้ว (query เดียว ใช้ index ของ likes.user_id)"""
+        if not post_ids:
+            return set()
+        placeholders, params = _placeholders('id', post_ids)
+        query = text(f"SELECT DISTINCT post_id FROM likes WHERE user_id = :user_id AND post_id IN ({placeholders})")
+        return {row._mapping['post_id'] for row in self.execute(query, {'user_id': user_id, **params})}
+
+    def hydrate(self, user_id, post_ids):
+        """คืนรายละเอียดโพสต์ตามลำดับของ post_ids (ข้ามโพสต์ที่ไม่ active หรือถูกลบ)"""
+        if not post_ids:
+            return []
+
+        now = self.clock()
+        versions = self._active_versions(post_ids)
+
+        serialized = {}
+        with self._lock:
+            for post_id, updated_at in versions.items():
+                cached = self._cached(post_id, updated_at, now)
+                if cached is not None:
+                    serialized[post_id] = cached
+            missing = [post_id for post_id in versions if post_id not in serialized]
+            self.hits += len(serialized)
+            self.misses += len(missing)
+
+        if missing:
+            fetched = [(row['id'], row['updated_at'], serialize_post(row)) for row in self._fetch_rows(missing)]
+            self._store(fetched, now)
+            serialized.update({post_id: post for post_id, _, post in fetched})
+
+        if not serialized:
+            return []  # ทุกโพสต์ในหน้านี้ไม่ active หรือถูกลบไปแล้ว
+
+        liked = self.liked_post_ids(user_id, list(serialized))
+        return [
+            {**serialized[post_id], "is_liked": post_id in liked}
+            for post_id in post_ids if post_id in serialized
+        ]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._rows),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
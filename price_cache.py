@@ -0,0 +1,153 @@
+import re
+import time
+import asyncio
+import threading
+import unicodedata
+
+from collections import OrderedDict
+
+# ชื่อสินค้าภาษาไทยที่ผู้ใช้มักพิมพ์ -> คำภาษาอังกฤษที่ร้านใช้ในชื่อสินค้า
+PRODUCT_ALIASES = {
+    'ไอโฟน': 'iphone',
+    'ไอแพด': 'ipad',
+    'แมคบุ๊ค': 'macbook',
+    'แมคบุ๊ก': 'macbook',
+    'แอร์พอด': 'airpods',
+    'airpod': 'airpods',
+    'ซัมซุง': 'samsung',
+    'กาแลคซี่': 'galaxy',
+    'กาแล็กซี่': 'galaxy',
+    'เสียวหมี่': 'xiaomi',
+    'หัวเว่ย': 'huawei',
+    'ออปโป้': 'oppo',
+    'วีโว่': 'vivo',
+    'เลอโนโว': 'lenovo',
+    'เอซุส': 'asus',
+    'เอเซอร์': 'acer',
+    'โน๊ตบุ๊ค': 'notebook',
+    'โน้ตบุ๊ก': 'notebook',
+    'โปร': 'pro',
+    'แม็กซ์': 'max',
+    'อัลตร้า': 'ultra',
+}
+# แทนที่เฉพาะคำที่ไม่ติดกับตัวอักษรอื่น ('airpod' ใน 'airpods' หรือ 'โปร' ใน 'โปรเจคเตอร์' ไม่ถูกแทนที่)
+_LETTER_BEFORE = r'(?<![^\W\d_])(?<![\u0E00-\u0E7F])'
+_LETTER_AFTER = r'(?![^\W\d_])(?![\u0E00-\u0E7F])'
+_alias_pattern = re.compile(
+    _LETTER_BEFORE + '(?:' + '|'.join(sorted(map(re.escape, PRODUCT_ALIASES), key=len, reverse=True)) + ')' + _LETTER_AFTER
+)
+_letter_digit = re.compile(r'(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])')
+
+
+def normalize_product_name(product_name):
+    """
+    key ของ cache ราคา: NFKC, ตัวพิมพ์เล็ก, ชื่อภาษาไทยของยี่ห้อ/รุ่นถูกแปลงเป็นภาษาอังกฤษ
+    และแยกตัวอักษรกับตัวเลขออกจากกัน ("iPhone15Pro", "ไอโฟน 15 โปร" และ " iphone  15 pro" ได้ key เดียวกัน)
+    ใช้เป็น key เท่านั้น ไม่ใช่คำที่ส่งไปค้นหาที่ร้าน (เช่น "galaxy s 24" ไม่ตรงกับชื่อสินค้า "Galaxy S24")
+    """
+    name = unicodedata.normalize('NFKC', product_name).lower()
+    name = _alias_pattern.sub(lambda match: f' {PRODUCT_ALIASES[match.group(0)]} ', name)
+    name = _letter_digit.sub(' ', name)
+    return ' '.join(name.split())
+
+
+class PriceCache:
+    """
+    cache ผลการค้นหาของแต่ละร้านตาม (ร้าน, ชื่อสินค้าที่ normalize แล้ว) ใช้บน event loop ของ StoreSearch เท่านั้น
+    - อายุไม่เกิน ttl: ตอบจาก cache ทันที
+    - เกิน ttl แต่ไม่เกิน ttl + stale_ttl: ตอบค่าเดิมทันทีและ scrape ใหม่เบื้องหลัง (stale-while-revalidate)
+    - request พร้อมกันของ key เดียวกันรอผลจากการ scrape ครั้งเดียวกัน (single-flight)
+    ผลที่เป็น error ไม่ถูก cache; entry เก่าสุดถูกลบเมื่อเกิน max_entries
+    """
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (ร้าน, key) -> (ผลลัพธ์, เวลาที่ scrape)
+        self._inflight = {}  # (ร้าน, key) -> asyncio.Task ของการ scrape ที่กำลังทำ
+        self._lock = threading.Lock()  # สำหรับตัวนับ (stats ถูกอ่านจาก thread ของ Flask)
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.shared = 0
+        self.misses = 0
+        self.scrapes = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    async def get(self, store, key, ttl, stale_ttl, fetch):
+        """
+        คืนผลของ (store, key) จาก cache หรือจาก fetch()
+        fetch: coroutine function ที่คืน (ผลลัพธ์, เก็บใน cache ได้หรือไม่)
+        """
+        cache_key = (store, key)
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < ttl:
+                self._entries.move_to_end(cache_key)
+                self._count('fresh_hits')
+                return value
+            if age < ttl + stale_ttl:
+                self._entries.move_to_end(cache_key)
+                self._count('stale_hits')
+                if cache_key not in self._inflight:
+                    self._count('refreshes')
+                    self._start(cache_key, fetch)
+                return value
+
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            self._count('shared')
+        else:
+            self._count('misses')
+            task = self._start(cache_key, fetch)
+        # shield: หากผู้เรียกหมดเวลา การ scrape ยังทำต่อจนเสร็จและเก็บผลไว้ให้ request ถัดไป
+        return await asyncio.shield(task)
+
+    def put(self, store, key, value):
+        """เก็บผลที่ได้จากการ scrape นอก get() (เช่น การ refresh ตามรอบของ PriceTracker)"""
+        cache_key = (store, key)
+        self._entries[cache_key] = (value, time.time())
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._count('evictions')
+
+    def _start(self, cache_key, fetch):
+        async def run():
+            try:
+                value, cacheable = await fetch()
+                if cacheable:
+                    self.put(*cache_key, value)
+                return value
+            finally:
+                self._inflight.pop(cache_key, None)
+
+        self._count('scrapes')
+        task = asyncio.ensure_future(run())
+        # การ refresh เบื้องหลังที่ล้มเหลวไม่มีใครรอผล จึงดึง exception ออกเพื่อไม่ให้ asyncio เตือน
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[cache_key] = task
+        return task
+
+    def stats(self):
+        with self._lock:
+            lookups = self.fresh_hits + self.stale_hits + self.shared + self.misses
+            return {
+                "lookups": lookups,
+                "fresh_hits": self.fresh_hits,
+                "stale_hits": self.stale_hits,
+                "shared": self.shared,
+                "misses": self.misses,
+                "hit_ratio": round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "scrapes": self.scrapes,
+                "refreshes": self.refreshes,
+                # จำนวนการ scrape ที่ไม่ต้องทำ (ตอบจาก cache หรือรอผลร่วมกับ request อื่น)
+                "scrapes_saved": lookups - self.scrapes,
+                "entries": len(self._entries),
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+from price_cache import normalize_product_name
+
+PRICE_HISTORY_FILE = 'price_history.sqlite3'
+_price_number = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def parse_price(price):
+    """
+    ราคาจากผลการค้นหาของร้าน ("39,900 บาท", "฿39,900.00", "39900") -> จำนวนสตางค์ (int)
+    คืน None หากไม่มีตัวเลข (เช่น "Price not found" หรือ "-")
+    """
+    if price is None:
+        return None
+    if isinstance(price, (int, float)):
+        return int(round(price * 100))
+    match = _price_number.search(str(price))
+    if match is None:
+        return None
+    return int(round(float(match.group(0).replace(',', '')) * 100))
+
+
+def cheapest_result(results):
+    """(ราคาเป็นสตางค์, สินค้า) ของสินค้าที่ถูกที่สุดใน list ผลการค้นหาของร้าน หรือ (None, None)"""
+    best_price, best = None, None
+    for product in results:
+        price = parse_price(product.get('price'))
+        if price is not None and (best_price is None or price < best_price):
+            best_price, best = price, product
+    return best_price, best
+
+
+class PriceHistory:
+    """
+    ประวัติราคาของสินค้าแต่ละร้าน (sqlite) key คือชื่อสินค้าที่ normalize แล้ว
+    - prices: จุดของ time series (สินค้า, ร้าน, เวลา, ราคา) เป็นจำนวนเต็มทั้งหมด (id, unix time, สตางค์)
+      ในตาราง WITHOUT ROWID เรียงตาม (สินค้า, ร้าน, เวลา) และเพิ่มจุดใหม่เฉพาะเมื่อราคาเปลี่ยน
+    - latest: ผลการค้นหาล่าสุดของแต่ละร้านและเวลาที่ตรวจล่าสุด (ใช้ตอบ /ai/search และหาราคาถูกสุดตอนนี้)
+    """
+
+    def __init__(self, path=PRICE_HISTORY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS products (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+            CREATE TABLE IF NOT EXISTS stores (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+            CREATE TABLE IF NOT EXISTS prices (
+                product_id INTEGER NOT NULL,
+                store_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL,
+                price INTEGER NOT NULL,
+                PRIMARY KEY (product_id, store_id, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS latest (
+                product_id INTEGER NOT NULL,
+                store_id INTEGER NOT NULL,
+                checked_at INTEGER NOT NULL,
+                price INTEGER,
+                results TEXT NOT NULL,
+                PRIMARY KEY (product_id, store_id)
+            ) WITHOUT ROWID;
+        """)
+        self._db.commit()
+        self._ids = {'products': {}, 'stores': {}}
+        for table in self._ids:
+            self._ids[table].update((name, row_id) for row_id, name in self._db.execute(f"SELECT id, name FROM {table}"))
+        self._names = {'stores': {row_id: name for name, row_id in self._ids['stores'].items()}}
+        self.recorded = 0
+        self.changes = 0
+
+    def _id(self, table, name, create=False):
+        row_id = self._ids[table].get(name)
+        if row_id is None and create:
+            row_id = self._db.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid
+            self._ids[table][name] = row_id
+            if table == 'stores':
+                self._names['stores'][row_id] = name
+        return row_id
+
+    def record(self, product_name, store, results, ts=None):
+        """
+        บันทึกผลการค้นหาของร้านหนึ่ง (list ของ {"name", "price", "url"}) คืนราคาถูกสุดเป็นสตางค์หรือ None
+        ผลที่เป็นข้อความ error หรือไม่มีสินค้าที่อ่านราคาได้ (เช่น placeholder "Not found") ไม่ถูกบันทึก
+        (ผลล่าสุดที่ใช้ได้ยังคงอยู่ และ /ai/search ยังค้นหาสดจากร้านนั้นต่อไป)
+        """
+        if isinstance(results, str):
+            return None
+        price, _ = cheapest_result(results)
+        if price is None:
+            return None
+        ts = int(ts if ts is not None else time.time())
+        with self._lock:
+            product_id = self._id('products', normalize_product_name(product_name), create=True)
+            store_id = self._id('stores', store, create=True)
+            previous = self._db.execute(
+                "SELECT price FROM prices WHERE product_id = ? AND store_id = ? ORDER BY ts DESC LIMIT 1",
+                (product_id, store_id)
+            ).fetchone()
+            if previous is None or previous[0] != price:
+                self._db.execute("INSERT OR REPLACE INTO prices (product_id, store_id, ts, price) VALUES (?, ?, ?, ?)",
+                                 (product_id, store_id, ts, price))
+                self.changes += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO latest (product_id, store_id, checked_at, price, results) VALUES (?, ?, ?, ?, ?)",
+                (product_id, store_id, ts, price, json.dumps(results, ensure_ascii=False))
+            )
+            self._db.commit()
+            self.recorded += 1
+        return price
+
+    def latest(self, product_name, max_age=None, now=None):
+        """dict ของร้าน -> {"results", "price", "checked_at"} ที่ตรวจไว้ไม่เกิน max_age วินาที"""
+        with self._lock:
+            product_id = self._id('products', normalize_product_name(product_name))
+            if product_id is None:
+                return {}
+            oldest = (now or time.time()) - max_age if max_age is not None else 0
+            rows = self._db.execute(
+                "SELECT store_id, checked_at, price, results FROM latest WHERE product_id = ? AND checked_at >= ?",
+                (product_id, oldest)
+            ).fetchall()
+            stores = self._names['stores']
+        return {
+            stores[store_id]: {"results": json.loads(results), "price": price, "checked_at": checked_at}
+            for store_id, checked_at, price, results in rows
+        }
+
+    def cheapest(self, product_name, max_age=None, now=None):
+        """ร้านที่ขายถูกที่สุดตอนนี้ {"store", "price" (บาท), "name", "url", "checked_at"} หรือ None"""
+        best = None
+        for store, entry in self.latest(product_name, max_age, now).items():
+            price, product = cheapest_result(entry['results'])
+            if price is not None and (best is None or price < best['price']):
+                best = {"store": store, "price": price, "name": product.get('name'), "url": product.get('url'),
+                        "checked_at": entry['checked_at']}
+        if best is not None:
+            best['price'] = best['price'] / 100
+        return best
+
+    def trend(self, product_name, days=30, now=None):
+        """
+        ราคาของแต่ละร้านในช่วง days วันล่าสุด: จุดที่ราคาเปลี่ยน [[unix time, บาท], ...]
+        (จุดแรกคือราคาที่ใช้อยู่ตอนต้นช่วง) พร้อมราคาต่ำสุด สูงสุด และการเปลี่ยนแปลงตลอดช่วง
+        """
+        start = int((now or time.time()) - days * 86400)
+        with self._lock:
+            product_id = self._id('products', normalize_product_name(product_name))
+            if product_id is None:
+                return {}
+            rows = self._db.execute(
+                """
+                SELECT store_id, ts, price FROM prices
+                WHERE product_id = ? AND ts >= COALESCE(
+                    (SELECT MAX(p.ts) FROM prices p
+                     WHERE p.product_id = prices.product_id AND p.store_id = prices.store_id AND p.ts <= ?), ?)
+                ORDER BY store_id, ts
+                """,
+                (product_id, start, start)
+            ).fetchall()
+            stores = self._names['stores']
+
+        series = {}
+        for store_id, ts, price in rows:
+            series.setdefault(stores[store_id], []).append([max(ts, start), price / 100])
+        trend = {}
+        for store, points in series.items():
+            prices = [price for _, price in points]
+            trend[store] = {
+                "points": points,
+                "min": min(prices),
+                "max": max(prices),
+                "change": round(prices[-1] - prices[0], 2),
+            }
+        return trend
+
+    def stats(self):
+        with self._lock:
+            points = self._db.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+            return {
+                "products": len(self._ids['products']),
+                "stores": len(self._ids['stores']),
+                "points": points,
+                "recorded": self.recorded,
+                "changes": self.changes,
+                "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            }
@@ -0,0 +1,141 @@
+import os
+import time
+import threading
+
+from collections import Counter
+from sqlalchemy.sql import text
+
+from price_cache import normalize_product_name
+
+# ชื่อสินค้าที่ถูกรีวิว (นับรวมชื่อที่เขียนต่างกันแต่ normalize แล้วเหมือนกัน)
+PRODUCT_MENTIONS_QUERY = text("""
+    SELECT ProductName, COUNT(*) AS mentions
+    FROM posts
+    WHERE ProductName IS NOT NULL AND ProductName <> ''
+    GROUP BY ProductName
+""")
+
+
+def most_referenced_products(engine, limit):
+    """
+    สินค้าที่ถูกอ้างถึงในโพสต์มากที่สุด limit ชื่อ (นับรวมตามชื่อที่ normalize แล้ว)
+    คืนชื่อที่ผู้ใช้เขียนบ่อยที่สุดของแต่ละสินค้า เพราะเป็นคำที่ใช้ค้นหาที่ร้าน
+    """
+    mentions = Counter()
+    spellings = {}
+    with engine.connect() as connection:
+        for product_name, count in connection.execute(PRODUCT_MENTIONS_QUERY):
+            key = normalize_product_name(product_name)
+            if key:
+                mentions[key] += count
+                spellings.setdefault(key, Counter())[product_name.strip()] += count
+    return [spellings[key].most_common(1)[0][0] for key, _ in mentions.most_common(limit)]
+
+
+def store_min_intervals(store_names, default):
+    """ระยะห่างขั้นต่ำระหว่าง request ไปยังร้านเดียวกัน: PRICE_TRACKER_MIN_INTERVAL_<ร้าน> หรือ default"""
+    return {
+        name: float(os.getenv(f'PRICE_TRACKER_MIN_INTERVAL_{name.upper()}', default))
+        for name in store_names
+    }
+
+
+class PriceTracker:
+    """
+    ดึงราคาของสินค้าที่ถูกรีวิวมากที่สุดจากทุกร้านตามรอบเวลาใน background แล้วบันทึกลง PriceHistory
+    - แต่ละรอบโหลดรายชื่อสินค้า top_n ชื่อจาก load_products(limit) ใหม่ และติดตามเฉพาะร้านใน stores (None = ทุกร้าน)
+    - แต่ละร้านมี thread ของตัวเองที่ไล่ค้นหาทีละสินค้า ห่างกันอย่างน้อย min_intervals[ร้าน] วินาที
+      (ร้านที่ช้าไม่ทำให้ร้านอื่นช้าตาม และไม่มีร้านใดถูกยิง request ถี่เกินกำหนด)
+    - ผลที่ได้ถูกเก็บลง cache ของ StoreSearch ด้วย /ai/search จึงได้ราคาล่าสุดโดยไม่ต้อง scrape
+    """
+
+    def __init__(self, store_search, history, load_products, interval=3600, top_n=100, min_intervals=None,
+                 stores=None):
+        self.store_search = store_search
+        self.history = history
+        self.load_products = load_products
+        self.interval = interval
+        self.top_n = top_n
+        self.min_intervals = min_intervals or {}
+        self.stores = [adapter.name for adapter in store_search.adapters if stores is None or adapter.name in stores]
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.cycles = 0
+        self.last_cycle_at = None
+        self.last_cycle_seconds = 0.0
+        self.last_products = 0
+        self._store_stats = {store: {"searches": 0, "recorded": 0, "failed": 0} for store in self.stores}
+
+    def _track_store(self, store, products):
+        min_interval = self.min_intervals.get(store, 0)
+        for product_name in products:
+            if self._stop.is_set():
+                return
+            started = time.monotonic()
+            try:
+                result = self.store_search.search(product_name, stores=[store], fresh=True)[store]
+                recorded = self.history.record(product_name, store, result) is not None
+                if not recorded:
+                    message = result if isinstance(result, str) else "no product with a price"
+                    print(f"[price-tracker] {store} '{product_name}': {message}")
+            except Exception as e:
+                recorded = False
+                print(f"[price-tracker] {store} '{product_name}' failed: {e}")
+            with self._lock:
+                stats = self._store_stats[store]
+                stats["searches"] += 1
+                stats["recorded" if recorded else "failed"] += 1
+            # รอให้ครบระยะห่างขั้นต่ำนับจากเวลาเริ่ม request ก่อนหน้า
+            self._stop.wait(max(min_interval - (time.monotonic() - started), 0))
+
+    def run_once(self):
+        """ดึงราคาสินค้ารอบหนึ่งจากทุกร้านพร้อมกัน (ร้านละ thread) แล้วรอจนครบทุกร้าน"""
+        started = time.perf_counter()
+        products = self.load_products(self.top_n)
+        threads = [
+            threading.Thread(target=self._track_store, args=(store, products),
+                             name=f'price-tracker-{store}', daemon=True)
+            for store in self.stores
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.cycles += 1
+            self.last_cycle_at = time.time()
+            self.last_cycle_seconds = elapsed
+            self.last_products = len(products)
+        print(f"[price-tracker] refreshed {len(products)} products from {len(threads)} stores in {elapsed:.1f}s")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                # ใช้ราคาที่บันทึกไว้เดิมต่อไปหากรอบนี้ไม่สำเร็จ (เช่น ฐานข้อมูลไม่พร้อม)
+                print(f"[price-tracker] cycle failed: {e}")
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 0))
+
+    def start(self):
+        """เริ่ม thread ที่ดึงราคาทุก interval วินาที (รอบแรกเริ่มทันที)"""
+        threading.Thread(target=self._loop, name='price-tracker', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "top_n": self.top_n,
+                "cycles": self.cycles,
+                "last_cycle_at": self.last_cycle_at,
+                "last_cycle_seconds": round(self.last_cycle_seconds, 1),
+                "last_products": self.last_products,
+                "stores": {store: dict(stats) for store, stats in self._store_stats.items()},
+            }
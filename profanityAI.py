@@ -1,25 +1,55 @@
-import pickle
-from pythainlp import word_tokenize
+import os
+from thai_tokenizer import tokenize, tokenize_many
+from profanity_lexicon import TokenClassifier, load_lexicon
+from compact_profanity import load_profanity_model
 
-# โหลดโมเดลตรวจสอบคำหยาบ
-with open('profanity_model.pkl', 'rb') as model_file:
-    model_profanity, vectorizer_profanity = pickle.load(model_file)
+# โหลดโมเดลตรวจสอบคำหยาบ (PROFANITY_MODEL=profanity_model_compact.npz เพื่อใช้โมเดลแบบ compact)
+model_profanity, vectorizer_profanity = load_profanity_model(os.getenv('PROFANITY_MODEL', 'profanity_model.pkl'))
+
+# คำที่รู้คำตอบแล้ว (lexicon) และ cache คำตอบของโมเดล อยู่หน้า RandomForest
+token_classifier = TokenClassifier(
+    model_profanity, vectorizer_profanity, load_lexicon(),
+    cache_size=int(os.getenv('PROFANITY_CACHE_SIZE', '100000'))
+)
+
+def classify_tokens(tokens):
+    """
+    ตรวจคำหยาบของ token ทั้งหมดในครั้งเดียว คืน dict ของ token -> True หากเป็นคำหยาบ
+    token ที่ไม่ซ้ำและไม่อยู่ใน lexicon/cache จะถูก transform และ predict เป็น batch เดียว
+    """
+    return token_classifier.classify(tokens)
+
+def profanity_stats():
+    """ตัวนับของแต่ละขั้น (lexicon / cache / model) สำหรับดูว่าลดงานของโมเดลได้เท่าไร"""
+    return token_classifier.stats()
+
+def _mask(words, profane):
+    return ''.join('*' * len(word) if profane[word] else word for word in words)
 
 def censor_profanity(text):
     """
     เซ็นเซอร์คำหยาบในข้อความ
     """
     try:
-        # แบ่งคำด้วย PyThaiNLP
-        words = word_tokenize(text, engine="newmm")
-        
-        # เซ็นเซอร์คำที่เป็นคำหยาบ
-        censored_words = [
-            '*' * len(word) if model_profanity.predict(vectorizer_profanity.transform([word]))[0] == 1 else word
-            for word in words
-        ]
-        
-        return ''.join(censored_words)
+        # แบ่งคำด้วย PyThaiNLP (ผ่านตัวตัดคำร่วมที่ cache ผลไว้)
+        words = tokenize(text)
+
+        # เซ็นเซอร์คำที่เป็นคำหยาบ (จำแนกทุกคำที่ไม่ซ้ำกันใน predict ครั้งเดียว)
+        return _mask(words, classify_tokens(words))
     except Exception as e:
         print(f"Error in censor_profanity: {e}")
         return text
+
+def censor_profanity_batch(texts):
+    """
+    เซ็นเซอร์คำหยาบในหลายข้อความ (เช่น title, content, product name ของโพสต์เดียวกัน)
+    จำแนก token ของทุกข้อความใน predict ครั้งเดียว ผลเหมือนเรียก censor_profanity ทีละข้อความ
+    """
+    try:
+        tokenized = tokenize_many(texts)
+        profane = classify_tokens(word for words in tokenized for word in words)
+    except Exception as e:
+        print(f"Error in censor_profanity: {e}")
+        return list(texts)
+
+    return [_mask(words, profane) for words in tokenized]
@@ -0,0 +1,120 @@
+import os
+import threading
+
+from collections import OrderedDict
+
+PROFANITY_WORDS_FILE = 'profanity_words.xlsx'
+
+# ชีตของ profanity_words.xlsx (ชุดเดียวกับที่ createbadwordai.py ใช้ train) -> คำตอบ (True = คำหยาบ)
+LEXICON_SHEETS = {
+    'Thai_Profanity': True,
+    'English_Profanity': True,
+    'Thai_Non_Profanity': False,
+    'English_Non_Profanity': False,
+}
+
+
+def normalize_token(token):
+    # vectorizer ของโมเดลแปลงเป็นตัวพิมพ์เล็กก่อน คำที่ต่างกันแค่ตัวพิมพ์จึงได้คำตอบเดียวกัน
+    return token.strip().lower()
+
+
+def load_lexicon(path=PROFANITY_WORDS_FILE):
+    """
+    โหลดคำที่รู้คำตอบแน่นอนจากชีตคำหยาบ/ไม่หยาบ คืน dict ของคำ -> True หากเป็นคำหยาบ
+    คำที่อยู่ทั้งสองฝั่งจะถูกตัดออก (ให้โมเดลตัดสิน)
+    ไม่มีไฟล์: คืน dict ว่าง (ทุก token ไปถึงโมเดล) แต่หากมีไฟล์แล้วอ่านไม่ได้ (เช่น ไม่ได้ติดตั้ง openpyxl) จะ raise
+    """
+    if not os.path.exists(path):
+        print(f"WARNING: profanity lexicon {path} not found, every token will be classified by the model")
+        return {}
+    try:
+        import pandas as pd
+        xls = pd.ExcelFile(path)
+        sheets = {sheet: xls.parse(sheet)['word'].dropna().astype(str).tolist() for sheet in LEXICON_SHEETS}
+    except Exception as e:
+        raise RuntimeError(f"Cannot read profanity lexicon {path} (is openpyxl installed?): {e}") from e
+
+    lexicon, conflicts = {}, set()
+    for sheet, verdict in LEXICON_SHEETS.items():
+        for word in sheets[sheet]:
+            word = normalize_token(word)
+            if not word:
+                continue
+            if lexicon.get(word, verdict) != verdict:
+                conflicts.add(word)
+            lexicon[word] = verdict
+    for word in conflicts:
+        del lexicon[word]
+    print(f"Loaded profanity lexicon: {len(lexicon)} words ({len(conflicts)} conflicting words left to the model)")
+    return lexicon
+
+
+class TokenClassifier:
+    """
+    จำแนกคำหยาบเป็นลำดับขั้น ให้เฉพาะ token ที่ไม่เคยเห็นไปถึงโมเดล
+    1. lexicon: คำที่อยู่ในชีตของ profanity_words.xlsx ได้คำตอบทันที
+    2. cache: คำตอบของโมเดลสำหรับ token ที่เคยจำแนกแล้ว (LRU จำกัดจำนวน)
+    3. model: token ที่เหลือทั้งหมด transform และ predict ใน batch เดียว
+    """
+
+    def __init__(self, model, vectorizer, lexicon=None, cache_size=100000):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.lexicon = lexicon or {}
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # token -> verdict
+        self._lock = threading.Lock()
+        self.lexicon_hits = 0
+        self.cache_hits = 0
+        self.model_tokens = 0
+        self.model_calls = 0
+        self.evictions = 0
+
+    def classify(self, tokens):
+        """คืน dict ของ token (ไม่ซ้ำ) -> True หากเป็นคำหยาบ"""
+        verdicts, novel = {}, []
+        with self._lock:
+            for token in dict.fromkeys(tokens):
+                verdict = self.lexicon.get(normalize_token(token))
+                if verdict is not None:
+                    self.lexicon_hits += 1
+                elif token in self._cache:
+                    verdict = self._cache[token]
+                    self._cache.move_to_end(token)
+                    self.cache_hits += 1
+                else:
+                    novel.append(token)
+                    continue
+                verdicts[token] = verdict
+
+        if novel:
+            predictions = self.model.predict(self.vectorizer.transform(novel))
+            predicted = {token: prediction == 1 for token, prediction in zip(novel, predictions)}
+            verdicts.update(predicted)
+            with self._lock:
+                self.model_tokens += len(novel)
+                self.model_calls += 1
+                self._cache.update(predicted)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                    self.evictions += 1
+
+        return verdicts
+
+    def stats(self):
+        with self._lock:
+            lookups = self.lexicon_hits + self.cache_hits + self.model_tokens
+            return {
+                "lookups": lookups,
+                "lexicon_hits": self.lexicon_hits,
+                "cache_hits": self.cache_hits,
+                "model_tokens": self.model_tokens,
+                "model_calls": self.model_calls,
+                "lexicon_hit_ratio": round(self.lexicon_hits / lookups, 4) if lookups else 0.0,
+                "cache_hit_ratio": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+                "model_ratio": round(self.model_tokens / lookups, 4) if lookups else 0.0,
+                "lexicon_words": len(self.lexicon),
+                "cache_entries": len(self._cache),
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,108 @@
+import json
+import time
+import random
+import threading
+
+from collections import OrderedDict
+
+
+def estimate_size(value):
+    """ประมาณขนาดของค่าใน cache (bytes) จากขนาด JSON ที่จะถูกส่งกลับ"""
+    try:
+        return len(json.dumps(value, default=str, ensure_ascii=False).encode('utf-8'))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class RecommendationCache:
+    """
+    Cache ผลการแนะนำต่อผู้ใช้ แบบ LRU จำกัดขนาดตามหน่วยความจำ
+    - แต่ละ entry หมดอายุเอง (TTL + jitter) ผู้ใช้ทุกคนจึงไม่หมดอายุพร้อมกัน
+    - entry เก็บเวอร์ชันโมเดลไว้ เมื่อ train ใหม่ entry เดิมจะไม่ถูกใช้อีก
+    - ล้างเฉพาะผู้ใช้ที่มีการโต้ตอบใหม่ได้ด้วย invalidate(user_id)
+    """
+
+    def __init__(self, ttl=60, jitter=0.2, max_bytes=64 * 1024 * 1024, sizeof=estimate_size, clock=time.monotonic):
+        self.ttl = ttl
+        self.jitter = jitter
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clock = clock
+        self._entries = OrderedDict()  # user_id -> (value, version, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, user_id):
+        _, _, _, size = self._entries.pop(user_id)
+        self._bytes -= size
+
+    def get(self, user_id, version):
+        """คืนค่าที่ cache ไว้ หรือ None หากไม่มี หมดอายุ หรือเป็นของโมเดลเวอร์ชันเก่า"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, entry_version, expires_at, _ = entry
+            if entry_version != version or expires_at <= self.clock():
+                self._remove(user_id)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return value
+
+    def set(self, user_id, value, version):
+        size = self.sizeof(value)
+        expires_at = self.clock() + self.ttl * (1 + random.uniform(-self.jitter, self.jitter))
+        with self._lock:
+            if user_id in self._entries:
+                self._remove(user_id)
+            if size > self.max_bytes:
+                return
+            self._entries[user_id] = (value, version, expires_at, size)
+            self._bytes += size
+
+            # ตัด entry ที่ใช้งานล่าสุดนานที่สุดออกจนกว่าจะอยู่ในงบหน่วยความจำ
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        """ล้าง cache ของผู้ใช้คนเดียว (เช่น เมื่อผู้ใช้มีการโต้ตอบใหม่)"""
+        with self._lock:
+            if user_id in self._entries:
+                self._remove(user_id)
+                self.invalidations += 1
+                return True
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+import numpy as np
+
+RECOMMENDATION_STORE_DIR = 'Recommendations'
+CURRENT_FILE = 'CURRENT'
+
+
+def interaction_fingerprint(post_ids):
+    """ลายนิ้วมือของโพสต์ที่ผู้ใช้เคยโต้ตอบ (ไม่ขึ้นกับลำดับ) ใช้ตรวจว่าผู้ใช้มีการโต้ตอบใหม่หรือไม่"""
+    post_ids = np.unique(np.asarray(list(post_ids), dtype=np.int64))
+    digest = hashlib.blake2b(post_ids.tobytes(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+class RecommendationStore:
+    """
+    ผลการจัดอันดับ top-N ของผู้ใช้ทุกคนที่คำนวณไว้ล่วงหน้าโดย batch_recommend.py
+    เก็บเป็นไฟล์ .npy แบบ memory-mapped ต่อรอบการรัน:
+    - user_ids.npy      user_id ที่เรียงแล้ว (ค้นหาด้วย binary search)
+    - post_ids.npy      ตาราง (ผู้ใช้ x N) ของ post_id ที่จัดอันดับแล้ว เติมด้วย -1
+    - lengths.npy       จำนวนโพสต์จริงของแต่ละผู้ใช้
+    - fingerprints.npy  interaction_fingerprint ตอนคำนวณ
+    - computed_at.npy   เวลาที่คำนวณ (unix time)
+    ไฟล์ CURRENT ชี้ไปยังรอบล่าสุด และถูกแทนที่แบบ atomic เมื่อรันเสร็จ
+    """
+
+    def __init__(self, path, run, meta, arrays):
+        self.path = path
+        self.run = run
+        self.version = meta['version']
+        self.top_n = meta['top_n']
+        self.created_at = meta['created_at']
+        self.user_ids = arrays['user_ids']
+        self.post_ids = arrays['post_ids']
+        self.lengths = arrays['lengths']
+        self.fingerprints = arrays['fingerprints']
+        self.computed_at = arrays['computed_at']
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    @classmethod
+    def load(cls, path=RECOMMENDATION_STORE_DIR):
+        """เปิดรอบล่าสุดแบบ memory-mapped หรือคืน None หากยังไม่เคยรัน batch"""
+        current = os.path.join(path, CURRENT_FILE)
+        if not os.path.exists(current):
+            return None
+        with open(current, encoding='utf-8') as f:
+            run = f.read().strip()
+        run_dir = os.path.join(path, run)
+        with open(os.path.join(run_dir, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(run_dir, f'{name}.npy'), mmap_mode='r')
+            for name in ('user_ids', 'post_ids', 'lengths', 'fingerprints', 'computed_at')
+        }
+        return cls(path, run, meta, arrays)
+
+    @staticmethod
+    def write(path, version, top_n, user_ids, post_ids, lengths, fingerprints, computed_at, keep=2):
+        """
+        เขียนรอบใหม่ลงโฟลเดอร์แยก แล้วสลับ CURRENT ในครั้งเดียว (ผู้อ่านเห็นรอบเก่าหรือรอบใหม่เท่านั้น)
+        เก็บไว้ keep รอบล่าสุด เพื่อไม่ให้ลบไฟล์ที่โปรเซสอื่นยัง map อยู่ทันที
+        """
+        os.makedirs(path, exist_ok=True)
+        now = time.time()
+        run = time.strftime('%Y%m%d%H%M%S', time.localtime(now)) + f'{int(now * 1e6) % 1000000:06d}-{os.getpid()}'
+        run_dir = os.path.join(path, run)
+        os.makedirs(run_dir)
+
+        order = np.argsort(np.asarray(user_ids, dtype=np.int64), kind='stable')
+        post_ids = np.asarray(post_ids)
+        # post_id ส่วนใหญ่พอดีกับ int32 ซึ่งใช้พื้นที่ครึ่งหนึ่งของ int64
+        post_dtype = np.int32 if post_ids.size == 0 or post_ids.max() < np.iinfo(np.int32).max else np.int64
+        arrays = {
+            'user_ids': np.asarray(user_ids, dtype=np.int64)[order],
+            'post_ids': post_ids.astype(post_dtype)[order],
+            'lengths': np.asarray(lengths, dtype=np.int32)[order],
+            'fingerprints': np.asarray(fingerprints, dtype=np.int64)[order],
+            'computed_at': np.asarray(computed_at, dtype=np.float64)[order],
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(run_dir, f'{name}.npy'), array)
+        with open(os.path.join(run_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'top_n': int(top_n), 'created_at': time.time()}, f)
+
+        tmp = os.path.join(path, CURRENT_FILE + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(run)
+        os.replace(tmp, os.path.join(path, CURRENT_FILE))
+
+        runs = sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)))
+        for old in runs[:-keep]:
+            shutil.rmtree(os.path.join(path, old), ignore_errors=True)
+        return run
+
+    def position(self, user_id):
+        position = int(np.searchsorted(self.user_ids, user_id))
+        if position < len(self.user_ids) and self.user_ids[position] == user_id:
+            return position
+        return -1
+
+    def ranking(self, user_id, version, fingerprint, max_age=None, now=None):
+        """
+        คืน {"ids", "complete"} ของผู้ใช้หากผลยังสดอยู่ ไม่เช่นนั้นคืน None
+        (สด = version เดียวกัน (โมเดลและชุดโพสต์) ผู้ใช้ไม่มีการโต้ตอบใหม่ และอายุไม่เกิน max_age)
+        """
+        if version != self.version:
+            return None
+        position = self.position(user_id)
+        if position < 0 or self.fingerprints[position] != fingerprint:
+            return None
+        if max_age is not None and (now or time.time()) - self.computed_at[position] > max_age:
+            return None
+        length = int(self.lengths[position])
+        return {"ids": self.post_ids[position, :length].tolist(), "complete": length < self.top_n}
+
+
+class RecommendationStoreReader:
+    """เปิด RecommendationStore รอบล่าสุดให้ /ai/recommend และเปิดใหม่เมื่อ batch เขียนรอบใหม่"""
+
+    def __init__(self, path=RECOMMENDATION_STORE_DIR, max_age=None, check_interval=30, clock=time.monotonic):
+        self.path = path
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.clock = clock
+        self._store = None
+        self._current_mtime = None
+        self._checked_at = None
+        self._stale_users = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _reload_if_changed(self):
+        now = self.clock()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(os.path.join(self.path, CURRENT_FILE))
+            except OSError:
+                return
+            if mtime == self._current_mtime:
+                return
+            try:
+                store = RecommendationStore.load(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[recommendation-store] failed to open {self.path}: {e}")
+                return
+            self._store, self._current_mtime = store, mtime
+            self._stale_users = set()
+            print(f"[recommendation-store] opened run {store.run} ({len(store)} users, version {store.version})")
+
+    def invalidate(self, user_id):
+        """ไม่ใช้ผลที่คำนวณไว้ของผู้ใช้คนนี้จนกว่าจะมีรอบใหม่"""
+        self._stale_users.add(user_id)
+
+    def ranking(self, user_id, version, interactions):
+        self._reload_if_changed()
+        store = self._store
+        ranking = None
+        if store is not None and user_id not in self._stale_users:
+            ranking = store.ranking(user_id, version, interaction_fingerprint(interactions), self.max_age)
+        if ranking is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return ranking
+
+    def stats(self):
+        store = self._store
+        lookups = self.hits + self.misses
+        return {
+            "run": store.run if store else None,
+            "version": store.version if store else None,
+            "users": len(store) if store else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
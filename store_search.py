@@ -0,0 +1,246 @@
+import os
+import time
+import asyncio
+import threading
+
+import aiohttp
+
+from concurrent.futures import ThreadPoolExecutor
+from html_extract import PRODUCT_SCAN_LIMIT, SelectorSpec, extract_products
+from price_cache import PriceCache, normalize_product_name
+from price_history import parse_price
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/91.0.4472.124 Safari/537.36')
+STORE_TIMEOUT = float(os.getenv('STORE_TIMEOUT', '5'))
+# ผลของแต่ละร้านตอบจาก cache ได้ PRICE_CACHE_TTL วินาที และตอบค่าเก่าระหว่าง scrape ใหม่ได้อีก PRICE_CACHE_STALE วินาที
+PRICE_CACHE_TTL = float(os.getenv('PRICE_CACHE_TTL', '600'))
+PRICE_CACHE_STALE = float(os.getenv('PRICE_CACHE_STALE', '1800'))
+
+
+def search_keyword(product_name):
+    return product_name.replace(' ', '%20')
+
+
+def has_priced_product(result):
+    """ผลการค้นหามีสินค้าที่อ่านราคาได้อย่างน้อยหนึ่งชิ้น (ไม่ใช่ error, list ว่าง หรือ placeholder เช่น "Not found")"""
+    return isinstance(result, list) and any(parse_price(product.get('price')) is not None for product in result)
+
+
+class HttpStoreAdapter:
+    """
+    ร้านที่ค้นหาได้ด้วย HTTP GET หน้าเดียว: url ของหน้าค้นหา + ฟังก์ชัน parse(html, product_name) -> list ของสินค้า
+    เพิ่มร้านใหม่ได้ด้วยการสร้าง adapter นี้พร้อมฟังก์ชัน parse ของร้านนั้น
+    """
+
+    def __init__(self, name, label, search_url, parse, timeout=STORE_TIMEOUT, max_connections=10,
+                 ttl=PRICE_CACHE_TTL, stale_ttl=PRICE_CACHE_STALE):
+        self.name = name
+        self.label = label
+        self.search_url = search_url
+        self.parse = parse
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    async def search(self, client, product_name):
+        async with client.session(self).get(self.search_url.format(keyword=search_keyword(product_name))) as response:
+            if response.status != 200:
+                return f"Failed to search {self.label}. Status code: {response.status}"
+            html = await response.text()
+        # parse ด้วย BeautifulSoup ใช้ CPU จึงทำนอก event loop เพื่อไม่ให้ร้านอื่นต้องรอ
+        return await client.run_blocking(self.parse, html, product_name)
+
+
+class BlockingStoreAdapter:
+    """ร้านที่ต้องใช้โค้ดแบบ blocking (เช่น Selenium) ฟังก์ชัน search(product_name) ถูกรันใน thread แยก"""
+
+    def __init__(self, name, label, search, timeout=STORE_TIMEOUT, ttl=PRICE_CACHE_TTL, stale_ttl=PRICE_CACHE_STALE):
+        self.name = name
+        self.label = label
+        self._search = search
+        self.timeout = timeout
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    async def search(self, client, product_name):
+        return await client.run_blocking(self._search, product_name)
+
+
+class StoreSearch:
+    """
+    ค้นหาสินค้าจากทุกร้านพร้อมกันบน event loop ที่ทำงานอยู่ใน thread เดียวตลอดอายุโปรเซส
+    - แต่ละร้านมี aiohttp session (connection pool แบบ keep-alive) ของตัวเอง จำกัด max_connections ต่อร้าน
+    - แต่ละร้านมี timeout ของตัวเอง ร้านที่ช้าหรือผิดพลาดได้ข้อความ error แทนผลลัพธ์ ร้านอื่นยังได้ผลตามปกติ
+      เวลาของการค้นหาทั้งหมดจึงไม่เกิน timeout ของร้านที่ตั้งไว้นานที่สุด
+    - ผลของแต่ละร้านถูก cache ตามชื่อสินค้าที่ normalize แล้ว (PriceCache) ด้วย ttl/stale_ttl ของร้านนั้น
+    """
+
+    def __init__(self, adapters, blocking_workers=8, cache=None):
+        self.adapters = list(adapters)
+        self.cache = cache if cache is not None else PriceCache()
+        self._blocking = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix='store-search')
+        self._sessions = {}
+        self._loop = None
+        self._lock = threading.Lock()
+        self._stats = {adapter.name: {"calls": 0, "ok": 0, "timeouts": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+                       for adapter in self.adapters}
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='store-search-loop', daemon=True).start()
+            return self._loop
+
+    def session(self, adapter):
+        """aiohttp session ของร้าน (สร้างครั้งแรกที่ใช้ บน event loop)"""
+        session = self._sessions.get(adapter.name)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=adapter.max_connections, ttl_dns_cache=300, keepalive_timeout=30)
+            session = aiohttp.ClientSession(connector=connector, headers={'User-Agent': USER_AGENT})
+            self._sessions[adapter.name] = session
+        return session
+
+    def run_blocking(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self._blocking, fn, *args)
+
+    async def _scrape(self, adapter, product_name):
+        # การ scrape ถูกจำกัดเวลาในตัวเอง เพราะอาจทำต่อหลังผู้เรียกหมดเวลา (เพื่อเก็บผลลง cache)
+        result = await asyncio.wait_for(adapter.search(self, product_name), adapter.timeout)
+        # ร้านถูกค้นหาด้วยชื่อที่ผู้ใช้พิมพ์ ผลที่ไม่มีราคาอาจมาจากการสะกดแบบหนึ่ง (เช่นชื่อภาษาไทย)
+        # หรือหน้าที่ยังแสดงผลไม่เสร็จ จึงไม่เก็บให้ key นี้
+        return result, has_priced_product(result)
+
+    async def _scrape_fresh(self, adapter, key, product_name):
+        result, cacheable = await self._scrape(adapter, product_name)
+        if cacheable:
+            self.cache.put(adapter.name, key, result)
+        return result
+
+    async def _search_store(self, adapter, product_name, fresh=False):
+        started = time.perf_counter()
+        outcome = "ok"
+        key = normalize_product_name(product_name)
+        try:
+            if fresh:
+                search = self._scrape_fresh(adapter, key, product_name)
+            else:
+                search = self.cache.get(adapter.name, key, adapter.ttl, adapter.stale_ttl,
+                                        lambda: self._scrape(adapter, product_name))
+            result = await asyncio.wait_for(search, adapter.timeout)
+        except asyncio.TimeoutError:
+            outcome = "timeouts"
+            result = f"Timed out after {adapter.timeout:g}s searching {adapter.label}"
+        except Exception as e:
+            outcome = "errors"
+            result = f"Error occurred during {adapter.label} scraping: {e}"
+        if isinstance(result, str) and outcome == "ok":
+            outcome = "errors"  # เช่น status code ที่ไม่ใช่ 200
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._stats[adapter.name]
+            stats["calls"] += 1
+            stats[outcome] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        return result
+
+    async def _search_all(self, product_name, adapters, fresh):
+        results = await asyncio.gather(*(self._search_store(adapter, product_name, fresh) for adapter in adapters))
+        return {adapter.name: result for adapter, result in zip(adapters, results)}
+
+    def search(self, product_name, stores=None, fresh=False):
+        """
+        คืน dict ของชื่อร้าน -> list ของสินค้า หรือข้อความ error ของร้านนั้น (เรียกได้จากทุก thread)
+        ผลถูก cache ตามชื่อที่ normalize แล้ว แต่ร้านถูกค้นหาด้วย product_name ตามที่ส่งมา
+        stores: ค้นหาเฉพาะร้านในรายการนี้, fresh=True: scrape ใหม่เสมอแทนการตอบจาก cache
+        """
+        adapters = self.adapters if stores is None else [adapter for adapter in self.adapters if adapter.name in stores]
+        return asyncio.run_coroutine_threadsafe(
+            self._search_all(product_name, adapters, fresh), self._ensure_loop()
+        ).result()
+
+    def close(self):
+        if self._loop is None:
+            return
+
+        async def close_sessions():
+            for session in self._sessions.values():
+                await session.close()
+
+        asyncio.run_coroutine_threadsafe(close_sessions(), self._loop).result(timeout=5)
+        self._blocking.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats["calls"],
+                    "ok": stats["ok"],
+                    "timeouts": stats["timeouts"],
+                    "errors": stats["errors"],
+                    "avg_ms": round(stats["total_ms"] / stats["calls"], 1) if stats["calls"] else 0.0,
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+# selector ของหน้าค้นหาของแต่ละร้าน (แก้ที่นี่ที่เดียวเมื่อร้านเปลี่ยนหน้าเว็บ)
+JIB_SELECTORS = SelectorSpec('div.divboxpro', {
+    'name': 'span.promo_name',
+    'price': 'p.price_total',
+    'url': 'div.row.size_img.center a@href',
+})
+BANANA_SELECTORS = SelectorSpec('a.product-link.verify.product-item', {
+    'name': 'div.product-name',
+    'price': 'div.product-price',
+    'url': '@href',
+}, scope='div.product-list')  # ไม่นับสินค้าใน carousel/สินค้าแนะนำนอกรายการผลการค้นหา
+
+
+# Scrape JIB
+def parse_jib_products(html, product_name, limit=PRODUCT_SCAN_LIMIT):
+    products = []
+    for product in extract_products(html, JIB_SELECTORS, limit):
+        found_product_name = product['name'] if product['name'] is not None else "Product name not found"
+        if product_name.lower() in found_product_name.lower():  # Check for matching name
+            product_price = product['price'] + " บาท" if product['price'] is not None else "Price not found"
+            products.append({"name": found_product_name, "price": product_price, "url": product['url']})
+    return filter_products_by_name(products, product_name)
+
+
+# Scrape Banana IT
+def parse_banana_products(html, product_name, limit=PRODUCT_SCAN_LIMIT):
+    products = []
+    for product in extract_products(html, BANANA_SELECTORS, limit):
+        product_url = "https://www.bnn.in.th" + product['url']
+        found_product_name = product['name'] if product['name'] is not None else "Product name not found"
+        if product_name.lower() in found_product_name.lower():  # Check for matching name
+            product_price = product['price'] if product['price'] is not None else "Price not found"
+            products.append({"name": found_product_name, "price": product_price, "url": product_url})
+    return filter_products_by_name(products, product_name)
+
+
+# Filter products by name to match search term
+def filter_products_by_name(products, search_name):
+    filtered_products = []
+    search_name_lower = search_name.lower()
+    for product in products:
+        product_name_lower = product['name'].lower()
+        if search_name_lower in product_name_lower:
+            filtered_products.append(product)
+    return filtered_products[:1] if filtered_products else products[:1]
+
+
+JIB_STORE = HttpStoreAdapter(
+    'JIB', 'JIB', 'https://www.jib.co.th/web/product/product_search/0?str_search={keyword}', parse_jib_products,
+    timeout=float(os.getenv('JIB_TIMEOUT', STORE_TIMEOUT))
+)
+BANANA_STORE = HttpStoreAdapter(
+    'Banana', 'Banana IT', 'https://www.bnn.in.th/th/p?q={keyword}&ref=search-result', parse_banana_products,
+    timeout=float(os.getenv('BANANA_TIMEOUT', STORE_TIMEOUT))
+)
@@ -0,0 +1,128 @@
+import sys
+import time
+
+import joblib
+import numpy as np
+
+from id_index import IdIndex
+
+
+class SVDBatchScorer:
+    """
+    คำนวณคะแนน Collaborative จากโมเดล Surprise SVD ที่ train แล้ว ทีละหลายโพสต์ในครั้งเดียว
+    ให้ผลเหมือน collaborative_model.predict(user_id, post_id).est ทุกกรณี
+    รวมถึงผู้ใช้/โพสต์ที่ไม่อยู่ใน trainset และการ clip ตาม rating_scale
+    """
+
+    def __init__(self, model):
+        trainset = model.trainset
+        self.biased = model.biased
+        self.global_mean = float(trainset.global_mean)
+        self.lower_bound, self.upper_bound = trainset.rating_scale
+
+        self.pu = np.asarray(model.pu, dtype=np.float64)
+        self.qi = np.asarray(model.qi, dtype=np.float64)
+        self.bu = np.asarray(model.bu, dtype=np.float64)
+        self.bi = np.asarray(model.bi, dtype=np.float64)
+
+        # raw id -> inner id ของ Surprise (dict เดียวกับที่ predict ใช้)
+        self._user_inner = trainset._raw2inner_id_users
+        self._item_index = IdIndex(list(trainset._raw2inner_id_items.keys()))
+        self._item_inner = np.fromiter(trainset._raw2inner_id_items.values(), dtype=np.int64,
+                                       count=len(trainset._raw2inner_id_items))
+
+    def inner_user_id(self, user_id):
+        """คืน inner id ของผู้ใช้ หรือ -1 หากไม่อยู่ใน trainset"""
+        return self._user_inner.get(user_id, -1)
+
+    def inner_item_ids(self, post_ids):
+        """แปลง post_id ทั้งชุดเป็น inner id (-1 สำหรับโพสต์ที่ไม่อยู่ใน trainset)"""
+        return self._item_index.take(self._item_inner, post_ids, fill_value=-1).astype(np.int64)
+
+    def score(self, user_id, post_ids=None, inner_items=None):
+        """
+        คืน array ของคะแนนสำหรับทุกโพสต์ในครั้งเดียว
+        ส่ง inner_items ที่คำนวณไว้แล้วมาได้ เพื่อข้ามการแปลง id ในแต่ละ request
+        """
+        if inner_items is None:
+            inner_items = self.inner_item_ids(post_ids)
+        inner_user = self.inner_user_id(user_id)
+        known_items = inner_items >= 0
+        known_positions = inner_items[known_items]
+
+        # ลำดับการบวกเหมือน SVD.estimate เพื่อให้ได้ค่าเท่ากัน
+        est = np.full(len(inner_items), self.global_mean, dtype=np.float64)
+        if self.biased:
+            if inner_user >= 0:
+                est += self.bu[inner_user]
+            est[known_items] += self.bi[known_positions]
+            if inner_user >= 0:
+                est[known_items] += self.qi[known_positions] @ self.pu[inner_user]
+        elif inner_user >= 0:
+            # กรณี unbiased ที่ทำนายไม่ได้ predict จะคืน global mean
+            est[known_items] = self.qi[known_positions] @ self.pu[inner_user]
+
+        return np.clip(est, self.lower_bound, self.upper_bound)
+
+    def score_users(self, user_ids, post_ids=None, inner_items=None):
+        """
+        คืนตารางคะแนน (ผู้ใช้ x โพสต์) ของผู้ใช้หลายคนด้วยการคูณเมทริกซ์ครั้งเดียว
+        ใช้สำหรับงาน offline (ประเมินผล/batch) ค่าต่างจาก score() ได้เพียงระดับ floating point
+        """
+        if inner_items is None:
+            inner_items = self.inner_item_ids(post_ids)
+        inner_users = np.array([self.inner_user_id(user_id) for user_id in user_ids], dtype=np.int64)
+        known_users = inner_users >= 0
+        known_items = inner_items >= 0
+
+        est = np.full((len(inner_users), len(inner_items)), self.global_mean, dtype=np.float64)
+        dot = np.zeros((len(inner_users), len(inner_items)), dtype=np.float64)
+        dot[np.ix_(known_users, known_items)] = self.pu[inner_users[known_users]] @ self.qi[inner_items[known_items]].T
+        if self.biased:
+            est[known_users] += self.bu[inner_users[known_users]][:, None]
+            est[:, known_items] += self.bi[inner_items[known_items]]
+            est += dot
+        else:
+            # กรณี unbiased ที่ทำนายไม่ได้ predict จะคืน global mean
+            known = np.outer(known_users, known_items)
+            est[known] = dot[known]
+
+        return np.clip(est, self.lower_bound, self.upper_bound)
+
+
+def check_parity(model, user_ids, post_ids, scorer=None):
+    """เทียบผลของ SVDBatchScorer กับ model.predict ทีละคู่ คืนค่าความต่างสูงสุด"""
+    scorer = scorer or SVDBatchScorer(model)
+    max_diff = 0.0
+    for user_id in user_ids:
+        batch = scorer.score(user_id, post_ids)
+        expected = np.array([model.predict(user_id, post_id).est for post_id in post_ids])
+        max_diff = max(max_diff, float(np.max(np.abs(batch - expected))) if len(post_ids) else 0.0)
+    return max_diff
+
+
+if __name__ == "__main__":
+    # ตรวจสอบความถูกต้องและเวลาที่ใช้กับโมเดลที่บันทึกไว้
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'Collaborative_Model.pkl'
+    model = joblib.load(model_path)
+    scorer = SVDBatchScorer(model)
+
+    trainset = model.trainset
+    known_users = [trainset.to_raw_uid(u) for u in list(trainset.all_users())[:20]]
+    known_items = [trainset.to_raw_iid(i) for i in trainset.all_items()]
+    post_ids = known_items + [-1, -2]
+    user_ids = known_users + [-1]
+
+    max_diff = check_parity(model, user_ids, post_ids, scorer)
+    print(f"Parity with predict(): max abs diff = {max_diff:.3e} over {len(user_ids)} users x {len(post_ids)} posts")
+    if max_diff > 1e-9:
+        raise SystemExit("Batch scores do not match predict()")
+
+    catalog = np.resize(np.asarray(known_items), 100_000)
+    inner_items = scorer.inner_item_ids(catalog)
+    runs = 50
+    start = time.perf_counter()
+    for _ in range(runs):
+        scorer.score(known_users[0], inner_items=inner_items)
+    batch_ms = (time.perf_counter() - start) * 1000 / runs
+    print(f"Batch scoring {len(catalog):,} posts: {batch_ms:.3f} ms per user")
@@ -4,6 +4,8 @@ from sqlalchemy import create_engine
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 import joblib  # For saving/loading precomputed matrices
+import numpy as np
+from id_index import IdIndex
 
 
 collaborative_model = joblib.load('collaborative_model.pkl')
@@ -24,29 +26,34 @@ def load_data_from_db():
         return pd.DataFrame()  # ส่ง DataFrame ว่างกลับหากมีข้อผิดพลาด
 
 # ฟังก์ชันสำหรับแนะนำโพสต์ตามเนื้อหาที่คล้ายกัน
-def content_based_recommendations(post_id, user_id, cosine_sim=cosine_sim, threshold=0.3):
-    data = load_data_from_db()
+def content_based_recommendations(post_id, user_id, cosine_sim=cosine_sim, threshold=0.3, data=None, post_index=None):
+    # ส่ง data และ post_index ที่โหลดไว้แล้วมาได้ เพื่อไม่ต้องโหลดข้อมูลและสแกนหา post_id ใหม่ทุกครั้ง
+    if data is None:
+        data = load_data_from_db()
+    if post_index is None:
+        post_index = IdIndex(data['post_id'])
+
+    idx = post_index.row(post_id)
+    if idx < 0:
+        return []
+
     try:
-        idx = data.index[data['post_id'] == post_id][0]
-        sim_scores = list(enumerate(cosine_sim[idx]))
-        # กรองโพสต์ที่มีค่า Cosine Similarity มากกว่า threshold
-        sim_scores = [score for score in sim_scores if score[1] > threshold]
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-        post_indices = [i[0] for i in sim_scores[:10]]  # เลือก 10 อันดับแรก
-        
-        print(f"Post ID: {post_id}, Similar Posts: {data['post_id'].iloc[post_indices].values}")
+        # กรองโพสต์ที่มีค่า Cosine Similarity มากกว่า threshold แล้วเลือก 10 อันดับแรก
+        similarities = np.asarray(cosine_sim[idx])
+        above_threshold = np.flatnonzero(similarities > threshold)
+        post_indices = above_threshold[np.argsort(-similarities[above_threshold], kind='stable')[:10]]
         return data['post_id'].iloc[post_indices]
     except IndexError:
         return []
 
 
 # ฟังก์ชัน Hybrid สำหรับแนะนำโพสต์
-def hybrid_recommendations(user_id, post_id, alpha=0.85):
+def hybrid_recommendations(user_id, post_id, alpha=0.85, data=None, post_index=None):
     # คาดการณ์จาก Collaborative Filtering
     collab_pred = collaborative_model.predict(user_id, post_id).est
     
     # เรียกใช้ Content-Based Recommendations
-    content_recs = content_based_recommendations(post_id, user_id)
+    content_recs = content_based_recommendations(post_id, user_id, data=data, post_index=post_index)
     content_pred = 0.5 if post_id in content_recs else 0
     
     # คำนวณคะแนนสุดท้ายโดยให้น้ำหนักกับ Collaborative Filtering มากกว่า
@@ -54,10 +61,13 @@ def hybrid_recommendations(user_id, post_id, alpha=0.85):
     return {"post_id": post_id, "final_score": final_score}
 
 def recommend_posts_for_user(user_id, alpha=0.7):
-    data = load_data_from_db()  # โหลดข้อมูลใหม่ทุกครั้ง
+    all_data = load_data_from_db()  # โหลดข้อมูลครั้งเดียวต่อการแนะนำ
+    all_post_index = IdIndex(all_data['post_id'])
 
     # ลบโพสต์ที่มี post_id ซ้ำใน DataFrame
-    data = data.drop_duplicates(subset='post_id')
+    data = all_data.drop_duplicates(subset='post_id')
+    post_index = IdIndex(data['post_id'])
+    post_dates = pd.to_datetime(data['updated_at']).to_numpy()
 
     post_scores = []
 
@@ -65,12 +75,12 @@ def recommend_posts_for_user(user_id, alpha=0.7):
     current_date = pd.to_datetime("now")
 
     # วนผ่านโพสต์ทั้งหมดเพื่อคำนวณคะแนนการแนะนำ
-    for post_id in data['post_id'].unique():
-        score = hybrid_recommendations(user_id, post_id, alpha=alpha)
+    for post_id in post_index.ids:
+        score = hybrid_recommendations(user_id, post_id, alpha=alpha, data=all_data, post_index=all_post_index)
         final_score = float(score['final_score'])
 
         # เพิ่มคะแนนสำหรับโพสต์ใหม่ (ถ้ามีคอลัมน์ updated_at)
-        post_date = pd.to_datetime(data.loc[data['post_id'] == post_id, 'updated_at'].values[0])
+        post_date = pd.Timestamp(post_dates[post_index.row(post_id)])
         age_in_days = (current_date - post_date).days
 
         # สมมุติว่าเพิ่ม 2 คะแนนสำหรับโพสต์ที่สร้างใน 7 วันที่ผ่านมา
@@ -93,5 +103,6 @@ def recommend_posts_for_user(user_id, alpha=0.7):
 
     return recommended_posts
 
-recommend_posts = recommend_posts_for_user(user_id=1200003)
-print(recommend_posts)
\ No newline at end of file
+if __name__ == "__main__":
+    recommend_posts = recommend_posts_for_user(user_id=1200003)
+    print(recommend_posts)
@@ -0,0 +1,63 @@
+import base64
+
+import pytest
+
+from recommender import encode_cursor, decode_cursor, ranking_version
+
+
+def test_cursor_round_trip():
+    version = ranking_version('model-1', [5, 3, 9])
+
+    assert decode_cursor(encode_cursor(0, None)) == (0, None)
+    assert decode_cursor(encode_cursor(3, version)) == (3, version)
+    assert '=' not in encode_cursor(123456, version)
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'not base64!',
+    base64.urlsafe_b64encode(b'not json').decode('ascii'),
+    base64.urlsafe_b64encode(b'{"v": "x"}').decode('ascii'),
+    base64.urlsafe_b64encode(b'{"o": "abc"}').decode('ascii'),
+    base64.urlsafe_b64encode(b'[1, 2]').decode('ascii'),
+    encode_cursor(-1, None),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_ranking_version_depends_on_model_and_served_posts():
+    served = [5, 3, 9]
+
+    assert ranking_version('model-1', served) == ranking_version('model-1', list(served))
+    assert ranking_version('model-1', served) != ranking_version('model-2', served)
+    assert ranking_version('model-1', served) != ranking_version('model-1', [5, 9, 3])
+    assert ranking_version('model-1', served) != ranking_version('model-1', served[:2])
+
+
+def test_paging_with_cursors_serves_each_post_once():
+    ranking = list(range(100, 137))
+    served, cursor, limit = [], None, 10
+    while True:
+        offset, version = decode_cursor(cursor) if cursor else (0, None)
+        if cursor:
+            assert version == ranking_version('model-1', ranking[:offset])
+        page = ranking[offset:offset + limit]
+        served.extend(page)
+        next_offset = offset + len(page)
+        if next_offset >= len(ranking):
+            break
+        cursor = encode_cursor(next_offset, ranking_version('model-1', ranking[:next_offset]))
+
+    assert served == ranking
+
+
+def test_cursor_from_a_changed_ranking_does_not_match():
+    ranking = [4, 8, 15, 16, 23, 42]
+    cursor = encode_cursor(3, ranking_version('model-1', ranking[:3]))
+    offset, version = decode_cursor(cursor)
+
+    reranked = [99] + ranking
+    assert version != ranking_version('model-1', reranked[:offset])
+    assert version == ranking_version('model-1', ranking[:offset])
@@ -0,0 +1,138 @@
+import random
+
+import pytest
+from bs4 import BeautifulSoup
+
+import html_extract
+from html_extract import SelectorSpec, extract_products
+
+JIB = SelectorSpec('div.divboxpro', {
+    'name': 'span.promo_name',
+    'price': 'p.price_total',
+    'url': 'div.row.size_img.center a@href',
+})
+BANANA = SelectorSpec('a.product-link.verify.product-item', {
+    'name': 'div.product-name',
+    'price': 'div.product-price',
+    'url': '@href',
+}, scope='div.product-list')
+MODELS = ['iPhone 15 Pro 128GB', 'Galaxy S24 Ultra 512GB', 'AirPods Pro 2', 'MacBook Air 13 M3']
+
+
+@pytest.fixture(params=['scanner', 'lxml'])
+def backend(request, monkeypatch):
+    # ทดสอบทั้ง _ContainerScanner (ไม่มี lxml) และ pull parser ของ lxml
+    if request.param == 'scanner':
+        monkeypatch.setattr(html_extract, 'etree', None)
+    else:
+        pytest.importorskip('lxml')
+        if html_extract.etree is None:
+            pytest.skip("html_extract was imported without lxml")
+    return request.param
+
+
+def _jib_page(n, rng):
+    menu = ''.join(f'<div class="menu-item"><a href="/c/{i}">หมวด {i}</a></div>' for i in range(10))
+    items = ''.join(
+        f'<div class="divboxpro col-md-3"><div class="row size_img center"><a href="https://www.jib.co.th/p/{i}">'
+        f'<img src="/i/{i}.jpg"></a></div><span class="promo_name">{MODELS[i % len(MODELS)]} #{i}</span>'
+        + (f'<p class="price_total">{rng.randint(5, 60) * 1000:,}</p>' if i % 7 else '')
+        + '</div>'
+        for i in range(n)
+    )
+    return f'<html><body><nav>{menu}</nav><script>var s = "<div>";</script><div class="row">{items}</div></body></html>'
+
+
+def _banana_page(n, rng):
+    recent = ''.join(
+        f'<a class="product-link verify product-item" href="/th/p/recent-{i}">'
+        f'<div class="product-name">{MODELS[0]} (recently viewed {i})</div><div class="product-price">฿1</div></a>'
+        for i in range(3)
+    )
+    items = ''.join(
+        f'<a class="product-link verify product-item" href="/th/p/{i}"><div class="product-name">'
+        f'{MODELS[i % len(MODELS)]} #{i}</div><div class="product-price">฿{rng.randint(5, 60) * 1000:,}</div></a>'
+        for i in range(n)
+    )
+    return (f'<html><body><div class="recently-viewed">{recent}</div>'
+            f'<div class="product-list"><div class="grid">{items}</div></div></body></html>')
+
+
+def baseline_jib(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+    for container in soup.find_all('div', {'class': 'divboxpro'}):
+        name = container.find('span', {'class': 'promo_name'})
+        price = container.find('p', {'class': 'price_total'})
+        products.append({
+            'name': name.text.strip() if name else None,
+            'price': price.text.strip() if price else None,
+            'url': container.find('div', {'class': 'row size_img center'}).find('a')['href'],
+        })
+    return products
+
+
+def baseline_banana(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+    for item in soup.find('div', {'class': 'product-list'}).find_all('a', {'class': 'product-link verify product-item'}):
+        products.append({
+            'name': item.find('div', {'class': 'product-name'}).text.strip(),
+            'price': item.find('div', {'class': 'product-price'}).text.strip(),
+            'url': item['href'],
+        })
+    return products
+
+
+@pytest.mark.parametrize('spec, page, baseline', [(JIB, _jib_page, baseline_jib), (BANANA, _banana_page, baseline_banana)])
+def test_matches_full_tree_parser(backend, spec, page, baseline):
+    html = page(50, random.Random(50))
+
+    assert extract_products(html, spec, limit=None) == baseline(html)
+
+
+def test_limit_keeps_the_first_containers(backend):
+    html = _jib_page(50, random.Random(1))
+
+    assert extract_products(html, JIB, limit=5) == baseline_jib(html)[:5]
+
+
+def test_scope_skips_containers_outside_the_result_list(backend):
+    html = _banana_page(4, random.Random(2))
+
+    products = extract_products(html, BANANA, limit=2)
+
+    assert [product['url'] for product in products] == ['/th/p/0', '/th/p/1']
+    assert all('recently viewed' not in product['name'] for product in extract_products(html, BANANA, limit=None))
+
+
+def test_nested_tags_of_the_container_type(backend):
+    spec = SelectorSpec('div.item', {'name': '@item-name', 'price': 'div.price', 'url': 'a@href'})
+    html = ('<div class="item" item-name="A"><div class="image"><div><img src="a.jpg"></div></div>'
+            '<div class="price">100</div><a href="/a">A</a></div>'
+            '<div class="other"><div class="price">1</div></div>'
+            '<div class="item" item-name="B"><a href="/b">B</a></div>')
+
+    assert extract_products(html, spec, limit=None) == [
+        {'name': 'A', 'price': '100', 'url': '/a'},
+        {'name': 'B', 'price': None, 'url': '/b'},
+    ]
+
+
+def test_no_containers():
+    assert extract_products('<html><body><p>ไม่พบสินค้า</p></body></html>', JIB) == []
+
+
+def test_selector_must_be_tag_and_classes():
+    with pytest.raises(ValueError):
+        SelectorSpec('div > .item', {})
+
+
+def test_store_parsers_match_the_benchmark_baselines():
+    # bench_scrapers นำเข้า advice_scraper ซึ่งต้องใช้ selenium
+    pytest.importorskip('selenium')
+    import bench_scrapers
+
+    for store, (page, baseline, extract) in bench_scrapers.STORES.items():
+        html = page(60, random.Random(60))
+        assert extract(html, None) == baseline(html), store
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import train_test_split
+from sklearn.neighbors import NearestNeighbors
+
+from id_index import IdIndex
+from content_scores import ContentScoreTable, original_label_scores
+
+
+def test_index_matches_boolean_mask_scans():
+    post_ids = np.array([7, 3, 7, 9, 3, 11])
+    data = pd.DataFrame({'post_id': post_ids})
+    index = IdIndex(post_ids)
+
+    assert list(index.ids) == [7, 3, 9, 11]
+    for post_id in [7, 3, 9, 11]:
+        assert index.row(post_id) == data.index[data['post_id'] == post_id][0]
+        assert post_id in index
+    assert index.row(42) == -1
+    assert 42 not in index
+    assert list(index.positions([11, 42, 7])) == [3, -1, 0]
+
+
+def test_take_fills_unknown_ids():
+    index = IdIndex([10, 20, 30])
+
+    assert np.array_equal(index.take([1.0, 2.0, 3.0], [30, 99, 10]), [3.0, 0.0, 1.0])
+    assert np.array_equal(index.take([1, 2, 3], [99], fill_value=-1), [-1])
+    assert np.array_equal(IdIndex([]).take([], [1, 2]), [0.0, 0.0])
+
+
+def _content_frame():
+    rng = np.random.default_rng(0)
+    words = ['battery', 'screen', 'camera', 'sound', 'price', 'design', 'budget', 'premium']
+    post_ids = rng.integers(1, 30, 120)
+    data = pd.DataFrame({
+        'post_id': post_ids,
+        'Content': [' '.join(rng.choice(words, 5)) + f' post{post_id}' for post_id in post_ids],
+        'NormalizedEngagement': rng.random(120),
+    })
+    train_data, _ = train_test_split(data, test_size=0.25, random_state=42)
+    tfidf = TfidfVectorizer()
+    matrix = tfidf.fit_transform(train_data['Content'])
+    knn = NearestNeighbors(n_neighbors=10, metric='cosine').fit(matrix)
+    return train_data, tfidf, knn
+
+
+def _mean_neighbour_engagement(train_data, tfidf, knn, content):
+    _, indices = knn.kneighbors(tfidf.transform([content]), n_neighbors=min(20, knn._fit_X.shape[0]))
+    return np.mean([train_data.iloc[i]['NormalizedEngagement'] for i in indices[0]])
+
+
+def test_content_scores_use_the_first_row_of_each_post():
+    train_data, tfidf, knn = _content_frame()
+    table = ContentScoreTable.build(train_data['post_id'], tfidf.transform(train_data['Content']), knn,
+                                    train_data['NormalizedEngagement'])
+
+    for post_id in train_data['post_id'].unique():
+        content = train_data[train_data['post_id'] == post_id].iloc[0]['Content']
+        expected = _mean_neighbour_engagement(train_data, tfidf, knn, content)
+        assert np.isclose(table.scores_for([post_id])[0], expected, atol=1e-6)
+
+
+def test_original_label_scores_reproduce_the_label_as_position_lookup():
+    train_data, tfidf, knn = _content_frame()
+    table, raised = original_label_scores(train_data, tfidf, knn)
+
+    assert len(raised) > 0  # train_test_split เหลือ label ที่เกินจำนวนแถว
+    for post_id in train_data['post_id'].unique():
+        label = train_data.index[train_data['post_id'] == post_id].tolist()[0]
+        if label >= len(train_data):
+            assert post_id in raised
+            assert table.scores_for([post_id])[0] == 0
+            continue
+        expected = _mean_neighbour_engagement(train_data, tfidf, knn, train_data.iloc[label]['Content'])
+        assert np.isclose(table.scores_for([post_id])[0], expected, atol=1e-6)
@@ -0,0 +1,72 @@
+import io
+import sys
+import importlib
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+Image = pytest.importorskip('PIL.Image')
+
+
+def _tiny_model(path):
+    # ค่าเฉลี่ยของพิกเซลสูง (ภาพสว่าง) -> ความน่าจะเป็นสูง ผลของแต่ละภาพจึงต่างกันและตรวจลำดับได้
+    inputs = tf.keras.Input(shape=(128, 128, 3))
+    pooled = tf.keras.layers.GlobalAveragePooling2D()(inputs)
+    outputs = tf.keras.layers.Dense(1, activation='sigmoid')(pooled)
+    model = tf.keras.Model(inputs, outputs)
+    model.layers[-1].set_weights([np.full((3, 1), 10 / 3, dtype=np.float32), np.array([-5.0], dtype=np.float32)])
+    model.save(path)
+    return path
+
+
+def _jpeg(color, size=(300, 200)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def image_ai(tmp_path, monkeypatch):
+    monkeypatch.setenv('IMAGE_MODEL', _tiny_model(str(tmp_path / 'tiny.h5')))
+    monkeypatch.setenv('IMAGE_VERDICT_CACHE', str(tmp_path / 'verdicts.sqlite3'))
+    sys.modules.pop('imageAI', None)
+    module = importlib.import_module('imageAI')
+    yield module
+    sys.modules.pop('imageAI', None)
+
+
+def test_predict_images_returns_one_verdict_per_image_in_order(image_ai):
+    assert image_ai.predict_images([_jpeg('white'), _jpeg('black')]) == [True, False]
+    assert image_ai.predict_images([_jpeg('black'), _jpeg('white')]) == [False, True]
+
+
+def test_unreadable_images_are_treated_as_safe_without_shifting_the_others(image_ai):
+    verdicts = image_ai.predict_images([_jpeg('white'), io.BytesIO(b'not an image'), _jpeg('black'), _jpeg('white')])
+
+    assert verdicts == [True, False, False, True]
+
+
+def test_moderate_images_matches_predict_images(image_ai):
+    contents = [_jpeg(color).getvalue() for color in ('white', 'black', 'white')]
+
+    results = image_ai.moderate_images(contents)
+
+    assert [verdict for _, verdict in results] == [True, False, True]
+    assert results[0][0] == results[2][0]  # ภาพเดียวกันได้ content hash เดียวกัน
+
+
+def test_int8_tflite_mode_gives_the_same_verdicts(tmp_path, monkeypatch):
+    from nude_tflite import export_int8_tflite
+
+    model = tf.keras.models.load_model(_tiny_model(str(tmp_path / 'tiny.h5')))
+    representative = np.random.default_rng(0).random((20, 128, 128, 3), dtype=np.float32)
+    monkeypatch.setenv('IMAGE_MODEL', export_int8_tflite(model, representative, str(tmp_path / 'tiny.tflite')))
+    monkeypatch.setenv('IMAGE_VERDICT_CACHE', str(tmp_path / 'verdicts.sqlite3'))
+    sys.modules.pop('imageAI', None)
+    try:
+        image_ai = importlib.import_module('imageAI')
+        assert image_ai.predict_images([_jpeg('white'), _jpeg('black'), _jpeg('white')]) == [True, False, True]
+    finally:
+        sys.modules.pop('imageAI', None)
@@ -0,0 +1,29 @@
+from price_history import PriceHistory, parse_price
+
+NOT_FOUND = [{"name": "Not found", "price": "-", "url": "#"}]
+
+
+def test_parse_price():
+    assert parse_price("39,900 บาท") == 3990000
+    assert parse_price("฿39,900.50") == 3990050
+    assert parse_price(399) == 39900
+    assert parse_price("-") is None
+    assert parse_price("Price not found") is None
+    assert parse_price(None) is None
+
+
+def test_result_without_a_price_is_not_recorded(tmp_path):
+    history = PriceHistory(str(tmp_path / 'prices.sqlite3'))
+
+    assert history.record('iphone 15 pro', 'Advice', NOT_FOUND, ts=100) is None
+    assert history.record('iphone 15 pro', 'JIB', "Error occurred during JIB scraping: boom", ts=100) is None
+    assert history.latest('iphone 15 pro') == {}
+
+    results = [{"name": "iPhone 15 Pro", "price": "41,900", "url": "/p/1"}]
+    assert history.record('iPhone15Pro', 'Advice', results, ts=200) == 4190000
+    # ผลที่ไม่มีราคาภายหลังไม่ทับราคาล่าสุดที่ใช้ได้
+    assert history.record('iphone 15 pro', 'Advice', NOT_FOUND, ts=300) is None
+
+    assert history.latest('ไอโฟน 15 โปร') == {"Advice": {"results": results, "price": 4190000, "checked_at": 200}}
+    assert history.cheapest('iphone 15 pro')["price"] == 41900
+    assert history.stats()["recorded"] == 1
@@ -0,0 +1,78 @@
+import pytest
+
+from price_cache import normalize_product_name
+from store_search import (BlockingStoreAdapter, StoreSearch, has_priced_product, parse_banana_products,
+                          parse_jib_products)
+
+NOT_FOUND = [{"name": "Not found", "price": "-", "url": "#"}]
+
+
+@pytest.mark.parametrize('spelling', ['iPhone15Pro', 'ไอโฟน 15 โปร', ' iphone  15 pro', 'IPHONE 15 PRO'])
+def test_spellings_share_one_key(spelling):
+    assert normalize_product_name(spelling) == 'iphone 15 pro'
+
+
+def test_aliases_only_replace_whole_words():
+    assert normalize_product_name('แอร์พอด โปร 2') == 'airpods pro 2'
+    assert normalize_product_name('airpods') == 'airpods'
+    assert normalize_product_name('โปรเจคเตอร์') == 'โปรเจคเตอร์'
+
+
+def _jib_page(names):
+    items = ''.join(
+        f'<div class="divboxpro"><div class="row size_img center"><a href="/p/{i}"></a></div>'
+        f'<span class="promo_name">{name}</span><p class="price_total">1,000</p></div>'
+        for i, name in enumerate(names)
+    )
+    return f'<html><body>{items}</body></html>'
+
+
+@pytest.mark.parametrize('product_name', ['C++', '(128GB', 'iphone 15 pro [2023', 'a.b*'])
+def test_product_name_is_matched_literally(product_name):
+    html = _jib_page([f'Book {product_name} edition', 'Other product'])
+
+    products = parse_jib_products(html, product_name)
+
+    assert [product['name'] for product in products] == [f'Book {product_name} edition']
+
+
+def test_regex_characters_do_not_match_as_patterns():
+    html = _jib_page(['iPhone 15 Pro'])
+
+    assert parse_jib_products(html, 'iphone.*pro') == []
+
+
+def test_banana_product_name_is_matched_literally():
+    html = ('<div class="product-list"><a class="product-link verify product-item" href="/th/p/1">'
+            '<div class="product-name">Cable (USB-C+)</div><div class="product-price">฿290</div></a></div>')
+
+    assert parse_banana_products(html, '(usb-c+)') == [
+        {"name": "Cable (USB-C+)", "price": "฿290", "url": "https://www.bnn.in.th/th/p/1"}
+    ]
+
+
+def test_only_results_with_a_price_are_cacheable():
+    assert has_priced_product([{"name": "iPhone 15 Pro", "price": "41,900 บาท", "url": "/p/1"}])
+    assert not has_priced_product(NOT_FOUND)
+    assert not has_priced_product([{"name": "iPhone 15 Pro", "price": "Price not found", "url": "/p/1"}])
+    assert not has_priced_product([])
+    assert not has_priced_product("Error occurred during Advice scraping: boom")
+
+
+def test_placeholder_result_is_scraped_again():
+    calls = []
+
+    def search(product_name):
+        calls.append(product_name)
+        return NOT_FOUND if len(calls) == 1 else [{"name": "iPhone 15 Pro", "price": "41,900", "url": "/p/1"}]
+
+    store_search = StoreSearch([BlockingStoreAdapter('Advice', 'Advice', search, timeout=5)])
+    try:
+        assert store_search.search('iphone 15 pro')['Advice'] == NOT_FOUND
+        found = store_search.search('iphone 15 pro')['Advice']
+        assert store_search.search('iPhone15Pro')['Advice'] == found
+    finally:
+        store_search.close()
+
+    assert found[0]["price"] == "41,900"
+    assert len(calls) == 2
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from surprise import SVD, Dataset, Reader
+
+from svd_scoring import SVDBatchScorer
+
+
+def _fit(biased=True):
+    rng = np.random.default_rng(0)
+    ratings = pd.DataFrame({
+        'user_id': rng.integers(1, 15, 200),
+        'post_id': rng.integers(100, 140, 200),
+        'rating': rng.integers(1, 6, 200).astype(float),
+    }).drop_duplicates(['user_id', 'post_id'])
+    data = Dataset.load_from_df(ratings[['user_id', 'post_id', 'rating']], Reader(rating_scale=(1, 5)))
+    model = SVD(n_factors=8, n_epochs=20, biased=biased, random_state=0)
+    model.fit(data.build_full_trainset())
+    return model
+
+
+def _predict(model, user_id, post_ids):
+    return np.array([model.predict(user_id, post_id).est for post_id in post_ids])
+
+
+@pytest.mark.parametrize('biased', [True, False])
+def test_score_matches_predict_including_unknown_users_and_posts(biased):
+    model = _fit(biased)
+    scorer = SVDBatchScorer(model)
+    trainset = model.trainset
+    post_ids = [trainset.to_raw_iid(i) for i in trainset.all_items()] + [-1, 999]
+    user_ids = [trainset.to_raw_uid(u) for u in trainset.all_users()] + [-1]
+
+    for user_id in user_ids:
+        assert np.allclose(scorer.score(user_id, post_ids), _predict(model, user_id, post_ids), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('biased', [True, False])
+def test_score_users_matches_predict(biased):
+    model = _fit(biased)
+    scorer = SVDBatchScorer(model)
+    post_ids = [101, 120, -5, 139]
+    user_ids = [1, 7, 12345]
+
+    table = scorer.score_users(user_ids, post_ids)
+
+    assert table.shape == (len(user_ids), len(post_ids))
+    for row, user_id in zip(table, user_ids):
+        assert np.allclose(row, _predict(model, user_id, post_ids))
+
+
+def test_precomputed_inner_items_give_the_same_scores():
+    model = _fit()
+    scorer = SVDBatchScorer(model)
+    post_ids = [100, 139, -1, 120]
+
+    assert np.array_equal(scorer.score(3, inner_items=scorer.inner_item_ids(post_ids)), scorer.score(3, post_ids))
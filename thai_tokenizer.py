@@ -0,0 +1,180 @@
+import os
+import time
+import hashlib
+import threading
+import contextvars
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from pythainlp import word_tokenize
+
+# ตัดคำภาษาไทยร่วมกันทุกจุด (เซ็นเซอร์คำหยาบ, วิเคราะห์คอมเมนต์ตอน train, งาน bulk)
+# ข้อความเดียวกันที่ถูกตัดคำหลายครั้ง (เช่น ตอนสร้างโพสต์ แก้ไขโพสต์ และ train ใหม่) ใช้ผลจาก cache
+
+
+# สถิติของงานที่กำลังทำใน thread/context นี้ (ดู ThaiTokenizer.job) แยกจากตัวนับรวมของ tokenizer
+# request ที่ทำงานพร้อมกันใน thread อื่นจึงไม่ถูกนับรวมเข้าไปในสถิติของงานนี้
+_current_job = contextvars.ContextVar('tokenization_job', default=None)
+
+
+def _content_key(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def _tokenize_chunk(texts, engine):
+    return [word_tokenize(text, engine=engine) for text in texts]
+
+
+class ThaiTokenizer:
+    """
+    ตัดคำด้วย pythainlp (newmm) พร้อม cache ผลลัพธ์ตาม hash ของเนื้อหา แบบ LRU จำกัดจำนวนตัวอักษรรวม
+    tokenize_many ตัดคำหลายข้อความในครั้งเดียว และกระจายไปยัง process pool เมื่อมีข้อความใหม่จำนวนมาก
+    """
+
+    def __init__(self, engine='newmm', max_chars=20_000_000, parallel_threshold=5000, chunk_size=500):
+        self.engine = engine
+        self.max_chars = max_chars
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self._cache = OrderedDict()  # content hash -> (tokens, จำนวนตัวอักษร)
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.texts = 0
+        self.hits = 0
+        self.misses = 0
+        self.seconds = 0.0
+
+    def _lookup(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        self._cache.move_to_end(key)
+        return entry[0]
+
+    def _store(self, key, text, tokens):
+        if len(text) > self.max_chars:
+            return
+        if key in self._cache:
+            self._chars -= self._cache.pop(key)[1]
+        self._cache[key] = (tuple(tokens), len(text))
+        self._chars += len(text)
+        while self._chars > self.max_chars:
+            _, (_, size) = self._cache.popitem(last=False)
+            self._chars -= size
+
+    def tokenize(self, text):
+        """ตัดคำข้อความเดียว (ผลเหมือน word_tokenize(text, engine='newmm'))"""
+        return self.tokenize_many([text], workers=1)[0]
+
+    def tokenize_many(self, texts, workers=None):
+        """
+        ตัดคำหลายข้อความ คืน list ของ token ตามลำดับเดิม
+        ข้อความซ้ำถูกตัดคำครั้งเดียว, workers=None ใช้ process pool อัตโนมัติเมื่อข้อความใหม่ >= parallel_threshold
+        """
+        texts = list(texts)
+        results = [None] * len(texts)
+        pending = OrderedDict()  # content hash -> (ข้อความ, ตำแหน่งทั้งหมดที่ใช้ข้อความนี้)
+        hits = 0
+        elapsed = 0.0
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                if not text or not isinstance(text, str):
+                    # word_tokenize คืน list ว่างสำหรับข้อความว่างหรือไม่ใช่ str
+                    results[i] = []
+                    continue
+                key = _content_key(text)
+                cached = self._lookup(key)
+                if cached is not None:
+                    hits += 1
+                    results[i] = list(cached)
+                elif key in pending:
+                    hits += 1
+                    pending[key][1].append(i)
+                else:
+                    pending[key] = (text, [i])
+            self.texts += len(texts)
+            self.hits += hits
+            self.misses += len(pending)
+
+        if pending:
+            started = time.perf_counter()
+            new_texts = [text for text, _ in pending.values()]
+            tokenized = self._run(new_texts, workers)
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self.seconds += elapsed
+                for (key, (text, positions)), tokens in zip(pending.items(), tokenized):
+                    self._store(key, text, tokens)
+                    for i in positions:
+                        results[i] = list(tokens)
+
+        job = _current_job.get()
+        if job is not None:
+            job['texts'] += len(texts)
+            job['hits'] += hits
+            job['misses'] += len(pending)
+            job['seconds'] += elapsed
+        return results
+
+    def _run(self, texts, workers):
+        if workers is None:
+            workers = os.cpu_count() if len(texts) >= self.parallel_threshold else 1
+        if workers <= 1 or len(texts) < 2 * self.chunk_size:
+            return _tokenize_chunk(texts, self.engine)
+
+        chunks = [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return [tokens for chunk in pool.map(_tokenize_chunk, chunks, [self.engine] * len(chunks))
+                    for tokens in chunk]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "texts": self.texts,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "tokenize_seconds": round(self.seconds, 4),
+                "entries": len(self._cache),
+                "chars": self._chars,
+            }
+
+    @contextmanager
+    def job(self, label):
+        """
+        พิมพ์เวลาที่ใช้ตัดคำ (และ cache hit) ของงานหนึ่งงาน เช่น การสร้างโพสต์หรือการ train
+        นับเฉพาะการตัดคำที่เกิดใน context ของงานนี้ (ผ่าน contextvars) งานที่ซ้อนกันถูกนับรวมในงานชั้นนอกด้วย
+        """
+        stats = {"texts": 0, "hits": 0, "misses": 0, "seconds": 0.0}
+        token = _current_job.set(stats)
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            _current_job.reset(token)
+            parent = _current_job.get()
+            if parent is not None:
+                for name, value in stats.items():
+                    parent[name] += value
+            print(f"[tokenize] {label}: {stats['texts']} texts, {stats['hits']} cached, "
+                  f"{stats['seconds'] * 1000:.1f} ms tokenizing of {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+# ตัวตัดคำที่ใช้ร่วมกันภายในโปรเซส
+tokenizer = ThaiTokenizer(max_chars=int(os.getenv('TOKENIZE_CACHE_CHARS', '20000000')))
+
+
+def tokenize(text):
+    return tokenizer.tokenize(text)
+
+
+def tokenize_many(texts, workers=None):
+    return tokenizer.tokenize_many(texts, workers)
+
+
+def tokenization_job(label):
+    return tokenizer.job(label)